@@ -202,6 +202,35 @@ with Conf('global.cylc', desc='''
                 self-identification method.
             ''')
 
+        with Conf('run database', desc='''
+            Settings for the private suite run database
+            (``.service/db`` in the suite run directory) which the scheduler
+            writes to as the suite runs.
+
+            The public database (``log/db``) is always left in the
+            default rollback journal mode so that it can be read without
+            write access.
+        '''):
+            Conf('journal mode', VDR.V_STRING, 'delete',
+                 options=['delete', 'truncate', 'persist', 'wal'], desc='''
+                The SQLite journal mode for the private database.
+
+                ``wal`` (write-ahead logging) makes frequent small writes
+                cheaper, but requires a file system with working POSIX
+                locks and shared memory (i.e. not NFS).
+
+                See https://www.sqlite.org/pragma.html#pragma_journal_mode
+            ''')
+            Conf('synchronous', VDR.V_STRING, 'full',
+                 options=['off', 'normal', 'full', 'extra'], desc='''
+                The SQLite synchronous level for the private database.
+
+                ``normal`` is safe from corruption in ``wal`` journal mode,
+                but the most recent writes may be lost on power failure.
+
+                See https://www.sqlite.org/pragma.html#pragma_synchronous
+            ''')
+
         with Conf('events', desc='''
             You can define site defaults for each of the following options,
             details of which can be found under
@@ -270,6 +299,51 @@ with Conf('global.cylc', desc='''
                     The interval with which this plugin is run.
                 ''')
 
+            with Conf('openmetrics', meta=MainLoopPlugin, desc='''
+                Export scheduler metrics in the OpenMetrics text format.
+            '''):
+                Conf('interval', VDR.V_INTERVAL, DurationFloat(10), desc='''
+                    The interval with which the metrics are updated.
+                ''')
+                Conf('port', VDR.V_INTEGER, desc='''
+                    If set, serve the metrics over HTTP on this ``localhost``
+                    port (``0`` picks a free port which is logged).
+
+                    Each scheduler on a host needs a different port, the
+                    metrics file in the suite run directory is written
+                    regardless.
+                ''')
+
+            with Conf('archive run db', meta=MainLoopPlugin, desc='''
+                Move the task history of old cycle points from the suite
+                database into archive databases.
+            '''):
+                Conf('interval', VDR.V_INTERVAL, DurationFloat(3600), desc='''
+                    The interval with which this plugin is run.
+                ''')
+                Conf('retention', VDR.V_STRING, desc='''
+                    Keep the task history of cycle points within this
+                    interval (e.g. ``P30D``, or ``P10`` for integer cycling)
+                    before the earliest cycle point in the task pool.
+
+                    Cycle points within the largest future trigger offset
+                    (e.g. ``P1`` for ``foo[+P1] => bar``) are kept too.
+
+                    If not set, archive all cycle points before the earliest
+                    cycle point in the task pool. Must be set for suites
+                    with future triggers.
+                ''')
+                Conf('period', VDR.V_STRING, desc='''
+                    Write a separate archive database for each period of
+                    this length (e.g. ``P1Y``) from the initial cycle point.
+
+                    If not set, archive all cycle points to one database.
+                ''')
+                Conf('max cycle points', VDR.V_INTEGER, 100, desc='''
+                    The maximum number of cycle points to archive each time
+                    this plugin is run.
+                ''')
+
         with Conf('logging', desc='''
             The workflow event log, held under the suite run directory, is
             maintained as a rolling archive. Logs are rolled over (backed up
@@ -29,6 +29,7 @@ structures.
 
 from copy import copy
 from fnmatch import fnmatchcase
+from itertools import chain
 import os
 import re
 import traceback
@@ -1919,9 +1920,12 @@ class SuiteConfig:
         point_offset_cache = None
         for sequence, edges in self.edges.items():
             # Get initial cycle point for this sequence
-            point = sequence.get_first_point(start_point)
+            first_point = sequence.get_first_point(start_point)
+            if first_point is None:
+                continue
             new_points = []
-            while point is not None:
+            for point in chain(
+                    [first_point], sequence.iter_points(first_point)):
                 if point not in new_points:
                     new_points.append(point)
                 if stop_point is not None and point > stop_point:
@@ -1984,8 +1988,6 @@ class SuiteConfig:
                         lstr, rstr = self._close_families(l_id, r_id, clf_map)
                         gr_edges[point].append(
                             (lstr, rstr, None, suicide, cond))
-                # Increment the cycle point.
-                point = sequence.get_next_point_on_sequence(point)
 
         del clf_map
         del start_point_offset_cache
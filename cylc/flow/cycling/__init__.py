@@ -270,7 +270,8 @@ class SequenceBase(object, metaclass=ABCMeta):
     get_offset & set_offset (deprecated), is_on_sequence,
     get_nearest_prev_point, get_next_point,
     get_next_point_on_sequence, get_first_point, and
-    get_stop_point.
+    get_stop_point. They may override iter_points and
+    get_points_between with faster implementations.
 
     They should also provide a self.__eq__ implementation
     which should return whether a SequenceBase-derived object
@@ -358,6 +359,32 @@ class SequenceBase(object, metaclass=ABCMeta):
         """Return the last point in this sequence, or None if unbounded."""
         pass
 
+    def iter_points(self, point, limit=None):
+        """Yield the on-sequence points > point, in order.
+
+        Args:
+            point (PointBase):
+                Yield the points after this one.
+            limit (int):
+                The maximum number of points to yield (None for no limit).
+
+        """
+        count = 0
+        next_point = self.get_next_point(point)
+        while next_point is not None and (limit is None or count < limit):
+            yield next_point
+            count += 1
+            next_point = self.get_next_point_on_sequence(next_point)
+
+    def get_points_between(self, start, stop):
+        """Return the on-sequence points > start and <= stop, in order."""
+        points = []
+        for point in self.iter_points(start):
+            if point > stop:
+                break
+            points.append(point)
+        return points
+
     @abstractmethod
     def __eq__(self, other):
         # Return True if other (sequence) is equal to self.
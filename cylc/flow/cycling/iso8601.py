@@ -19,14 +19,14 @@
 from functools import lru_cache
 import re
 
-from metomi.isodatetime.data import Calendar, Duration, CALENDAR
+from metomi.isodatetime.data import Calendar, Duration, TimePoint, CALENDAR
 from metomi.isodatetime.dumpers import TimePointDumper
 from metomi.isodatetime.timezone import (
     get_local_time_zone, get_local_time_zone_format, TimeZoneFormatMode)
 from metomi.isodatetime.exceptions import IsodatetimeError
 from cylc.flow.time_parser import CylcTimeParser
 from cylc.flow.cycling import (
-    PointBase, IntervalBase, SequenceBase, ExclusionBase, cmp_to_rich, cmp
+    PointBase, IntervalBase, SequenceBase, ExclusionBase, cmp, cmp_to_rich
 )
 from cylc.flow.exceptions import (
     CylcConfigError,
@@ -63,21 +63,77 @@ class SuiteSpecifics:
 
 class ISO8601Point(PointBase):
 
-    """A single point in an ISO8601 date time sequence."""
+    """A single point in an ISO8601 date time sequence.
+
+    Points are compared, hashed and offset by exact intervals (i.e. without
+    years or months) using a numeric key, the number of seconds since the
+    Unix epoch in the suite calendar. The string value of a point computed
+    this way is only generated when it is needed (e.g. for display or as a
+    DB key), by offsetting an ancestor point which has one.
+
+    """
 
     TYPE = CYCLER_TYPE_ISO8601
     TYPE_SORT_KEY = CYCLER_TYPE_SORT_KEY_ISO8601
 
-    __slots__ = ('value')
+    __slots__ = ('_value', '_key', '_base')
 
     @classmethod
     def from_nonstandard_string(cls, point_string):
         """Standardise a date-time string."""
         return ISO8601Point(str(point_parse(point_string))).standardise()
 
+    @classmethod
+    def _from_key(cls, key, base):
+        """Return a point from its key, without computing its value.
+
+        Args:
+            key (int/float):
+                Seconds since the Unix epoch.
+            base (tuple):
+                (value, key) of a point to compute the value from.
+
+        """
+        point = cls.__new__(cls)
+        point._value = None
+        point._key = key
+        point._base = base
+        return point
+
+    @property
+    def value(self):
+        """The cycle point string."""
+        if self._value is None:
+            base_value, base_key = self._base
+            self._value = self._iso_point_add_seconds(
+                base_value, self._key - base_key)
+            self._base = None
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._key = None
+        self._base = None
+
+    def _get_key(self):
+        """Return the number of seconds since the Unix epoch."""
+        if self._key is None:
+            self._key = _point_key(self._value, CALENDAR.mode)
+        return self._key
+
+    def _get_base(self):
+        """Return (value, key) for computing the value of offset points."""
+        if self._value is None:
+            return self._base
+        return (self._value, self._get_key())
+
     def add(self, other):
         """Add an Interval to self."""
-        return ISO8601Point(self._iso_point_add(self.value, other.value))
+        seconds = _interval_seconds(other.value)
+        if seconds is None:
+            return ISO8601Point(self._iso_point_add(self.value, other.value))
+        return self._from_key(self._get_key() + seconds, self._get_base())
 
     def __cmp__(self, other):
         # Compare other (point) to self.
@@ -85,9 +141,9 @@ class ISO8601Point(PointBase):
             return -1
         if self.TYPE != other.TYPE:
             return cmp(self.TYPE_SORT_KEY, other.TYPE_SORT_KEY)
-        if self.value == other.value:
-            return 0
-        return self._iso_point_cmp(self.value, other.value)
+        key = self._get_key()
+        other_key = other._get_key()
+        return (key > other_key) - (key < other_key)
 
     def standardise(self):
         """Reformat self.value into a standard representation."""
@@ -107,11 +163,14 @@ class ISO8601Point(PointBase):
         if isinstance(other, ISO8601Point):
             return ISO8601Interval(
                 self._iso_point_sub_point(self.value, other.value))
-        return ISO8601Point(
-            self._iso_point_sub_interval(self.value, other.value))
+        seconds = _interval_seconds(other.value)
+        if seconds is None:
+            return ISO8601Point(
+                self._iso_point_sub_interval(self.value, other.value))
+        return self._from_key(self._get_key() - seconds, self._get_base())
 
     def __hash__(self):
-        return hash(self.value)
+        return hash(self._get_key())
 
     @staticmethod
     @lru_cache(10000)
@@ -123,11 +182,9 @@ class ISO8601Point(PointBase):
 
     @staticmethod
     @lru_cache(10000)
-    def _iso_point_cmp(point_string, other_point_string):
-        """Compare the parsed point_string to the other one."""
-        point = point_parse(point_string)
-        other_point = point_parse(other_point_string)
-        return cmp(point, other_point)
+    def _iso_point_add_seconds(point_string, seconds):
+        """Add a number of seconds to the parsed point_string."""
+        return str(point_parse(point_string) + Duration(seconds=seconds))
 
     @staticmethod
     @lru_cache(10000)
@@ -146,7 +203,7 @@ class ISO8601Point(PointBase):
         return str(point - other_point)
 
 
-# TODO: replace __cmp__ infrastructure
+# Compare by key (PointBase rich comparisons call PointBase.__cmp__).
 cmp_to_rich(ISO8601Point)
 
 
@@ -559,6 +616,75 @@ class ISO8601Sequence(SequenceBase):
             return self.get_next_point_on_sequence(result)
         return result
 
+    def iter_points(self, point, limit=None):
+        """Yield the on-sequence points > point, in order.
+
+        For recurrences of an exact interval (no years or months) from a
+        start or to an end point, the points are generated by adding the
+        interval in seconds rather than by re-parsing each point.
+
+        Args:
+            point (ISO8601Point):
+                Yield the points after this one.
+            limit (int):
+                The maximum number of points to yield (None for no limit).
+
+        """
+        if (
+                self.recurrence.format_number == 1
+                or self.recurrence.repetitions == 1
+                or not _interval_seconds(self.step.value)
+        ):
+            yield from SequenceBase.iter_points(self, point, limit)
+            return
+        bounds = [
+            ISO8601Point(str(bound))
+            for bound in (self.recurrence.end_point,
+                          self.recurrence.max_point)
+            if bound is not None
+        ]
+        stop_point = min(bounds) if bounds else None
+        count = 0
+        next_point = self.get_next_point(point)
+        if next_point is None:
+            return
+        is_excluded = self._get_exclusion_filter(next_point)
+        while limit is None or count < limit:
+            if stop_point is not None and next_point > stop_point:
+                break
+            if not is_excluded(next_point):
+                yield next_point
+                count += 1
+            next_point += self.step
+
+    def _get_exclusion_filter(self, point):
+        """Return a function to test increasing points >= point for exclusion.
+
+        Rather than testing each point against each exclusion sequence from
+        scratch, step through the excluded points alongside the points tested.
+
+        """
+        if not self.exclusions:
+            return lambda _: False
+        excluded_points = set(self.exclusions.exclusion_points)
+        excluded_iters = []
+        for sequence in self.exclusions.exclusion_sequences:
+            first_point = sequence.get_first_point(point)
+            if first_point is not None:
+                excluded_iters.append(
+                    [first_point, sequence.iter_points(first_point)])
+
+        def is_excluded(point):
+            ret = point in excluded_points
+            for item in excluded_iters:
+                while item[0] is not None and item[0] < point:
+                    item[0] = next(item[1], None)
+                if item[0] == point:
+                    ret = True
+            return ret
+
+        return is_excluded
+
     def get_first_point(self, point):
         """Return the first point >= to point, or None if out of bounds."""
         try:
@@ -917,6 +1043,40 @@ def _interval_parse(interval_string):
     return SuiteSpecifics.interval_parser.parse(interval_string)
 
 
+@lru_cache(10000)
+def _interval_seconds(interval_string):
+    """Return the length of an exact interval in seconds.
+
+    Return None if the interval has years or months (whose length depends on
+    where it is applied).
+
+    """
+    interval = interval_parse(interval_string)
+    if interval.years or interval.months:
+        return None
+    seconds = interval.get_seconds()
+    if float(seconds).is_integer():
+        return int(seconds)
+    return seconds
+
+
+@lru_cache(100000)
+def _point_key(point_string, _):
+    """Return the number of seconds since the Unix epoch of point_string.
+
+    The second argument is the calendar mode (to key the cache).
+
+    """
+    days, seconds = (
+        _point_parse(point_string) - TimePoint(
+            **CALENDAR.UNIX_EPOCH_DATE_TIME_REFERENCE_PROPERTIES)
+    ).get_days_and_seconds()
+    seconds += days * CALENDAR.SECONDS_IN_DAY
+    if float(seconds).is_integer():
+        return int(seconds)
+    return seconds
+
+
 def point_parse(point_string):
     """Parse a point_string into a proper TimePoint object."""
     return _point_parse(point_string).copy()
@@ -14,11 +14,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from contextlib import contextmanager
 import errno
 import json
 import os
 import sqlite3
 import sys
+from time import time
+from urllib.parse import quote
+
 from cylc.flow.rundb import CylcSuiteDAO
 from cylc.flow.task_state import (
     TASK_STATUS_SUBMITTED,
@@ -54,13 +58,23 @@ class CylcSuiteDBChecker:
         ],
     }
 
-    def __init__(self, rund, suite):
-        db_path = os.path.join(
+    MAX_PARAMS = 500
+
+    def __init__(self, rund, suite, conn=None):
+        if conn is None:
+            db_path = self.get_db_path(rund, suite)
+            if not os.path.exists(db_path):
+                raise OSError(
+                    errno.ENOENT, os.strerror(errno.ENOENT), db_path)
+            conn = sqlite3.connect(db_path, timeout=10.0)
+        self.conn = conn
+
+    @staticmethod
+    def get_db_path(rund, suite):
+        """Return the path to the public database of a suite."""
+        return os.path.join(
             os.path.expanduser(rund), suite, "log",
             CylcSuiteDAO.DB_FILE_BASE_NAME)
-        if not os.path.exists(db_path):
-            raise OSError(errno.ENOENT, os.strerror(errno.ENOENT), db_path)
-        self.conn = sqlite3.connect(db_path, timeout=10.0)
 
     @staticmethod
     def display_maps(res):
@@ -140,6 +154,66 @@ class CylcSuiteDBChecker:
                         return True
             return False
 
+    def task_states_met(self, queries):
+        """Check if several tasks are in particular states.
+
+        Like task_state_met but with one query per table for all tasks.
+
+        Args:
+            queries (list):
+                (task, cycle, status, message) tuples, where one of status
+                or message is None.
+
+        Returns:
+            list - A bool for each query.
+
+        """
+        rows = {}
+        for target_table, column, subset in (
+                (CylcSuiteDAO.TABLE_TASK_STATES, 'status', [
+                    query for query in queries if not query[3]]),
+                (CylcSuiteDAO.TABLE_TASK_OUTPUTS, 'outputs', [
+                    query for query in queries if query[3]])):
+            pairs = sorted(
+                {(cycle, task) for task, cycle, _, _ in subset})
+            # Select the rows of the queried tasks and cycles (and any other
+            # combinations of them), within the SQLite limit on host
+            # parameters.
+            step = self.MAX_PARAMS // 2
+            for i in range(0, len(pairs), step):
+                cycles = sorted({cycle for cycle, _ in pairs[i:i + step]})
+                names = sorted({task for _, task in pairs[i:i + step]})
+                stmt = (
+                    "select name, cycle, {0} from {1}"
+                    " where cycle in ({2}) and name in ({3})"
+                )
+                for name, cycle, value in self.conn.execute(
+                    stmt.format(
+                        column, target_table,
+                        ", ".join("?" * len(cycles)),
+                        ", ".join("?" * len(names))),
+                    cycles + names
+                ):
+                    if value is not None:
+                        rows.setdefault(
+                            (target_table, name, cycle), []).append(value)
+        ret = []
+        for task, cycle, status, message in queries:
+            if message:
+                ret.append(any(
+                    message in json.loads(outputs_str).values()
+                    for outputs_str in rows.get(
+                        (CylcSuiteDAO.TABLE_TASK_OUTPUTS, task, cycle), [])
+                ))
+            else:
+                states = self.state_lookup(status)
+                ret.append(any(
+                    value in states
+                    for value in rows.get(
+                        (CylcSuiteDAO.TABLE_TASK_STATES, task, cycle), [])
+                ))
+        return ret
+
     @staticmethod
     def validate_mask(mask):
         fieldnames = ["name", "status", "cycle"]  # extract from rundb.py?
@@ -147,3 +221,77 @@ class CylcSuiteDBChecker:
             if term.strip(" ") not in fieldnames:
                 return False
         return True
+
+
+class SuiteDBConnectionPool:
+    """Reusable read-only connections to suite databases.
+
+    Idle connections are kept for reuse until they have not been used for
+    max_idle_time seconds, or the database file they were opened on has been
+    replaced. Queries wait up to busy_timeout seconds for a locked database.
+
+    Not thread safe: use from one thread (connections are tied to the thread
+    that opened them).
+
+    """
+
+    def __init__(self, max_idle=1, max_idle_time=600, busy_timeout=1.0):
+        self.max_idle = max_idle
+        self.max_idle_time = max_idle_time
+        self.busy_timeout = busy_timeout
+        # {db_path: [(file_id, conn, last_used_time), ...]}
+        self.idle = {}
+
+    @contextmanager
+    def connect(self, db_path):
+        """Yield a read-only connection to the database at db_path.
+
+        The connection is closed rather than reused if an exception is
+        raised whilst using it.
+
+        Raises:
+            OSError - If the database file does not exist.
+            sqlite3.Error - If it cannot be opened.
+
+        """
+        stat = os.stat(db_path)
+        file_id = (stat.st_dev, stat.st_ino)
+        conn = None
+        idle = self.idle.get(db_path, [])
+        while idle and conn is None:
+            conn_file_id, conn, _ = idle.pop()
+            if conn_file_id != file_id:
+                conn.close()
+                conn = None
+        if conn is None:
+            conn = sqlite3.connect(
+                f'file:{quote(db_path)}?mode=ro', uri=True,
+                timeout=self.busy_timeout)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        idle = self.idle.setdefault(db_path, [])
+        if len(idle) < self.max_idle:
+            idle.append((file_id, conn, time()))
+        else:
+            conn.close()
+
+    def close_idle(self):
+        """Close connections idle for more than max_idle_time."""
+        cutoff = time() - self.max_idle_time
+        for db_path, idle in list(self.idle.items()):
+            for item in list(idle):
+                if item[2] < cutoff:
+                    item[1].close()
+                    idle.remove(item)
+            if not idle:
+                del self.idle[db_path]
+
+    def close(self):
+        """Close all idle connections."""
+        for idle in self.idle.values():
+            for _, conn, _ in idle:
+                conn.close()
+        self.idle.clear()
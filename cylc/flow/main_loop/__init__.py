@@ -24,11 +24,13 @@ Cylc Flow provides the following plugins:
    :toctree: built-in
    :template: main_loop_plugin.rst
 
+   cylc.flow.main_loop.archive_run_db
    cylc.flow.main_loop.auto_restart
    cylc.flow.main_loop.health_check
    cylc.flow.main_loop.log_data_store
    cylc.flow.main_loop.log_main_loop
    cylc.flow.main_loop.log_memory
+   cylc.flow.main_loop.openmetrics
 
 .. Note: Autosummary generates files in this directory, these are cleaned
          up by `make clean`.
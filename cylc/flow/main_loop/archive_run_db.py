@@ -0,0 +1,272 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Move the task history of old cycle points out of the suite database.
+
+The ``task_events``, ``task_jobs``, ``task_outputs`` and ``task_states``
+tables of the suite database grow for as long as the suite runs. This plugin
+moves the rows of cycle points older than a retention period (counting back
+from the earliest cycle point in the task pool) into archive databases in the
+``log/db-archive/`` directory of the suite run directory.
+
+.. code-block:: cylc
+
+   [scheduler]
+       [[main loop]]
+           plugins = health check, prune flow labels, archive run db
+           [[[archive run db]]]
+               interval = PT1H
+               retention = P30D
+               period = P1Y
+
+There is one archive database for each archive period (counting from the
+initial cycle point), named after the first cycle point of the period.
+
+Each run of the plugin copies up to ``max cycle points`` cycle points to an
+archive database in a background thread. The rows are removed from the suite
+databases on the next run (or at shutdown), unless rows have been added for
+these cycle points in the meantime, in which case they are copied again.
+
+Archived cycle points are no longer known to the scheduler. Tasks are spawned
+on demand, and the task history stops the scheduler from spawning (so
+running) a task again in the same flow. Future triggers (e.g.
+``foo[+P1] => bar``) can spawn tasks before the earliest cycle point in the
+task pool, so cycle points are kept for at least the largest future trigger
+offset of the suite, and ``retention`` must be set for suites with future
+triggers. A task re-triggered in an archived cycle point would start again
+from submit number 1, overwriting its job logs.
+
+SQLite reuses the space freed by archived rows for new rows, so the suite
+databases stop growing rather than shrink. The suite database is vacuumed
+on restart.
+
+``cylc report-timings`` reads the archive databases as well as the public
+database.
+
+"""
+import asyncio
+import os
+
+from cylc.flow import LOG
+from cylc.flow.cycling.loader import get_interval, get_point
+from cylc.flow.exceptions import UserInputError
+from cylc.flow.main_loop import periodic, shutdown, startup
+from cylc.flow.pathutil import get_suite_run_db_archive_dir
+from cylc.flow.rundb import CylcSuiteDAO
+
+
+@startup
+async def init(scheduler, state):
+    """Parse the retention and archive period settings."""
+    config = (
+        scheduler.main_loop_plugins['config']
+        .get('archive run db', {})
+    )
+    state['retention'] = None
+    if config.get('retention'):
+        state['retention'] = get_interval(config['retention'])
+    elif _get_max_future_offset(scheduler.config) is not None:
+        raise UserInputError(
+            'archive run db: "retention" must be set for suites with future'
+            ' triggers (e.g. "foo[+P1] => bar")')
+    state['period'] = None
+    if config.get('period'):
+        state['period'] = get_interval(config['period'])
+    state['max_cycles'] = config.get('max cycle points') or 100
+    state['period_start'] = None
+    # (path, cycles, number of rows, future) of the archive being written
+    state['archiving'] = None
+
+
+@periodic
+async def archive(scheduler, state):
+    """Archive the task history of old cycle points."""
+    pri_dao = scheduler.suite_db_mgr.pri_dao
+    if state['archiving'] is not None:
+        if state['archiving'][3].done():
+            _finish_archive(
+                pri_dao, state, scheduler.suite_db_mgr.put_delete_cycles)
+        return
+
+    period_start, cycles = _get_cycles(scheduler, state)
+    if not cycles:
+        return
+    path = get_suite_run_db_archive_dir(scheduler.suite, f'{period_start}.db')
+    rows = {
+        table_name: pri_dao.select_cycle_rows(table_name, cycles)
+        for table_name in CylcSuiteDAO.TABLES_ARCHIVED
+    }
+    state['archiving'] = (
+        path,
+        cycles,
+        sum(len(table_rows) for table_rows in rows.values()),
+        asyncio.get_event_loop().run_in_executor(
+            None, _write_archive, path, cycles, rows)
+    )
+
+
+@shutdown
+async def wait(scheduler, state):
+    """Finish the archive being written (if any).
+
+    Its cycle points must be removed from the suite databases, or their rows
+    would be in both. Shutdown coroutines run after the scheduler has closed
+    the suite databases, so the rows are deleted directly.
+
+    """
+    if state['archiving'] is None:
+        return
+    await state['archiving'][3]
+    db_mgr = scheduler.suite_db_mgr
+    daos = [
+        CylcSuiteDAO(db_mgr.pri_path),
+        CylcSuiteDAO(db_mgr.pub_path, is_public=True)
+    ]
+
+    def delete_cycles(cycles):
+        for dao in daos:
+            for table_name in CylcSuiteDAO.TABLES_ARCHIVED:
+                for cycle in cycles:
+                    dao.add_delete_item(table_name, {'cycle': cycle})
+            dao.execute_queued_items()
+
+    try:
+        _finish_archive(daos[0], state, delete_cycles)
+    finally:
+        for dao in daos:
+            dao.close()
+
+
+def _finish_archive(pri_dao, state, delete_cycles):
+    """Remove the archived cycle points from the suite databases.
+
+    Args:
+        pri_dao (cylc.flow.rundb.CylcSuiteDAO):
+            The private suite database.
+        state (dict):
+            The plugin state, with the archive being written.
+        delete_cycles (callable):
+            Remove the rows of a list of cycle points from the suite
+            databases.
+
+    """
+    path, cycles, n_rows, future = state['archiving']
+    state['archiving'] = None
+    future.result()
+    if _count_rows(pri_dao, cycles) == n_rows:
+        delete_cycles(cycles)
+        LOG.info(
+            f'Archived task history of {len(cycles)} cycle point(s)'
+            f' to {path}')
+    # Else rows were added whilst archiving, they will be copied again.
+
+
+def _count_rows(pri_dao, cycles):
+    """Return the number of task history rows of cycles."""
+    return sum(
+        pri_dao.count_cycle_rows(table_name, cycles)
+        for table_name in CylcSuiteDAO.TABLES_ARCHIVED
+    )
+
+
+def _get_max_future_offset(config):
+    """Return the largest future trigger offset of the suite (or None)."""
+    offsets = [
+        tdef.max_future_prereq_offset
+        for tdef in config.taskdefs.values()
+        if tdef.max_future_prereq_offset is not None
+    ]
+    if not offsets:
+        return None
+    return max(offsets)
+
+
+def _get_cycles(scheduler, state):
+    """Return the cycle points to archive next.
+
+    Cycle points are kept for the retention period or the largest future
+    trigger offset (whichever is longer) before the earliest cycle point in
+    the task pool.
+
+    Returns:
+        tuple - (period_start, cycles)
+
+        The first point of the archive period and the cycle point strings
+        (in that period) to archive.
+
+    """
+    if not scheduler.pool.sorted_points:
+        return None, []
+    earliest = scheduler.pool.sorted_points[0]
+    horizon = earliest
+    for margin in (
+        state['retention'], _get_max_future_offset(scheduler.config)
+    ):
+        if margin is not None:
+            horizon = min(horizon, earliest - margin)
+    points = {}
+    for cycle in scheduler.suite_db_mgr.pri_dao.select_task_states_cycles():
+        point = get_point(cycle)
+        if point < horizon:
+            points[point] = cycle
+    if not points:
+        return None, []
+    points = sorted(points.items())
+    period_start = _get_period_start(
+        points[0][0], scheduler.config.initial_point, state)
+    period_end = None
+    if state['period'] is not None:
+        period_end = period_start + state['period']
+    return period_start, [
+        cycle
+        for point, cycle in points[:state['max_cycles']]
+        if period_end is None or point < period_end
+    ]
+
+
+def _get_period_start(point, initial_point, state):
+    """Return the first point of the archive period containing point.
+
+    Periods are counted from the initial cycle point, earlier points belong to
+    the first period.
+
+    """
+    start = state['period_start']
+    if start is None or point < start:
+        start = initial_point
+    if state['period'] is not None:
+        while point >= start + state['period']:
+            start += state['period']
+    state['period_start'] = start
+    return start
+
+
+def _write_archive(path, cycles, rows):
+    """Write the task history rows of cycles to an archive database.
+
+    Existing rows of the cycles are replaced so this can be repeated.
+
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dao = CylcSuiteDAO(path)
+    try:
+        for table_name, table_rows in rows.items():
+            for cycle in cycles:
+                dao.add_delete_item(table_name, {'cycle': cycle})
+            for row in table_rows:
+                dao.add_insert_item(table_name, row)
+        dao.execute_queued_items()
+    finally:
+        dao.close()
@@ -0,0 +1,359 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Export scheduler metrics in the OpenMetrics text format.
+
+Metrics are written to the file
+``cylc.flow.main_loop.openmetrics.txt`` in the suite run directory each
+time this plugin runs. The file is replaced atomically so can be read
+by a "textfile" collector at any time. The file is removed when the suite
+shuts down.
+
+If a port is configured the metrics are also served over HTTP on
+``localhost``:
+
+.. code-block:: cylc
+
+   [scheduler]
+       [[main loop]]
+           plugins = openmetrics
+           [[[openmetrics]]]
+               interval = PT10S
+               port = 9120
+
+The exported metrics include:
+
+* Task pool and runahead pool sizes.
+* Active and queued tasks for each internal queue.
+* Queued and running commands in the subprocess pool.
+* Message, command and database queue lengths.
+* Public database writer backlog and lag.
+* Data store element counts and the size of the last publish.
+* Main loop phase durations (see ``cylc client <suite>
+  get_main_loop_timings``).
+
+"""
+import asyncio
+import os
+from pathlib import Path
+
+from cylc.flow import LOG
+from cylc.flow.main_loop import (startup, shutdown, periodic)
+
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+QUANTILES = (('0.5', 'p50'), ('0.95', 'p95'), ('1', 'max'))
+"""Map summary quantile labels onto PhaseTimings statistics."""
+WINDOW = 60
+"""The rolling window (seconds) over which quantiles are computed."""
+
+
+@startup
+async def init(scheduler, state):
+    """Start the HTTP server if a port is configured."""
+    state['path'] = Path(scheduler.suite_run_dir, f'{__name__}.txt')
+    state['text'] = _render(scheduler)
+    state['server'] = None
+    port = (
+        scheduler.main_loop_plugins['config']
+        .get('openmetrics', {})
+        .get('port')
+    )
+    if port is not None:
+        state['server'] = await asyncio.start_server(
+            lambda reader, writer: _serve(state, reader, writer),
+            host='127.0.0.1',
+            port=port
+        )
+        port = state['server'].sockets[0].getsockname()[1]
+        LOG.info(f'OpenMetrics: http://localhost:{port}/metrics')
+
+
+@periodic
+async def update(scheduler, state):
+    """Render the metrics and write them to the metrics file."""
+    state['text'] = _render(scheduler)
+    _write(state['text'], state['path'])
+
+
+@shutdown
+async def close(_, state):
+    """Stop the HTTP server and remove the metrics file."""
+    if state['server'] is not None:
+        state['server'].close()
+        await state['server'].wait_closed()
+    try:
+        os.unlink(state['path'])
+    except OSError:
+        pass
+
+
+def _write(text, path):
+    """Atomically (re)write the metrics file."""
+    tmp_path = Path(f'{path}.tmp')
+    with open(tmp_path, 'w') as handle:
+        handle.write(text)
+    os.replace(tmp_path, path)
+
+
+async def _serve(state, reader, writer):
+    """Respond to an HTTP request with the latest metrics."""
+    try:
+        await reader.readuntil(b'\r\n\r\n')
+        body = state['text'].encode()
+        writer.write(
+            (
+                'HTTP/1.1 200 OK\r\n'
+                f'Content-Type: {CONTENT_TYPE}\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                'Connection: close\r\n'
+                '\r\n'
+            ).encode() + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+def _escape(value):
+    r"""Escape a label value.
+
+    Examples:
+        >>> _escape('a"b\\c\nd')
+        'a\\"b\\\\c\\nd'
+
+    """
+    return (
+        str(value)
+        .replace('\\', r'\\')
+        .replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def _sample(name, value, labels):
+    """Return an OpenMetrics sample line.
+
+    Examples:
+        >>> _sample('foo', 1, {'a': 'b', 'c': 'd'})
+        'foo{a="b",c="d"} 1'
+
+    """
+    label_str = ','.join(
+        f'{key}="{_escape(val)}"' for key, val in labels.items()
+    )
+    return f'{name}{{{label_str}}} {value}'
+
+
+def _metric(lines, name, metric_type, help_, samples, labels):
+    """Add a metric family to lines.
+
+    Args:
+        lines (list):
+            The lines of the exposition to append to.
+        name (str):
+            The name of the metric family.
+        metric_type (str):
+            gauge, counter or summary.
+        help_ (str):
+            Description of the metric.
+        samples (iterable):
+            ``(suffix, value, extra_labels)`` tuples.
+        labels (dict):
+            Labels to add to every sample.
+
+    """
+    lines.append(f'# TYPE {name} {metric_type}')
+    lines.append(f'# HELP {name} {help_}')
+    for suffix, value, extra_labels in samples:
+        lines.append(
+            _sample(f'{name}{suffix}', value, {**labels, **extra_labels})
+        )
+
+
+def _queue_counts(pool):
+    """Return {queue: (n_active, n_queued)} for the internal queues."""
+    return {
+        queue: (counter.n_active, len(counter.queued))
+        for queue, counter in pool.queue_counters.items()
+    }
+
+
+def _db_queue_lengths(suite_db_mgr):
+    """Return {(db, op): n_items} for items waiting to be written."""
+    ret = {
+        ('manager', 'delete'): sum(
+            len(items) for items in suite_db_mgr.db_deletes_map.values()),
+        ('manager', 'insert'): sum(
+            len(items) for items in suite_db_mgr.db_inserts_map.values()),
+        ('manager', 'update'): sum(
+            len(items) for items in suite_db_mgr.db_updates_map.values()),
+    }
+    dao = suite_db_mgr.pri_dao
+    if dao is not None:
+        ret[('private', 'delete')] = 0
+        ret[('private', 'insert')] = 0
+        ret[('private', 'update')] = 0
+        for table in dao.tables.values():
+            ret[('private', 'delete')] += sum(
+                len(items) for items in table.delete_queues.values())
+            ret[('private', 'insert')] += len(table.insert_queue)
+            ret[('private', 'update')] += sum(
+                len(items) for items in table.update_queues.values())
+    return ret
+
+
+def _data_store_counts(data_store_mgr):
+    """Return {element_type: n_elements} for the data store."""
+    data = data_store_mgr.data[data_store_mgr.workflow_id]
+    return {
+        key: len(value)
+        for key, value in data.items()
+        if key != 'workflow'
+    }
+
+
+def _render(scheduler):
+    """Return the scheduler metrics in the OpenMetrics text format."""
+    labels = {'suite': scheduler.suite}
+    lines = []
+    pool = scheduler.pool
+
+    _metric(
+        lines, 'cylc_task_pool_tasks', 'gauge',
+        'Number of tasks in the main task pool.',
+        [('', len(pool.get_tasks()), {})],
+        labels
+    )
+    _metric(
+        lines, 'cylc_runahead_pool_tasks', 'gauge',
+        'Number of tasks in the runahead pool.',
+        [('', len(pool.get_rh_tasks()), {})],
+        labels
+    )
+    queue_counts = _queue_counts(pool)
+    _metric(
+        lines, 'cylc_queue_active_tasks', 'gauge',
+        'Number of preparing, submitted or running tasks in each queue.',
+        [
+            ('', n_active, {'queue': queue})
+            for queue, (n_active, _) in sorted(queue_counts.items())
+        ],
+        labels
+    )
+    _metric(
+        lines, 'cylc_queue_queued_tasks', 'gauge',
+        'Number of queued tasks in each queue.',
+        [
+            ('', n_queued, {'queue': queue})
+            for queue, (_, n_queued) in sorted(queue_counts.items())
+        ],
+        labels
+    )
+    _metric(
+        lines, 'cylc_subproc_pool_commands', 'gauge',
+        'Number of commands in the subprocess pool.',
+        [
+            ('', len(scheduler.proc_pool.queuings), {'state': 'queued'}),
+            ('', len(scheduler.proc_pool.runnings), {'state': 'running'}),
+        ],
+        labels
+    )
+    _metric(
+        lines, 'cylc_scheduler_queue_items', 'gauge',
+        'Number of items waiting in the scheduler queues.',
+        [
+            ('', scheduler.message_queue.qsize(), {'queue': 'message'}),
+            ('', scheduler.command_queue.qsize(), {'queue': 'command'}),
+            (
+                '',
+                scheduler.ext_trigger_queue.qsize(),
+                {'queue': 'ext_trigger'}
+            ),
+        ],
+        labels
+    )
+    _metric(
+        lines, 'cylc_db_queue_items', 'gauge',
+        'Number of items waiting to be written to the suite databases.',
+        [
+            ('', value, {'db': db, 'op': op})
+            for (db, op), value in sorted(
+                _db_queue_lengths(scheduler.suite_db_mgr).items())
+        ],
+        labels
+    )
+    pub_writer = scheduler.suite_db_mgr.pub_writer
+    if pub_writer is not None:
+        _metric(
+            lines, 'cylc_db_public_writer_batches', 'gauge',
+            'Number of batches waiting to be written to the public database.',
+            [('', pub_writer.queue.qsize(), {})],
+            labels
+        )
+        _metric(
+            lines, 'cylc_db_public_writer_lag_seconds', 'gauge',
+            'Time taken for the last write to reach the public database.',
+            [('', pub_writer.lag, {})],
+            labels
+        )
+        _metric(
+            lines, 'cylc_db_public_writer_coalesced_batches', 'gauge',
+            'Number of batches combined in the last public database write.',
+            [('', pub_writer.n_coalesced, {})],
+            labels
+        )
+    _metric(
+        lines, 'cylc_data_store_elements', 'gauge',
+        'Number of elements of each type in the data store.',
+        [
+            ('', value, {'type': key})
+            for key, value in sorted(
+                _data_store_counts(scheduler.data_store_mgr).items())
+        ],
+        labels
+    )
+    _metric(
+        lines, 'cylc_publish_bytes', 'gauge',
+        'Size of each topic in the last data store publish.',
+        [
+            ('', delta.ByteSize(), {'topic': topic.decode()})
+            for topic, delta, _ in (
+                scheduler.data_store_mgr.publish_deltas)
+        ],
+        labels
+    )
+    timings = scheduler.main_loop_timings
+    summary = timings.summary(windows=[WINDOW])
+    samples = []
+    for phase, (count, total) in sorted(timings.totals.items()):
+        stats = summary.get(phase, {}).get(str(WINDOW))
+        if stats:
+            samples.extend(
+                ('', stats[key], {'phase': phase, 'quantile': quantile})
+                for quantile, key in QUANTILES
+            )
+        samples.append(('_count', count, {'phase': phase}))
+        samples.append(('_sum', total, {'phase': phase}))
+    _metric(
+        lines, 'cylc_main_loop_phase_seconds', 'summary',
+        f'Duration of each main loop phase (quantiles over {WINDOW}s).',
+        samples,
+        labels
+    )
+    lines.append('# EOF\n')
+    return '\n'.join(lines)
@@ -399,6 +399,38 @@ class SuiteRuntimeServer(ZMQSocketBase):
             group_all=group_all,
             ungroup_all=ungroup_all)
 
+    @authorise()
+    @expose
+    def get_main_loop_timings(self, windows=None):
+        """Return the time taken by each phase of the scheduler main loop.
+
+        Timings are recorded continuously, this returns statistics for
+        rolling windows ending now.
+
+        Args:
+            windows (list, optional):
+                Lengths of the rolling windows in seconds, defaults to
+                ``[60, 300, 900]``. Samples are kept for 900 seconds so
+                longer windows only cover the last 900 seconds.
+
+        Returns:
+            dict: {phase: {window: {count, mean, p50, p95, max}}}
+
+            phase (str):
+                The name of the main loop phase, ``main_loop`` is the
+                duration of the whole loop excluding the sleep.
+            window (str):
+                The length of the window in seconds.
+            count (int):
+                The number of times the phase ran in the window.
+            mean, p50, p95, max (float):
+                Duration statistics in seconds.
+
+            Statistics are ``None`` for windows which contain no samples.
+
+        """
+        return self.schd.main_loop_timings.summary(windows=windows)
+
     # UIServer Data Commands
     @authorise()
     @expose
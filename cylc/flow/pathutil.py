@@ -89,6 +89,11 @@ def get_suite_run_pub_db_name(suite):
     return expandvars(get_suite_run_dir(suite, 'log', 'db'))
 
 
+def get_suite_run_db_archive_dir(suite, *args):
+    """Return suite run database archive directory, join any extra args."""
+    return expandvars(get_suite_run_dir(suite, 'log', 'db-archive', *args))
+
+
 def get_suite_run_share_dir(suite, *args):
     """Return local suite work/share directory, join any extra args."""
     return expandvars(os.path.join(
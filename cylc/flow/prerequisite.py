@@ -16,7 +16,9 @@
 
 """Functionality for expressing and evaluating logical triggers."""
 
+from functools import lru_cache
 import math
+import re
 
 from cylc.flow import ID_DELIM
 from cylc.flow.conditional_simplifier import ConditionalSimplifier
@@ -25,6 +27,97 @@ from cylc.flow.exceptions import TriggerExpressionError
 from cylc.flow.data_messages_pb2 import PbPrerequisite, PbCondition
 
 
+class Condition:
+    """A compiled conditional trigger expression.
+
+    The expression is stored as a template in which each term (task output) is
+    replaced by a numbered placeholder, e.g. ``{0}|({1}&{2})``. This makes it
+    independent of the cycle point so a single Condition can be shared by the
+    prerequisites of every instance of a task.
+
+    Use Condition.get rather than the constructor to share Conditions.
+
+    Examples:
+        >>> cond = Condition.get('{0}|({1}&{2})')
+        >>> cond is Condition.get('{0}|({1}&{2})')
+        True
+        >>> cond.evaluate([False, True, False])
+        False
+        >>> cond.evaluate([False, True, 'satisfied naturally'])
+        True
+        >>> cond.render(['a', 'b', 'c'])
+        'a|(b&c)'
+
+    """
+
+    __slots__ = ['template', 'code']
+
+    REC_TERMS = re.compile(r'([&|()])')
+
+    def __init__(self, template):
+        self.template = template
+        src = template.format(*(
+            f'_s[{ind}]' for ind in range(template.count('{'))))
+        try:
+            self.code = compile(src, '<trigger expression>', 'eval')
+        except (SyntaxError, ValueError) as exc:
+            err_msg = str(exc)
+            if err_msg.find("unexpected EOF") != -1:
+                err_msg += (
+                    " (could be unmatched parentheses in the graph string?)")
+            raise TriggerExpressionError('"%s":\n%s' % (template, err_msg))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get(template):
+        """Return the (shared) Condition for template."""
+        return Condition(template)
+
+    @classmethod
+    def from_expression(cls, expr, messages):
+        """Return a Condition and its terms from a trigger expression.
+
+        Args:
+            expr (str):
+                Trigger expression in the graph format,
+                e.g. "a.1 succeeded|b.1 succeeded".
+            messages (dict):
+                Map of message strings (e.g. "a.1 succeeded") to the terms
+                they represent.
+
+        Returns:
+            tuple - (Condition, [term, ...])
+
+        """
+        template = []
+        terms = []
+        for item in cls.REC_TERMS.split(expr):
+            if item in {'&', '|', '(', ')'}:
+                template.append(item)
+                continue
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                terms.append(messages[item])
+            except KeyError:
+                raise TriggerExpressionError(
+                    f'"{expr}":\nunknown trigger "{item}"')
+            template.append('{%d}' % (len(terms) - 1))
+        return cls.get(''.join(template)), terms
+
+    def evaluate(self, values):
+        """Evaluate the expression for values of its terms (in order)."""
+        return eval(  # nosec
+            self.code,
+            {'__builtins__': {}},
+            {'_s': [bool(value) for value in values]})
+
+    def render(self, strings):
+        """Return the expression with its terms replaced by strings."""
+        return self.template.format(*strings)
+
+
 class Prerequisite:
     """The concrete result of an abstract logical trigger expression.
 
@@ -35,15 +128,18 @@ class Prerequisite:
     corresponding to parenthesised expressions in Cylc graphs (e.g.
     `(a & b) => c` or `(a | b) => c`). For the OR operator (`|`), only one
     message has to be satisfied for the Prerequisite to be satisfied.
+
+    The messages are held in a tuple and the state of each is held in integer
+    bitmasks (bit `i` represents `messages[i]`), the conditional expression
+    and its terms are shared with the other instances of the task (see
+    cylc.flow.task_trigger.Dependency.get_prerequisite).
     """
 
     # Memory optimization - constrain possible attributes to this list.
-    __slots__ = ["satisfied", "_all_satisfied",
-                 "target_point_strings", "start_point",
-                 "pre_initial_messages", "conditional_expression", "point"]
+    __slots__ = ["messages", "_satisfied", "_forced", "_pre_initial",
+                 "_dropped", "_all_satisfied", "_states", "start_point",
+                 "conditional_expression", "condition_terms", "point"]
 
-    # Extracts T from "foo.T succeeded" etc.
-    SATISFIED_TEMPLATE = 'bool(self.satisfied[("%s", "%s", "%s")])'
     MESSAGE_TEMPLATE = '%s.%s %s'
 
     DEP_STATE_SATISFIED = 'satisfied naturally'
@@ -59,27 +155,77 @@ class Prerequisite:
         # cylc.flow.cycling.PointBase
         self.start_point = start_point
 
-        # List of cycle point strings that this prerequisite depends on.
-        self.target_point_strings = []
+        # Messages pertaining to this prerequisite.
+        # (('task name', 'point string', 'output'), ...)
+        self.messages = ()
 
-        # Dictionary of messages pertaining to this prerequisite.
-        # {('task name', 'point string', 'output'): DEP_STATE_X, ...}
-        self.satisfied = {}
+        # Bitmasks of the messages satisfied naturally and force satisfied.
+        self._satisfied = 0
+        self._forced = 0
 
-        # Messages pertaining to pre-initial dependencies.
-        # ['task name', 'point string' ,'output']
-        self.pre_initial_messages = []
+        # Bitmask of the messages pertaining to pre-initial dependencies.
+        self._pre_initial = 0
+
+        # Messages dropped by pre-initial or pre warm-start simplification.
+        # (('task name', 'point string', 'output'), ...)
+        self._dropped = ()
 
         # Expression present only when conditions are used.
-        # 'foo.1 failed & bar.1 succeeded'
+        # cylc.flow.prerequisite.Condition
         self.conditional_expression = None
 
+        # The index (in self.messages) of each term of the conditional
+        # expression.
+        self.condition_terms = None
+
         # The cached state of this prerequisite:
         # * `None` (no cached state)
         # * `True` (prerequisite satisfied)
         # * `False` (prerequisite unsatisfied).
         self._all_satisfied = None
 
+        # The cached state of each message (see self.satisfied), or None.
+        self._states = None
+
+    @property
+    def satisfied(self):
+        """Return the state of each message of this prerequisite.
+
+        The dict is cached until the state of a message changes, do not
+        modify it.
+
+        Returns:
+            dict: {('task name', 'point string', 'output'): DEP_STATE_X, ...}
+
+        """
+        if self._states is None:
+            self._states = {
+                message: self._get_state(1 << ind)
+                for ind, message in enumerate(self.messages)
+            }
+        return self._states
+
+    @property
+    def target_point_strings(self):
+        """Return the cycle point strings that this prerequisite depends on.
+
+        Includes messages dropped by pre-initial simplification.
+
+        """
+        return list(dict.fromkeys(
+            message[1]
+            for message in self.messages + self._dropped
+            if message[1]
+        ))
+
+    def _get_state(self, bit):
+        """Return the DEP_STATE_X of the message represented by bit."""
+        if self._satisfied & bit:
+            return self.DEP_STATE_SATISFIED
+        if self._forced & bit:
+            return self.DEP_STATE_OVERRIDDEN
+        return self.DEP_STATE_UNSATISFIED
+
     def add(self, name, point, output, pre_initial=False):
         """Register an output with this prerequisite.
 
@@ -90,17 +236,67 @@ class Prerequisite:
             output (str): String representing the output e.g. "succeeded".
             pre_initial (bool): Set this output as a pre-initial dependency.
 
+        Returns:
+            tuple: The message (name, point_string, output).
+
         """
         message = (name, str(point), output)
 
         # Add a new prerequisite message in an UNSATISFIED state.
-        self.satisfied[message] = self.DEP_STATE_UNSATISFIED
+        try:
+            bit = 1 << self.messages.index(message)
+        except ValueError:
+            bit = 1 << len(self.messages)
+            self.messages += (message,)
+        else:
+            self._satisfied &= ~bit
+            self._forced &= ~bit
         if self._all_satisfied is not None:
             self._all_satisfied = False
-        if point and str(point) not in self.target_point_strings:
-            self.target_point_strings.append(str(point))
-        if pre_initial and message not in self.pre_initial_messages:
-            self.pre_initial_messages.append(message)
+        self._states = None
+        if pre_initial:
+            self._pre_initial |= bit
+        return message
+
+    def set_messages(self, messages, pre_initial=0):
+        """Register all the outputs of this prerequisite at once.
+
+        Args:
+            messages (list):
+                [('task name', 'point string', 'output'), ...], the message
+                of each term, in order (a message may appear more than once).
+            pre_initial (int):
+                Bitmask of the messages which are pre-initial dependencies.
+
+        """
+        self.messages = tuple(messages)
+        self._satisfied = 0
+        self._forced = 0
+        self._pre_initial = pre_initial
+        self._all_satisfied = None
+        self._states = None
+
+    def set_message_states(self, states):
+        """Set the state of each message, e.g. when loading from the DB.
+
+        Resets the cached state (self._all_satisfied).
+
+        Args:
+            states (dict):
+                {('task name', 'point string', 'output'): DEP_STATE_X, ...}
+                for each message of this prerequisite.
+
+        """
+        self._satisfied = 0
+        self._forced = 0
+        for ind, message in enumerate(self.messages):
+            state = states[message]
+            if state == self.DEP_STATE_SATISFIED:
+                self._satisfied |= 1 << ind
+            elif state:
+                self._forced |= 1 << ind
+        self._all_satisfied = None
+        self._states = None
 
     def get_raw_conditional_expression(self):
         """Return a representation of this prereq as a string.
@@ -108,52 +304,123 @@ class Prerequisite:
         Returns None if this prerequisite is not a conditional one.
 
         """
-        expr = self.conditional_expression
-        if not expr:
+        if not self.conditional_expression:
             return None
-        for message in self.satisfied:
-            expr = expr.replace(self.SATISFIED_TEMPLATE % message,
-                                self.MESSAGE_TEMPLATE % message)
-        return expr
+        return self.conditional_expression.render(
+            self.MESSAGE_TEMPLATE % self.messages[ind]
+            for ind in self.condition_terms)
 
     def set_condition(self, expr):
         """Set the conditional expression for this prerequisite.
 
         Resets the cached state (self._all_satisfied).
 
+        Args:
+            expr (str):
+                Trigger expression in the graph format,
+                e.g. "a.1 succeeded|b.1 succeeded".
+
         """
+        drop_these = self._drop_messages()
+        if '|' in expr:
+            self._set_condition_expr(expr, drop_these)
 
-        drop_these = []
-        self._all_satisfied = None
+    def set_compiled_condition(self, condition, terms):
+        """Set a pre-compiled conditional expression for this prerequisite.
 
-        if self.pre_initial_messages:
-            for message in self.pre_initial_messages:
-                drop_these.append(message)
+        Resets the cached state (self._all_satisfied).
+
+        Args:
+            condition (Condition):
+                The conditional expression or None if there is no "|".
+            terms (tuple):
+                The index (in self.messages) of each term of the condition,
+                shared with the other prerequisites of the dependency.
+
+        """
+        messages = self.messages
+        drop_these = self._drop_messages()
+        if condition is None:
+            return
+        if drop_these:
+            # Simplify the expression for this prerequisite only.
+            self._set_condition_expr(
+                condition.render(
+                    self.MESSAGE_TEMPLATE % messages[ind] for ind in terms),
+                drop_these)
+        else:
+            self.conditional_expression = condition
+            self.condition_terms = terms
+
+    def _set_condition_expr(self, expr, drop_these):
+        """Simplify and compile the trigger expression expr."""
+        if drop_these:
+            simpler = ConditionalSimplifier(
+                expr, [self.MESSAGE_TEMPLATE % m for m in drop_these])
+            expr = simpler.get_cleaned()
+        if not self.messages:
+            # No prerequisites left after pre-initial simplification.
+            return
+        self.conditional_expression, terms = Condition.from_expression(
+            expr,
+            {
+                self.MESSAGE_TEMPLATE % message: ind
+                for ind, message in enumerate(self.messages)
+            }
+        )
+        self.condition_terms = tuple(terms)
+
+    def _drop_messages(self):
+        """Drop pre-initial and pre warm-start messages.
+
+        Resets the cached state (self._all_satisfied).
+
+        Return the dropped messages.
+
+        """
+        self._all_satisfied = None
+        self._states = None
+        drop = self._pre_initial
+        self._pre_initial = 0
 
         # Needed to drop pre warm-start dependence:
-        for message in self.satisfied:
-            if message in drop_these:
-                continue
-            if self.start_point:
+        if self.start_point:
+            for ind, message in enumerate(self.messages):
                 if message[1]:  # Cycle point.
                     if get_point(message[1]) < self.start_point <= self.point:
                         # Drop if outside of relevant point range.
-                        drop_these.append(message)
+                        drop |= 1 << ind
 
-        for message in drop_these:
-            if message in self.satisfied:
-                self.satisfied.pop(message)
-
-        if '|' in expr:
-            if drop_these:
-                simpler = ConditionalSimplifier(
-                    expr, [self.MESSAGE_TEMPLATE % m for m in drop_these])
-                expr = simpler.get_cleaned()
-            # Make a Python expression so we can eval() the logic.
-            for message in self.satisfied:
-                expr = expr.replace(self.MESSAGE_TEMPLATE % message,
-                                    self.SATISFIED_TEMPLATE % message)
-            self.conditional_expression = expr
+        if not drop:
+            return []
+        drop_these = []
+        keep = []
+        satisfied = 0
+        forced = 0
+        for ind, message in enumerate(self.messages):
+            bit = 1 << ind
+            if drop & bit:
+                drop_these.append(message)
+                continue
+            if self._satisfied & bit:
+                satisfied |= 1 << len(keep)
+            if self._forced & bit:
+                forced |= 1 << len(keep)
+            keep.append(message)
+        self.messages = tuple(keep)
+        self._satisfied = satisfied
+        self._forced = forced
+        self._dropped += tuple(drop_these)
+        return drop_these
+
+    def _evaluate(self):
+        """Evaluate the prerequisite. Does not cache the result."""
+        if self.conditional_expression is None:
+            return (
+                (self._satisfied | self._forced)
+                == (1 << len(self.messages)) - 1
+            )
+        return self._conditional_is_satisfied()
 
     def is_satisfied(self):
         """Return True if prerequisite is satisfied.
@@ -165,14 +432,10 @@ class Prerequisite:
             return self._all_satisfied
         else:
             # No cached value.
-            if self.satisfied == {}:
+            if not self.messages:
                 # No prerequisites left after pre-initial simplification.
                 return True
-            if self.conditional_expression:
-                # Trigger expression with at least one '|': use eval.
-                self._all_satisfied = self._conditional_is_satisfied()
-            else:
-                self._all_satisfied = all(self.satisfied.values())
+            self._all_satisfied = self._evaluate()
             return self._all_satisfied
 
     def _conditional_is_satisfied(self):
@@ -181,16 +444,9 @@ class Prerequisite:
         Does not cache the result.
 
         """
-        try:
-            res = eval(self.conditional_expression)
-        except (SyntaxError, ValueError) as exc:
-            err_msg = str(exc)
-            if str(exc).find("unexpected EOF") != -1:
-                err_msg += (
-                    " (could be unmatched parentheses in the graph string?)")
-            raise TriggerExpressionError(
-                '"%s":\n%s' % (self.get_raw_conditional_expression(), err_msg))
-        return res
+        mask = self._satisfied | self._forced
+        return self.conditional_expression.evaluate(
+            (mask >> ind) & 1 for ind in self.condition_terms)
 
     def satisfy_me(self, all_task_outputs):
         """Evaluate pre-requisite against known outputs.
@@ -198,58 +454,62 @@ class Prerequisite:
         Updates cache with the evaluation result.
 
         """
-        relevant_messages = all_task_outputs & set(self.satisfied)
-        for message in relevant_messages:
-            self.satisfied[message] = self.DEP_STATE_SATISFIED
-            if self.conditional_expression is None:
-                self._all_satisfied = all(self.satisfied.values())
-            else:
-                self._all_satisfied = self._conditional_is_satisfied()
+        relevant_messages = set()
+        for ind, message in enumerate(self.messages):
+            if message in all_task_outputs:
+                relevant_messages.add(message)
+                self._satisfied |= 1 << ind
+                self._forced &= ~(1 << ind)
+        if relevant_messages:
+            self._all_satisfied = self._evaluate()
+            self._states = None
         return relevant_messages
 
     def dump(self):
         """ Return an array of strings representing each message and its state.
         """
         res = []
+        satisfied = self.satisfied
         if self.conditional_expression:
             temp = self.get_raw_conditional_expression()
             messages = []
-            num_length = math.ceil(len(self.satisfied) / 10)
-            for ind, message_tuple in enumerate(sorted(self.satisfied)):
+            num_length = math.ceil(len(satisfied) / 10)
+            for ind, message_tuple in enumerate(sorted(satisfied)):
                 message = self.MESSAGE_TEMPLATE % message_tuple
                 char = '%.{0}d'.format(num_length) % ind
                 messages.append(['\t%s = %s' % (char, message),
-                                 bool(self.satisfied[message_tuple])])
+                                 bool(satisfied[message_tuple])])
                 temp = temp.replace(message, char)
             temp = temp.replace('|', ' | ')
             temp = temp.replace('&', ' & ')
             res.append([temp, self.is_satisfied()])
             res.extend(messages)
-        elif self.satisfied:
-            for message, val in self.satisfied.items():
+        elif satisfied:
+            for message, val in satisfied.items():
                 res.append([self.MESSAGE_TEMPLATE % message, val])
         # (Else trigger wiped out by pre-initial simplification.)
         return res
 
     def api_dump(self, workflow_id):
         """Return list of populated Protobuf data objects."""
-        if not self.satisfied:
+        if not self.messages:
             return None
+        satisfied = self.satisfied
         if self.conditional_expression:
             temp = self.get_raw_conditional_expression()
             temp = temp.replace('|', ' | ')
             temp = temp.replace('&', ' & ')
         else:
-            for s_msg in self.satisfied:
+            for s_msg in satisfied:
                 temp = self.MESSAGE_TEMPLATE % s_msg
         conds = []
-        num_length = math.ceil(len(self.satisfied) / 10)
-        for ind, message_tuple in enumerate(sorted(self.satisfied)):
+        num_length = math.ceil(len(satisfied) / 10)
+        for ind, message_tuple in enumerate(sorted(satisfied)):
             name, point = message_tuple[0:2]
             t_id = f"{workflow_id}{ID_DELIM}{point}{ID_DELIM}{name}"
             char = 'c%.{0}d'.format(num_length) % ind
             c_msg = self.MESSAGE_TEMPLATE % message_tuple
-            c_val = self.satisfied[message_tuple]
+            c_val = satisfied[message_tuple]
             c_bool = bool(c_val)
             if c_bool is False:
                 c_val = "unsatisfied"
@@ -276,9 +536,8 @@ class Prerequisite:
         State can be overridden by calling `self.satisfy_me`.
 
         """
-        for message in self.satisfied:
-            if not self.satisfied[message]:
-                self.satisfied[message] = self.DEP_STATE_OVERRIDDEN
+        self._forced = ((1 << len(self.messages)) - 1) & ~self._satisfied
+        self._states = None
         if self.conditional_expression is None:
             self._all_satisfied = True
         else:
@@ -290,9 +549,10 @@ class Prerequisite:
         State can be overridden by calling `self.satisfy_me`.
 
         """
-        for message in self.satisfied:
-            self.satisfied[message] = self.DEP_STATE_UNSATISFIED
-        if not self.satisfied:
+        self._satisfied = 0
+        self._forced = 0
+        self._states = None
+        if not self.messages:
             self._all_satisfied = True
         elif self.conditional_expression is None:
             self._all_satisfied = False
@@ -310,6 +570,7 @@ class Prerequisite:
         E.G: ['foo.1', 'bar.2']
 
         """
-        return [f'{name}.{point}' for
-                (name, point, _), satisfied in self.satisfied.items() if
-                satisfied == self.DEP_STATE_SATISFIED]
+        return list(dict.fromkeys(
+            f'{name}.{point}' for
+            ind, (name, point, _) in enumerate(self.messages) if
+            self._satisfied & (1 << ind)))
@@ -15,11 +15,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Cylc memory and performance profiling."""
 
+from collections import deque
+from contextlib import contextmanager
 import os
 import cProfile
 import io
 from pathlib import Path
 import pstats
+from time import time
 
 import psutil
 
@@ -69,3 +72,121 @@ class Profiler:
             return
         memory = psutil.Process(os.getpid()).memory_info().rss / 1024
         print("PROFILE: Memory: %d KiB: %s" % (memory, message))
+
+
+class PhaseTimings:
+    """Record the time spent in each phase of the scheduler main loop.
+
+    This is always on so must be cheap, each phase keeps a deque of
+    ``(start_time, duration)`` samples covering the last MAX_AGE seconds
+    which is only summarised on request.
+
+    Summaries are read by the network server thread whilst samples are
+    written by the main loop, the deques are copied (atomically under the
+    GIL) before summarising.
+
+    Examples:
+        >>> timings = PhaseTimings()
+        >>> for duration in (1, 2, 3, 4):
+        ...     timings.add('foo', time(), duration)
+        >>> timings.summary(windows=[60])['foo']['60']
+        {'count': 4, 'mean': 2.5, 'p50': 3, 'p95': 4, 'max': 4}
+
+        Samples older than max_age are dropped:
+        >>> timings = PhaseTimings(max_age=10)
+        >>> for start in (0, 5, 10, 15):
+        ...     timings.add('foo', start, 1)
+        >>> list(timings.phases['foo'])
+        [(5, 1), (10, 1), (15, 1)]
+
+    """
+
+    WINDOWS = (60, 300, 900)
+    """Default rolling windows to summarise over (seconds)."""
+
+    MAX_AGE = max(WINDOWS)
+    """Age of the oldest samples to keep for each phase (seconds)."""
+
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self.phases = {}
+        # cumulative [count, total duration] for each phase
+        self.totals = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with statement as the named phase."""
+        start = time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time() - start)
+
+    def add(self, name, start, duration):
+        """Add a sample for the named phase."""
+        try:
+            samples = self.phases[name]
+            totals = self.totals[name]
+        except KeyError:
+            samples = self.phases[name] = deque()
+            totals = self.totals[name] = [0, 0.0]
+        samples.append((start, duration))
+        while start - samples[0][0] > self.max_age:
+            samples.popleft()
+        totals[0] += 1
+        totals[1] += duration
+
+    def summary(self, windows=None, now=None):
+        """Return timing statistics for each phase over rolling windows.
+
+        Args:
+            windows (list):
+                Lengths of the rolling windows in seconds, windows longer
+                than max_age only cover the last max_age seconds.
+            now (float):
+                The unix time at which the windows end.
+
+        Returns:
+            dict - {phase: {window: {count, mean, p50, p95, max}}}
+
+            Windows are keyed by their length as a string, statistics for
+            windows without any samples are None.
+
+        """
+        if windows is None:
+            windows = self.WINDOWS
+        if now is None:
+            now = time()
+        ret = {}
+        for name, samples in list(self.phases.items()):
+            samples = list(samples)
+            ret[name] = {}
+            for window in windows:
+                ret[name][str(window)] = self._stats([
+                    duration
+                    for start, duration in samples
+                    if now - start <= float(window)
+                ])
+        return ret
+
+    @staticmethod
+    def _stats(durations):
+        """Return count, mean, p50, p95 and max for a list of durations.
+
+        Examples:
+            >>> PhaseTimings._stats([])
+            >>> PhaseTimings._stats([5, 1, 3])
+            {'count': 3, 'mean': 3.0, 'p50': 3, 'p95': 5, 'max': 5}
+
+        """
+        if not durations:
+            return None
+        durations = sorted(durations)
+        count = len(durations)
+        return {
+            'count': count,
+            'mean': sum(durations) / count,
+            'p50': durations[int(0.5 * count)],
+            'p95': durations[min(int(0.95 * count), count - 1)],
+            'max': durations[-1]
+        }
@@ -17,6 +17,7 @@
 
 import sqlite3
 import traceback
+from itertools import chain
 from os.path import expandvars
 
 from cylc.flow import LOG
@@ -42,8 +43,9 @@ class CylcSuiteDAOTable:
     FMT_INSERT = "INSERT OR REPLACE INTO %(name)s VALUES(%(values_str)s)"
     FMT_UPDATE = "UPDATE %(name)s SET %(set_str)s%(where_str)s"
 
-    __slots__ = ('name', 'columns', 'delete_queues', 'insert_queue',
-                 'update_queues')
+    __slots__ = ('name', 'columns', 'primary_keys', 'delete_queues',
+                 'insert_queue', 'insert_index', 'update_queues',
+                 'update_rows')
 
     def __init__(self, name, column_items):
         self.name = name
@@ -57,9 +59,24 @@ class CylcSuiteDAOTable:
                 name,
                 attrs.get("datatype", "TEXT"),
                 attrs.get("is_primary_key", False)))
+        self.primary_keys = [
+            column.name for column in self.columns if column.is_primary_key]
         self.delete_queues = {}
         self.insert_queue = []
+        # {primary_key_values: index in insert_queue}
+        self.insert_index = {}
         self.update_queues = {}
+        # Updates to single rows merged by WHERE clause:
+        # {((column, value), ...): set_args}
+        self.update_rows = {}
+
+    def clear(self):
+        """Clear the queues."""
+        self.delete_queues.clear()
+        self.insert_queue.clear()
+        self.insert_index.clear()
+        self.update_queues.clear()
+        self.update_rows.clear()
 
     def get_create_stmt(self):
         """Return an SQL statement to create this table."""
@@ -126,7 +143,20 @@ class CylcSuiteDAOTable:
         else:
             stmt_args = [
                 args.get(column.name, None) for column in self.columns]
-        self.insert_queue.append(stmt_args)
+        if not self.primary_keys:
+            self.insert_queue.append(stmt_args)
+            return
+        # Only the last INSERT OR REPLACE of a row counts.
+        key = tuple(
+            value
+            for column, value in zip(self.columns, stmt_args)
+            if column.is_primary_key
+        )
+        try:
+            self.insert_queue[self.insert_index[key]] = stmt_args
+        except KeyError:
+            self.insert_index[key] = len(self.insert_queue)
+            self.insert_queue.append(stmt_args)
 
     def add_update_item(self, set_args, where_args):
         """Queue an UPDATE item.
@@ -135,7 +165,52 @@ class CylcSuiteDAOTable:
         where_args should be a dict, update will only apply to rows matching
         all these items.
 
+        Updates to a single row (where_args is the primary key) are merged,
+        the last value set for each column wins.
+
+        """
+        key = None
+        if self.primary_keys and where_args:
+            key = tuple(
+                (column.name, where_args[column.name])
+                for column in self.columns
+                if column.name in where_args
+            )
+        if (
+                key is not None
+                and [name for name, _ in key] == self.primary_keys
+                and not any(name in set_args for name in self.primary_keys)
+        ):
+            self.update_rows.setdefault(key, {}).update(set_args)
+        else:
+            # Keep the order of merged updates and other updates.
+            self.flush_update_rows(is_final=False)
+            self._queue_update_stmt(set_args, where_args)
+
+    def flush_update_rows(self, is_final=True):
+        """Move merged single row updates to the statement queues.
+
+        INSERTs are executed before UPDATEs, so when the batch is final an
+        update to a row with a queued INSERT is applied to the INSERT instead.
+
         """
+        for key, set_args in self.update_rows.items():
+            if is_final:
+                try:
+                    row = self.insert_queue[
+                        self.insert_index[tuple(value for _, value in key)]]
+                except KeyError:
+                    pass
+                else:
+                    for i, column in enumerate(self.columns):
+                        if column.name in set_args:
+                            row[i] = set_args[column.name]
+                    continue
+            self._queue_update_stmt(set_args, dict(key))
+        self.update_rows.clear()
+
+    def _queue_update_stmt(self, set_args, where_args):
+        """Queue an UPDATE statement."""
         set_strs = []
         stmt_args = []
         for column in self.columns:
@@ -297,15 +372,43 @@ class CylcSuiteDAO:
         ],
     }
 
-    def __init__(self, db_file_name=None, is_public=False):
+    # Secondary indexes for queries not served by the primary keys:
+    # {index_name: (table_name, [column_name, ...])}
+    INDEXES = {
+        # suite_state_query (cylc suite-state, suite_state xtrigger) by cycle
+        "task_states_cycle_status": (
+            TABLE_TASK_STATES, ["cycle", "status"]),
+        # database archiving by cycle
+        "task_events_cycle": (TABLE_TASK_EVENTS, ["cycle"]),
+    }
+
+    # Task history tables whose old rows may be moved to archive databases.
+    TABLES_ARCHIVED = [
+        TABLE_TASK_EVENTS,
+        TABLE_TASK_JOBS,
+        TABLE_TASK_OUTPUTS,
+        TABLE_TASK_STATES,
+    ]
+
+    def __init__(
+            self, db_file_name=None, is_public=False, journal_mode=None,
+            synchronous=None):
         """Initialise object.
 
         db_file_name - Path to the database file
         is_public - If True, allow retries, etc
+        journal_mode - SQLite journal mode, e.g. "wal" (default: leave as is)
+        synchronous - SQLite synchronous level, e.g. "normal" (default: leave
+                      as is)
+
+        The connection is opened on first use and kept open until "close" is
+        called.
 
         """
         self.db_file_name = expandvars(db_file_name)
         self.is_public = is_public
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
         self.conn = None
         self.n_tries = 0
 
@@ -358,11 +461,24 @@ class CylcSuiteDAO:
             self.conn = None
 
     def connect(self):
-        """Connect to the database."""
+        """Connect to the database, or return the open connection."""
         if self.conn is None:
             self.conn = sqlite3.connect(self.db_file_name, self.CONN_TIMEOUT)
+            if self.journal_mode:
+                self.conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            if self.synchronous:
+                self.conn.execute(f"PRAGMA synchronous={self.synchronous}")
         return self.conn
 
+    def checkpoint(self):
+        """Write changes held in the write-ahead log to the database file.
+
+        Does nothing unless the database is in WAL journal mode.
+
+        """
+        if self.conn is not None and self.journal_mode == 'wal':
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def create_tables(self):
         """Create tables."""
         names = []
@@ -375,12 +491,36 @@ class CylcSuiteDAO:
             if name not in names:
                 cur = self.conn.execute(table.get_create_stmt())
         if cur is not None:
+            self.create_indexes(
+                [name for name in self.tables if name not in names])
+            self.conn.commit()
+
+    def create_indexes(self, table_names=None):
+        """Create missing indexes (on table_names or all tables).
+
+        Return the names of the indexes created.
+
+        """
+        names = {
+            row[0] for row in self.connect().execute(
+                "SELECT name FROM sqlite_master WHERE type==?", ["index"])}
+        created = []
+        for name, (table_name, columns) in sorted(self.INDEXES.items()):
+            if name in names or (
+                    table_names is not None and table_name not in table_names):
+                continue
+            self.conn.execute(
+                f"CREATE INDEX {name} ON {table_name}({','.join(columns)})")
+            created.append(name)
+        if created:
             self.conn.commit()
+        return created
 
     def execute_queued_items(self):
         """Execute queued items for each table."""
         try:
             for table in self.tables.values():
+                table.flush_update_rows()
                 # DELETE statements may have varying number of WHERE args so we
                 # can only executemany for each identical template statement.
                 for stmt, stmt_args_list in table.delete_queues.items():
@@ -411,24 +551,19 @@ class CylcSuiteDAO:
                     self.conn.rollback()
                 except sqlite3.Error:
                     pass
+            # Reconnect on the next attempt.
+            self.close()
             return
         else:
             # Clear the queues
             for table in self.tables.values():
-                table.delete_queues.clear()
-                table.insert_queue.clear()
-                table.update_queues.clear()
+                table.clear()
             # Report public database retry recovery if necessary
             if self.n_tries:
                 LOG.warning(
                     "%(file)s: recovered after (%(attempt)d) attempt(s)\n" % {
                         "file": self.db_file_name, "attempt": self.n_tries})
             self.n_tries = 0
-        finally:
-            # Note: This is not strictly necessary. However, if the suite run
-            # directory is removed, a forced reconnection to the private
-            # database will ensure that the suite dies.
-            self.close()
 
     def _execute_stmt(self, stmt, stmt_args_list):
         """Helper for "self.execute_queued_items".
@@ -555,6 +690,8 @@ class CylcSuiteDAO:
             [cycle, name, status, submit_num, time_submit, time_run,
              time_run_exit, job_runner_name, job_id, platform_name]
         """
+        # CROSS JOIN stops SQLite scanning all task_states or task_jobs rows
+        # rather than looking up the (few) tasks in the pool.
         form_stmt = r"""
             SELECT
                 %(task_pool)s.cycle,
@@ -568,13 +705,13 @@ class CylcSuiteDAO:
                 %(task_jobs)s.job_id,
                 %(task_jobs)s.platform_name
             FROM
-                %(task_jobs)s
-            JOIN
                 %(task_pool)s
-            ON  %(task_jobs)s.cycle == %(task_pool)s.cycle AND
-                %(task_jobs)s.name == %(task_pool)s.name
-            JOIN
+            CROSS JOIN
                 %(task_states)s
+            ON  %(task_pool)s.cycle == %(task_states)s.cycle AND
+                %(task_pool)s.name == %(task_states)s.name
+            CROSS JOIN
+                %(task_jobs)s
             ON  %(task_jobs)s.cycle == %(task_states)s.cycle AND
                 %(task_jobs)s.name == %(task_states)s.name AND
                 %(task_jobs)s.submit_num == %(task_states)s.submit_num
@@ -636,6 +773,39 @@ class CylcSuiteDAO:
             ret[flow_label] = submit_num
         return ret
 
+    def select_submit_nums_for_restart(self, callback, cycles=None):
+        """Select submit numbers from task_states table.
+
+        Invoke callback(row_idx, row) on each row, where each row contains:
+            [cycle, name, flow_label, submit_num]
+
+        If cycles is specified, only select rows of these cycle points.
+        """
+        # Ignore bandit false positive: B608: hardcoded_sql_expressions
+        # Not an injection, simply putting the table name in the SQL query
+        # expression as a string constant local to this module.
+        stmt = (  # nosec
+            r"SELECT cycle,name,flow_label,submit_num FROM %(name)s"
+        ) % {"name": self.TABLE_TASK_STATES}
+        if cycles is None:
+            rows = self.connect().execute(stmt)
+        else:
+            stmt += r" WHERE cycle==?"
+            rows = chain.from_iterable(
+                self.connect().execute(stmt, [cycle]) for cycle in cycles)
+        for row_idx, row in enumerate(rows):
+            callback(row_idx, list(row))
+
+    def select_task_states_cycles(self):
+        """Return the distinct cycle points in the task_states table."""
+        # Ignore bandit false positive: B608: hardcoded_sql_expressions
+        # Not an injection, simply putting the table name in the SQL query
+        # expression as a string constant local to this module.
+        stmt = (  # nosec
+            r"SELECT DISTINCT cycle FROM %(name)s"
+        ) % {"name": self.TABLE_TASK_STATES}
+        return [cycle for cycle, in self.connect().execute(stmt)]
+
     def select_xtriggers_for_restart(self, callback):
         stm = r"SELECT signature,results FROM %s" % self.TABLE_XTRIGGERS
         for row_idx, row in enumerate(self.connect().execute(stm, [])):
@@ -661,8 +831,14 @@ class CylcSuiteDAO:
         """Select from task_pool+task_states+task_jobs for restart.
 
         Invoke callback(row_idx, row) on each row, where each row contains:
-            [cycle, name, is_late, status, is_held, submit_num,
-             try_num, platform_name, time_submit, time_run, timeout, outputs]
+            [cycle, name, flow_label, is_late, status, is_held, submit_num,
+             try_num, platform_name, time_submit, time_run, timeout, outputs,
+             prereqs]
+
+        where prereqs is a list of the task's rows in task_prerequisites:
+            [prereq_name, prereq_cycle, prereq_output, satisfied]
+
+        The prerequisites of all tasks are selected up front in one query.
         """
         form_stmt = r"""
             SELECT
@@ -713,8 +889,39 @@ class CylcSuiteDAO:
             "task_outputs": self.TABLE_TASK_OUTPUTS,
         }
         stmt = form_stmt % form_data
+        prereqs = {}
+        for cycle, name, *prereq in self.connect().execute(f"""
+            SELECT
+                cycle,
+                name,
+                prereq_name,
+                prereq_cycle,
+                prereq_output,
+                satisfied
+            FROM
+                {self.TABLE_TASK_PREREQUISITES}
+        """):
+            prereqs.setdefault((cycle, name), []).append(prereq)
         for row_idx, row in enumerate(self.connect().execute(stmt)):
-            callback(row_idx, list(row))
+            callback(row_idx, list(row) + [prereqs.get((row[0], row[1]), [])])
+
+    def select_cycle_rows(self, table_name, cycles):
+        """Return the rows of a table for the given cycle points."""
+        stmt = r"SELECT %s FROM %s WHERE cycle==?" % (
+            ",".join(
+                column.name for column in self.tables[table_name].columns),
+            table_name)
+        return [
+            list(row)
+            for cycle in cycles
+            for row in self.connect().execute(stmt, [cycle])]
+
+    def count_cycle_rows(self, table_name, cycles):
+        """Return the number of rows of a table for the given cycle points."""
+        stmt = r"SELECT COUNT(*) FROM %s WHERE cycle==?" % table_name
+        return sum(
+            self.connect().execute(stmt, [cycle]).fetchone()[0]
+            for cycle in cycles)
 
     def select_task_prerequisites(self, cycle, name):
         """Return prerequisites of a task of the given name & cycle point."""
@@ -732,11 +939,25 @@ class CylcSuiteDAO:
         """
         return list(self.connect().execute(stmt))
 
-    def select_task_times(self):
+    def select_task_jobs_cycles(self):
+        """Return the distinct cycle points in the task_jobs table."""
+        # Ignore bandit false positive: B608: hardcoded_sql_expressions
+        # Not an injection, simply putting the table name in the SQL query
+        # expression as a string constant local to this module.
+        stmt = (  # nosec
+            r"SELECT DISTINCT cycle FROM %(name)s"
+        ) % {"name": self.TABLE_TASK_JOBS}
+        return [cycle for cycle, in self.connect().execute(stmt)]
+
+    def select_task_times(self, cycles=None):
         """Select submit/start/stop times to compute job timings.
 
         To make data interpretation easier, choose the most recent succeeded
         task to sample timings from.
+
+        Return the column names and an iterator over the rows, which are
+        fetched as they are iterated over. If cycles is specified, only
+        select the rows of these cycle points.
         """
         q = """
             SELECT
@@ -759,7 +980,11 @@ class CylcSuiteDAO:
             'name', 'cycle', 'host', 'job_runner',
             'submit_time', 'start_time', 'succeed_time'
         )
-        return columns, [r for r in self.connect().execute(q)]
+        if cycles is None:
+            return columns, self.connect().execute(q)
+        q += " AND cycle == ?"
+        return columns, chain.from_iterable(
+            self.connect().execute(q, [cycle]) for cycle in cycles)
 
     def vacuum(self):
         """Vacuum to the database."""
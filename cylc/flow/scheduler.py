@@ -24,6 +24,7 @@ import os
 from queue import Empty, Queue
 from shlex import quote
 from shutil import copytree, rmtree
+from signal import SIGCHLD
 from subprocess import Popen, PIPE, DEVNULL
 import sys
 from threading import Barrier
@@ -75,7 +76,7 @@ from cylc.flow.platforms import (
     get_install_target_from_platform,
     get_platform,
     is_platform_with_target_in_list)
-from cylc.flow.profiler import Profiler
+from cylc.flow.profiler import PhaseTimings, Profiler
 from cylc.flow.resources import extract_resources
 from cylc.flow.subprocpool import SubProcPool
 from cylc.flow.suite_db_mgr import SuiteDatabaseManager
@@ -98,6 +99,7 @@ from cylc.flow.task_state import (
     TASK_STATUSES_NEVER_ACTIVE,
     TASK_STATUS_FAILED)
 from cylc.flow.templatevars import load_template_vars
+from cylc.flow.timer_heap import TimerHeap
 from cylc.flow.wallclock import (
     get_current_time_string,
     get_seconds_as_interval_string,
@@ -116,6 +118,23 @@ class SchedulerError(CylcError):
     pass
 
 
+class WakeUpQueue(Queue):
+    """A queue which wakes up the scheduler main loop when an item is put.
+
+    The wake up callback must be thread safe as items are put onto the
+    queue by the network server thread.
+
+    """
+
+    def __init__(self, wake_up, maxsize=0):
+        self.wake_up = wake_up
+        Queue.__init__(self, maxsize)
+
+    def put(self, item, block=True, timeout=None):
+        Queue.put(self, item, block, timeout)
+        self.wake_up()
+
+
 class SchedulerUUID:
     """Scheduler identifier - which persists on restart."""
     __slots__ = ('value')
@@ -201,7 +220,10 @@ class Scheduler:
 
     # main loop
     main_loop_intervals: deque = deque(maxlen=10)
+    main_loop_timings: PhaseTimings = None
     main_loop_plugins: dict = None
+    main_loop_wakeup: asyncio.Event = None
+    event_loop: asyncio.AbstractEventLoop = None
     auto_restart_mode: AutoRestartMode = None
     auto_restart_time: float = None
 
@@ -226,6 +248,7 @@ class Scheduler:
     suite_db_mgr: SuiteDatabaseManager = None
     broadcast_mgr: BroadcastMgr = None
     xtrigger_mgr: XtriggerManager = None
+    clock_heap: TimerHeap = None
 
     # queues
     command_queue: Queue = None
@@ -271,6 +294,7 @@ class Scheduler:
         # mutable defaults
         self._profile_amounts = {}
         self._profile_update_times = {}
+        self.main_loop_timings = PhaseTimings()
 
         self.restored_stop_task_id = None
 
@@ -362,12 +386,17 @@ class Scheduler:
         self.publisher = WorkflowPublisher(
             self.suite, context=self.zmq_context, barrier=self.barrier)
 
+        # the main loop sleeps until this event is set (or a timeout)
+        self.event_loop = asyncio.get_event_loop()
+        self.main_loop_wakeup = asyncio.Event()
+
         self.proc_pool = SubProcPool()
-        self.command_queue = Queue()
-        self.message_queue = Queue()
-        self.ext_trigger_queue = Queue()
+        self.command_queue = WakeUpQueue(self.wake_up)
+        self.message_queue = WakeUpQueue(self.wake_up)
+        self.ext_trigger_queue = WakeUpQueue(self.wake_up)
         self.suite_event_handler = SuiteEventHandler(self.proc_pool)
 
+        self.clock_heap = TimerHeap()
         self.xtrigger_mgr = XtriggerManager(
             self.suite,
             self.owner,
@@ -376,7 +405,8 @@ class Scheduler:
             proc_pool=self.proc_pool,
             suite_run_dir=self.suite_run_dir,
             suite_share_dir=self.suite_share_dir,
-            suite_source_dir=self.suite_dir
+            suite_source_dir=self.suite_dir,
+            clock_heap=self.clock_heap
         )
 
         self.task_events_mgr = TaskEventsManager(
@@ -417,7 +447,7 @@ class Scheduler:
             pri_dao = self.suite_db_mgr.get_pri_dao()
             pri_dao.select_suite_params(self._load_suite_params)
             pri_dao.select_suite_template_vars(self._load_template_vars)
-            pri_dao.execute_queued_items()
+            pri_dao.close()
 
         # Copy local python modules from source to run directory
         for sub_dir in ["python", os.path.join("lib", "python")]:
@@ -464,7 +494,9 @@ class Scheduler:
             self.config,
             self.suite_db_mgr,
             self.task_events_mgr,
-            self.data_store_mgr)
+            self.data_store_mgr,
+            clock_heap=self.clock_heap,
+            xtrigger_mgr=self.xtrigger_mgr)
 
         self.data_store_mgr.initiate_data_model()
 
@@ -588,6 +620,7 @@ class Scheduler:
             )
             await self.publisher.publish(self.data_store_mgr.publish_deltas)
             self.profiler.start()
+            self._add_child_exit_handler()
             await self.main_loop()
 
         except SchedulerStop as exc:
@@ -682,24 +715,45 @@ class Scheduler:
                     TaskProxy(tdef, point, flow_label))
 
     def load_tasks_for_restart(self):
-        """Load tasks for restart."""
+        """Load tasks for restart.
+
+        Log the time taken to load each kind of data from the suite database.
+        """
         if self.options.startcp:
             self.config.start_point = TaskID.get_standardised_point(
                 self.options.startcp)
-        self.suite_db_mgr.pri_dao.select_broadcast_states(
-            self.broadcast_mgr.load_db_broadcast_states)
-        self.suite_db_mgr.pri_dao.select_task_job_run_times(
-            self._load_task_run_times)
-        self.suite_db_mgr.pri_dao.select_task_pool_for_restart(
-            self.pool.load_db_task_pool_for_restart)
-        self.suite_db_mgr.pri_dao.select_jobs_for_restart(
-            self.data_store_mgr.insert_db_job)
-        self.suite_db_mgr.pri_dao.select_task_action_timers(
-            self.pool.load_db_task_action_timers)
-        self.suite_db_mgr.pri_dao.select_xtriggers_for_restart(
-            self.xtrigger_mgr.load_xtrigger_for_restart)
-        self.suite_db_mgr.pri_dao.select_abs_outputs_for_restart(
-            self.pool.load_abs_outputs_for_restart)
+        pri_dao = self.suite_db_mgr.pri_dao
+        timings = PhaseTimings()
+        with timings.phase('broadcast states'):
+            pri_dao.select_broadcast_states(
+                self.broadcast_mgr.load_db_broadcast_states)
+        with timings.phase('task run times'):
+            pri_dao.select_task_job_run_times(self._load_task_run_times)
+        with timings.phase('task proxies'):
+            pri_dao.select_task_pool_for_restart(
+                self.pool.load_db_task_pool_for_restart)
+        with timings.phase('submit numbers'):
+            # Only cache submit numbers from the earliest point in the pool.
+            self.suite_db_mgr.load_submit_nums_for_restart(
+                self.pool.sorted_points[0] if self.pool.sorted_points
+                else None)
+        with timings.phase('job data'):
+            pri_dao.select_jobs_for_restart(self.data_store_mgr.insert_db_job)
+        with timings.phase('task action timers'):
+            pri_dao.select_task_action_timers(
+                self.pool.load_db_task_action_timers)
+        with timings.phase('xtriggers'):
+            pri_dao.select_xtriggers_for_restart(
+                self.xtrigger_mgr.load_xtrigger_for_restart)
+        with timings.phase('absolute outputs'):
+            pri_dao.select_abs_outputs_for_restart(
+                self.pool.load_abs_outputs_for_restart)
+        LOG.info(
+            'LOADED restart data in %.2fs' % sum(
+                total for _, total in timings.totals.values())
+            + ''.join(
+                '\n+ %s: %.2fs' % (phase, total)
+                for phase, (_, total) in timings.totals.items()))
 
     def restart_remote_init(self):
         """Remote init for all submitted / running tasks in the pool.
@@ -897,6 +951,7 @@ class Scheduler:
         """Set shutdown mode."""
         self.proc_pool.set_stopping()
         self.stop_mode = stop_mode
+        self.wake_up()
 
     def command_release(self, ids=None):
         if ids:
@@ -954,8 +1009,8 @@ class Scheduler:
         LOG.info("Reloading the suite definition.")
         old_tasks = set(self.config.get_task_name_list())
         # Things that can't change on suite reload:
-        pri_dao = self.suite_db_mgr.get_pri_dao()
-        pri_dao.select_suite_params(self._load_suite_params)
+        self.suite_db_mgr.pri_dao.select_suite_params(
+            self._load_suite_params)
 
         self.load_flow_file(is_reload=True)
         self.broadcast_mgr.linearized_ancestors = (
@@ -1231,7 +1286,7 @@ class Scheduler:
                          itask, itask.state.get_resolved_dependencies())
 
         self.broadcast_mgr.expire_broadcast(self.pool.get_min_point())
-        self.xtrigger_mgr.housekeep()
+        self.xtrigger_mgr.housekeep(self.pool.get_tasks())
         self.suite_db_mgr.put_xtriggers(self.xtrigger_mgr.sat_xtrig)
         LOG.debug("END TASK PROCESSING (took %s seconds)" % (time() - time0))
 
@@ -1403,6 +1458,7 @@ class Scheduler:
 
     async def main_loop(self):
         """The scheduler main loop."""
+        timings = self.main_loop_timings
         while True:  # MAIN LOOP
             tinit = time()
 
@@ -1414,69 +1470,163 @@ class Scheduler:
                 await self.publisher.publish(
                     self.data_store_mgr.publish_deltas)
 
-            self.process_command_queue()
-            self.release_tasks()
-            self.proc_pool.process()
-
-            if self.should_process_tasks():
-                self.process_task_pool()
-            self.late_tasks_check()
-
-            self.process_queued_task_messages()
-            self.process_command_queue()
-            self.task_events_mgr.process_events(self)
+            with timings.phase('process_command_queue'):
+                self.process_command_queue()
+            with timings.phase('release_tasks'):
+                self.release_tasks()
+            with timings.phase('proc_pool.process'):
+                self.proc_pool.process()
+
+            with timings.phase('should_process_tasks'):
+                process_tasks = self.should_process_tasks()
+            if process_tasks:
+                with timings.phase('process_task_pool'):
+                    self.process_task_pool()
+            with timings.phase('late_tasks_check'):
+                self.late_tasks_check()
+
+            with timings.phase('process_queued_task_messages'):
+                self.process_queued_task_messages()
+            with timings.phase('process_command_queue (post-messages)'):
+                self.process_command_queue()
+            with timings.phase('task_events_mgr.process_events'):
+                self.task_events_mgr.process_events(self)
 
             # Update state summary, database, and uifeed
-            self.suite_db_mgr.put_task_event_timers(self.task_events_mgr)
-            has_updated = await self.update_data_structure()
+            with timings.phase('update_data_structure'):
+                self.suite_db_mgr.put_task_event_timers(self.task_events_mgr)
+                has_updated = await self.update_data_structure()
 
-            self.process_suite_db_queue()
+            with timings.phase('process_suite_db_queue'):
+                self.process_suite_db_queue()
 
             # If public database is stuck, blast it away by copying the content
             # of the private database into it.
-            self.database_health_check()
+            with timings.phase('database_health_check'):
+                self.database_health_check()
 
             # Shutdown suite if timeouts have occurred
-            self.timeout_check()
+            with timings.phase('timeout_check'):
+                self.timeout_check()
 
             # Does the suite need to shutdown on task failure?
-            await self.suite_shutdown()
+            with timings.phase('suite_shutdown'):
+                await self.suite_shutdown()
 
             if self.options.profile_mode:
                 self.update_profiler_logs(tinit)
 
             # Run plugin functions
-            await asyncio.gather(
-                *main_loop.get_runners(
-                    self.main_loop_plugins,
-                    main_loop.CoroTypes.Periodic,
-                    self
+            with timings.phase('main_loop_plugins'):
+                await asyncio.gather(
+                    *main_loop.get_runners(
+                        self.main_loop_plugins,
+                        main_loop.CoroTypes.Periodic,
+                        self
+                    )
                 )
-            )
 
             if not has_updated and not self.stop_mode:
                 # Has the suite stalled?
-                self.check_suite_stalled()
-
-            # Sleep a bit for things to catch up.
-            # Quick sleep if there are items pending in process pool.
-            # (Should probably use quick sleep logic for other queues?)
-            elapsed = time() - tinit
-            quick_mode = self.proc_pool.is_not_done()
-            if (elapsed >= self.INTERVAL_MAIN_LOOP or
-                    quick_mode and elapsed >= self.INTERVAL_MAIN_LOOP_QUICK):
-                # Main loop has taken quite a bit to get through
-                # Still yield control to other threads by sleep(0.0)
-                duration = 0
-            elif quick_mode:
-                duration = self.INTERVAL_MAIN_LOOP_QUICK - elapsed
-            else:
-                duration = self.INTERVAL_MAIN_LOOP - elapsed
-            await asyncio.sleep(duration)
+                with timings.phase('check_suite_stalled'):
+                    self.check_suite_stalled()
+
+            # Record the time taken by this pass (excluding the sleep)
+            timings.add('main_loop', tinit, time() - tinit)
+
+            # Sleep until woken up or the next timer is due.
+            await self._main_loop_sleep(tinit)
             # Record latest main loop interval
             self.main_loop_intervals.append(time() - tinit)
             # END MAIN LOOP
 
+    def wake_up(self):
+        """Wake the main loop up if it is sleeping.
+
+        This is thread safe, it may be called from the network server thread.
+
+        """
+        if self.main_loop_wakeup is None or self.event_loop.is_closed():
+            return
+        self.event_loop.call_soon_threadsafe(self.main_loop_wakeup.set)
+
+    def get_next_timer(self):
+        """Return the unix time at which the next known timer falls due.
+
+        Return None if there are no pending timers.
+
+        """
+        timers = [
+            self.stop_clock_time,
+            self.time_next_kill,
+            self.auto_restart_time,
+        ]
+        if self.suite_timer_active:
+            timers.append(self.suite_timer_timeout)
+        if self._get_events_conf(self.EVENT_INACTIVITY_TIMEOUT):
+            timers.append(self.suite_inactivity_timeout)
+        if self.clock_heap is not None:
+            timers.append(self.clock_heap.get_next_time())
+        if self.task_events_mgr is not None:
+            timers.append(self.task_events_mgr.get_next_event_time())
+            if not self.config.run_mode('simulation'):
+                # (job timers are not checked in simulation mode)
+                timers.append(self.task_events_mgr.get_next_job_time())
+        timers = [timer for timer in timers if timer is not None]
+        if timers:
+            return min(timers)
+        return None
+
+    async def _main_loop_sleep(self, tinit):
+        """Sleep until there is something for the main loop to do.
+
+        The main loop is woken up early if:
+        * A message, command or external trigger is queued.
+        * A subprocess in the process pool exits.
+        * A timer falls due.
+
+        Otherwise it sleeps for the fixed main loop interval (or the quick
+        interval if there are items pending in the process pool).
+
+        """
+        elapsed = time() - tinit
+        if self.proc_pool.is_not_done():
+            # need to poll the process pool for pipe output and timeouts
+            duration = self.INTERVAL_MAIN_LOOP_QUICK - elapsed
+        else:
+            duration = self.INTERVAL_MAIN_LOOP - elapsed
+        next_timer = self.get_next_timer()
+        if next_timer is not None:
+            duration = min(duration, next_timer - time())
+        if duration > 0:
+            try:
+                await asyncio.wait_for(self.main_loop_wakeup.wait(), duration)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            # Main loop has taken quite a bit to get through
+            # Still yield control to other threads by sleep(0.0)
+            await asyncio.sleep(0)
+        # Clear the event before the next pass so that anything arriving
+        # during the pass will wake the following sleep.
+        self.main_loop_wakeup.clear()
+
+    def _add_child_exit_handler(self):
+        """Wake the main loop up when a child process exits."""
+        try:
+            self.event_loop.add_signal_handler(SIGCHLD, self.wake_up)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # signal handlers can only be set in the main thread
+            # (the main loop will still wake up at its regular interval)
+            pass
+
+    def _remove_child_exit_handler(self):
+        """Remove the handler set by _add_child_exit_handler."""
+        try:
+            self.event_loop.remove_signal_handler(SIGCHLD)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+
     async def update_data_structure(self):
         """Update DB, UIS, Summary data elements"""
         updated_tasks = [
@@ -1490,7 +1640,7 @@ class Scheduler:
             await self.publisher.publish(self.data_store_mgr.publish_deltas)
         if has_updated:
             # Database update
-            self.suite_db_mgr.put_task_pool(self.pool)
+            self.suite_db_mgr.put_task_pool(self.pool, updated_tasks)
             # Reset suite and task updated flags.
             self.is_updated = False
             self.is_stalled = False
@@ -1555,8 +1705,9 @@ class Scheduler:
         # do we need to do a pass through the main task processing loop?
         process = False
 
-        # New-style xtriggers.
-        self.xtrigger_mgr.check_xtriggers(self.pool.get_tasks())
+        # New-style xtriggers (of tasks with xtriggers to check).
+        for itask in self.xtrigger_mgr.check_xtriggers():
+            self.pool.set_dirty(itask)
         if self.xtrigger_mgr.pflag:
             process = True
             self.xtrigger_mgr.pflag = False  # reset
@@ -1565,6 +1716,7 @@ class Scheduler:
         for itask in self.pool.get_tasks():
             if (itask.state.external_triggers and
                     self.broadcast_mgr.match_ext_trigger(itask)):
+                self.pool.set_dirty(itask)
                 process = True
 
         if self.task_events_mgr.pflag:
@@ -1577,17 +1729,14 @@ class Scheduler:
             process = True
             self.task_job_mgr.task_remote_mgr.ready = False  # reset
 
-        broadcast_mgr = self.task_events_mgr.broadcast_mgr
-        broadcast_mgr.add_ext_triggers(self.ext_trigger_queue)
-        for itask in self.pool.get_tasks():
-            # External trigger matching and task expiry must be done
-            # regardless, so they need to be in separate "if ..." blocks.
-            if broadcast_mgr.match_ext_trigger(itask):
-                process = True
-            if self.pool.set_expired_task(itask, time()):
-                process = True
-            if all(itask.is_ready()):
+        # Clock triggers, clock-expire and clock xtriggers which are due.
+        for itask, callback in self.clock_heap.pop_due(time()):
+            if callback(itask):
+                self.pool.set_dirty(itask)
                 process = True
+
+        if self.pool.has_tasks_to_check():
+            process = True
         if (
             self.config.run_mode('simulation') and
             self.pool.sim_time_check(self.message_queue)
@@ -1620,6 +1769,9 @@ class Scheduler:
             else:
                 LOG.critical('Suite shutting down')
 
+        if self.event_loop:
+            self._remove_child_exit_handler()
+
         if self.proc_pool:
             self.proc_pool.close()
             if self.proc_pool.is_not_done():
@@ -1627,6 +1779,9 @@ class Scheduler:
                 self.proc_pool.terminate()
             self.proc_pool.process()
 
+        if self.xtrigger_mgr:
+            self.xtrigger_mgr.close()
+
         if self.pool is not None:
             if not self.is_stalled:
                 # (else already reported)
@@ -31,8 +31,8 @@ Summary Output (the default):
     2. Task run time (duration between start and succeed times)
     3. Total run time (duration between task submission and succeed times)
   Summary tables can be output in plain text format, or HTML with embedded SVG
-  boxplots.  Both summary options require the Pandas library, and the HTML
-  summary option requires the Matplotlib library.
+  boxplots.  Quantiles are estimated (to within 1%) from the durations
+  rather than interpolated between them.
 
 Raw Output:
   A flat list of tabular data that provides (for each task and cycle) the
@@ -44,21 +44,38 @@ Raw Output:
 
 Timings are shown only for succeeded tasks.
 
-For long-running and/or large suites (i.e. for suites with many task events),
-the database query to obtain the timing information may take some time.
+Timings of cycle points moved to archive databases by the "archive run db"
+main loop plugin are included (unless the cycle points are still in the suite
+database).
+
+The timings are read from the database in a single pass (two for raw output)
+without holding them in memory, so large suite databases can be summarised.
+Use --start-point and --stop-point to restrict the timings to a range of
+cycle points.
 
 """
 
-import io as StringIO
-import collections
 import contextlib
+from datetime import datetime
+from functools import lru_cache
+from glob import glob
+from math import ceil, log, sqrt
 import sys
 
-from cylc.flow.exceptions import CylcError
+from metomi.isodatetime.parsers import TimePointParser
+
 from cylc.flow.option_parsers import CylcOptionParser as COP
-from cylc.flow.pathutil import get_suite_run_pub_db_name
+from cylc.flow.pathutil import (
+    get_suite_run_db_archive_dir,
+    get_suite_run_pub_db_name
+)
 from cylc.flow.rundb import CylcSuiteDAO
 from cylc.flow.terminal import cli_function
+from cylc.flow.wallclock import get_unix_time_from_time_string
+
+
+CATEGORIES = ('queue_time', 'run_time', 'total_time')
+"""The timing categories summarised."""
 
 
 @contextlib.contextmanager
@@ -105,6 +122,16 @@ def get_option_parser():
         "-O", "--output-file",
         help="Output to a specific file",
         action="store", default=None, dest="output_filename")
+    parser.add_option(
+        "--start-point",
+        help="Only include cycle points from CYCLE_POINT on.",
+        metavar="CYCLE_POINT", action="store", default=None,
+        dest="start_point")
+    parser.add_option(
+        "--stop-point",
+        help="Only include cycle points up to CYCLE_POINT.",
+        metavar="CYCLE_POINT", action="store", default=None,
+        dest="stop_point")
 
     return parser
 
@@ -120,41 +147,73 @@ def main(parser, options, suite):
         # No output specified - choose summary by default
         options.show_summary = True
 
-    run_db = _get_dao(suite)
-    row_buf = format_rows(*run_db.select_task_times())
+    dao = _get_dao(suite)
+    archive_daos = _get_archive_daos(suite)
+    cycles = {
+        dao: _select_cycles(dao, options.start_point, options.stop_point)
+    }
+    if archive_daos:
+        # A scheduler stopped whilst archiving may leave cycle points in both
+        suite_cycles = set(dao.select_task_jobs_cycles())
+        for archive_dao in archive_daos:
+            cycles[archive_dao] = _select_cycles(
+                archive_dao, options.start_point, options.stop_point,
+                exclude=suite_cycles)
+    daos = archive_daos + [dao]
 
     with smart_open(options.output_filename) as output:
         if options.show_raw:
-            output.write(row_buf.getvalue())
+            write_rows(
+                output, lambda: _select_task_times(daos, cycles))
         else:
+            timings = {}
+            for dao in daos:
+                merge_timings(
+                    timings,
+                    aggregate_timings(dao.select_task_times(cycles[dao])[1]))
             if options.show_summary:
-                summary = TextTimingSummary(row_buf)
+                summary = TextTimingSummary(timings)
             elif options.html_summary:
-                summary = HTMLTimingSummary(row_buf)
+                summary = HTMLTimingSummary(timings)
             summary.write_summary(output)
 
 
-def format_rows(header, rows):
-    """Write the rows in tabular format to a string buffer.
+def write_rows(buf, select):
+    """Write the rows in tabular format to buf.
 
     Ensure that each column is wide enough to contain the widest data
     value and the widest header value.
 
+    The rows are selected twice, the first time to measure the columns,
+    rather than held in memory.
+
+    Args:
+        buf (io.TextIOBase):
+            Buffer to write to.
+        select (callable):
+            Return a new (header, rows) tuple when called.
+
+    Examples:
+        >>> import io
+        >>> buf = io.StringIO()
+        >>> write_rows(buf, lambda: (('a', 'bb'), [('x', 10), ('yyy', 20)]))
+        >>> print(buf.getvalue(), end='')
+        a   bb
+        x   10
+        yyy 20
+
     """
-    sio = StringIO.StringIO()
-    max_lengths = [
-        max(data_len, head_len)
-        for data_len, head_len in zip(
-            (max(len(r[i]) for r in rows) for i in range(len(header))),
-            (len(h) for h in header)
-        )
-    ]
+    header, rows = select()
+    max_lengths = [len(head) for head in header]
+    for row in rows:
+        max_lengths = [
+            max(max_length, len(str(value)))
+            for max_length, value in zip(max_lengths, row)
+        ]
     formatter = ' '.join('%%-%ds' % line for line in max_lengths) + '\n'
-    sio.write(formatter % header)
-    for r in rows:
-        sio.write(formatter % r)
-    sio.seek(0)
-    return sio
+    buf.write(formatter % header)
+    for row in select()[1]:
+        buf.write(formatter % tuple(row))
 
 
 def _get_dao(suite):
@@ -162,63 +221,345 @@ def _get_dao(suite):
     return CylcSuiteDAO(get_suite_run_pub_db_name(suite), is_public=True)
 
 
-class TimingSummary:
-    """Base class for summarizing timing output from cylc.flow run database."""
+def _get_archive_daos(suite):
+    """Return the DAOs of the archive databases of suite."""
+    return [
+        CylcSuiteDAO(path, is_public=True)
+        for path in sorted(glob(get_suite_run_db_archive_dir(suite, '*.db')))
+    ]
 
-    def __init__(self, filepath_or_buffer=None):
-        """Set up internal dataframe storage for time durations."""
 
-        self._check_imports()
-        if filepath_or_buffer is not None:
-            self.read_timings(filepath_or_buffer)
-        else:
-            self.df = None
-            self.by_host_and_job_runner = None
+def _select_task_times(daos, cycles):
+    """Return the header and timing rows of daos (for their cycles)."""
+    results = [dao.select_task_times(cycles[dao]) for dao in daos]
+    return results[0][0], (
+        row for _, rows in results for row in rows)
 
-    def read_timings(self, filepath_or_buffer):
-        """
-        Set up time duration dataframe storage based on start/stop/succeed
-        times from flat database output.
 
-        """
-        import pandas as pd
+def _select_cycles(dao, start_point=None, stop_point=None, exclude=None):
+    """Return the task job cycle points of dao in a range.
 
-        # Avoid truncation of content in columns.
-        pd.set_option('display.max_colwidth', 10000)
+    Cycle points in exclude are left out. Return None (i.e. all cycle points)
+    if no range or exclusions are specified.
 
-        df = pd.read_csv(
-            filepath_or_buffer, delim_whitespace=True, index_col=[0, 1, 2, 3],
-            parse_dates=[4, 5, 6]
+    """
+    if start_point is None and stop_point is None and not exclude:
+        return None
+    return [
+        cycle
+        for cycle in dao.select_task_jobs_cycles()
+        if (
+            (not exclude or cycle not in exclude)
+            and (start_point is None or not _point_lt(cycle, start_point))
+            and (stop_point is None or not _point_lt(stop_point, cycle))
         )
-        self.df = pd.DataFrame({
-            'queue_time': (
-                df['start_time'] - df['submit_time']).apply(self._dt_to_s),
-            'run_time': (
-                df['succeed_time'] - df['start_time']).apply(self._dt_to_s),
-            'total_time': (
-                df['succeed_time'] - df['submit_time']).apply(self._dt_to_s),
-        })
-        self.df = self.df.rename_axis('timing_category', axis='columns')
-        self.by_host_and_job_runner = self.df.groupby(
-            level=['host', 'job_runner']
+    ]
+
+
+def _point_lt(point_1, point_2):
+    """Return True if cycle point string point_1 is before point_2.
+
+    Examples:
+        >>> _point_lt('9', '10')
+        True
+        >>> _point_lt('2020-01-01T06+06', '20200101T0100Z')
+        True
+        >>> _point_lt('2021', '2020-01-01')
+        False
+
+    """
+    try:
+        return int(point_1) < int(point_2)
+    except ValueError:
+        pass
+    parser = TimePointParser(assumed_time_zone=(0, 0))
+    try:
+        return parser.parse(point_1) < parser.parse(point_2)
+    except ValueError:
+        return point_1 < point_2
+
+
+@lru_cache(maxsize=4096)
+def _parse_time(time_string):
+    """Return the unix time of a time string from the database or None.
+
+    Jobs submitted or finishing together share time strings, so recently
+    parsed ones are cached.
+
+    Examples:
+        >>> _parse_time('1970-01-01T00:01:00Z')
+        60.0
+        >>> _parse_time('1970-01-01T13:00:00+13')
+        0.0
+        >>> _parse_time(None)
+
+    """
+    if not time_string:
+        return None
+    try:
+        return datetime.fromisoformat(
+            time_string.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return float(get_unix_time_from_time_string(time_string))
+
+
+def aggregate_timings(rows):
+    """Aggregate the rows of CylcSuiteDAO.select_task_times.
+
+    Returns:
+        dict - {(host, job_runner): {name: {category: TimingStats}}}
+
+    Examples:
+        >>> timings = aggregate_timings([(
+        ...     'foo', '1', 'localhost', 'background',
+        ...     '1970-01-01T00:00:00Z',
+        ...     '1970-01-01T00:00:10Z',
+        ...     '1970-01-01T00:01:00Z'
+        ... )])
+        >>> stats = timings[('localhost', 'background')]['foo']
+        >>> [stats[category].mean for category in CATEGORIES]
+        [10.0, 50.0, 60.0]
+
+    """
+    timings = {}
+    for name, _, host, job_runner, submit, start, succeed in rows:
+        task_timings = timings.setdefault((host, job_runner), {})
+        try:
+            stats = task_timings[name]
+        except KeyError:
+            stats = task_timings[name] = {
+                category: TimingStats() for category in CATEGORIES}
+        submit, start, succeed = (
+            _parse_time(submit), _parse_time(start), _parse_time(succeed))
+        for category, begin, end in (
+                ('queue_time', submit, start),
+                ('run_time', start, succeed),
+                ('total_time', submit, succeed)):
+            if begin is not None and end is not None:
+                stats[category].add(end - begin)
+    return timings
+
+
+def merge_timings(timings, other):
+    """Merge the aggregated timings other into timings."""
+    for group, other_task_timings in other.items():
+        task_timings = timings.setdefault(group, {})
+        for name, other_stats in other_task_timings.items():
+            if name not in task_timings:
+                task_timings[name] = other_stats
+                continue
+            for category, stats in task_timings[name].items():
+                stats.merge(other_stats[category])
+
+
+class QuantileSketch:
+    """Estimate quantiles of a stream of numbers in bounded memory.
+
+    Values are counted in buckets whose bounds grow geometrically (as in
+    DDSketch, https://arxiv.org/abs/1908.10693), so quantile estimates are
+    within relative_accuracy of the true values and the number of buckets
+    only grows with the log of the range of the values. Sketches with the
+    same accuracy can be merged.
+
+    Examples:
+        >>> sketch = QuantileSketch()
+        >>> for value in range(101):
+        ...     sketch.add(value)
+        >>> abs(sketch.quantile(0.5) - 50) <= 0.5
+        True
+        >>> other = QuantileSketch()
+        >>> other.add(-5)
+        >>> sketch.merge(other)
+        >>> sketch.count, round(sketch.quantile(0)), sketch.quantile(0.01)
+        (102, -5, 0.0)
+
+    """
+
+    __slots__ = ['gamma', 'log_gamma', 'count', 'zeros', 'buckets']
+
+    MIN_VALUE = 1e-3
+    """Absolute values smaller than this are counted as zero."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = log(self.gamma)
+        self.count = 0
+        self.zeros = 0
+        # {sign: {bucket: count}}
+        self.buckets = {1: {}, -1: {}}
+
+    def add(self, value):
+        """Add a value to the sketch."""
+        self.count += 1
+        if abs(value) < self.MIN_VALUE:
+            self.zeros += 1
+            return
+        sign = 1 if value > 0 else -1
+        key = ceil(log(abs(value)) / self.log_gamma)
+        buckets = self.buckets[sign]
+        buckets[key] = buckets.get(key, 0) + 1
+
+    def merge(self, other):
+        """Add the values counted by another sketch to this one."""
+        self.count += other.count
+        self.zeros += other.zeros
+        for sign, other_buckets in other.buckets.items():
+            buckets = self.buckets[sign]
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+
+    def quantile(self, quantile):
+        """Return an estimate of a quantile (0 to 1) or None if empty."""
+        if not self.count:
+            return None
+        rank = quantile * (self.count - 1)
+        seen = 0
+        for sign, keys in (
+                (-1, sorted(self.buckets[-1], reverse=True)),
+                (0, [None]),
+                (1, sorted(self.buckets[1]))):
+            for key in keys:
+                if sign:
+                    seen += self.buckets[sign][key]
+                else:
+                    seen += self.zeros
+                if seen > rank:
+                    if not sign:
+                        return 0.0
+                    return sign * 2 * self.gamma ** key / (self.gamma + 1)
+        return None
+
+
+class TimingStats:
+    """Summary statistics of a stream of durations.
+
+    Keeps count, mean, standard deviation (Welford's method), min, max and a
+    QuantileSketch. Statistics of different streams can be merged.
+
+    Examples:
+        >>> stats = TimingStats()
+        >>> for value in (1, 2, 3):
+        ...     stats.add(value)
+        >>> other = TimingStats()
+        >>> other.add(4)
+        >>> stats.merge(other)
+        >>> stats.describe()[:4]
+        [('count', 4), ('mean', 2.5), ('std', 1.2909944487358056), ('min', 1)]
+
+    """
+
+    __slots__ = ['count', 'mean', 'm2', 'min', 'max', 'sketch']
+
+    QUANTILES = (('25%', 0.25), ('50%', 0.5), ('75%', 0.75))
+    LABELS = ('count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # sum of the squared differences from the mean
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        """Add a duration."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.sketch.add(value)
+
+    def merge(self, other):
+        """Add the durations summarised by other."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        self.sketch.merge(other.sketch)
+
+    def quantile(self, quantile):
+        """Return an estimate of a quantile, within the min and max."""
+        if not self.count:
+            return None
+        return max(self.min, min(self.max, self.sketch.quantile(quantile)))
+
+    def describe(self):
+        """Return [(statistic, value), ...] (value None if undefined)."""
+        std = None
+        if self.count > 1:
+            std = sqrt(self.m2 / (self.count - 1))
+        return (
+            [('count', self.count), ('mean', self.mean), ('std', std),
+             ('min', self.min)]
+            + [
+                (label, self.quantile(quantile))
+                for label, quantile in self.QUANTILES
+            ]
+            + [('max', self.max)]
         )
 
+
+def _format_value(value):
+    """Format a statistic for display.
+
+    Examples:
+        >>> _format_value(3), _format_value(2.5), _format_value(None)
+        ('3', '2.50', 'NaN')
+
+    """
+    if value is None:
+        return 'NaN'
+    if isinstance(value, int):
+        return str(value)
+    return '%.2f' % value
+
+
+class TimingSummary:
+    """Base class for summarizing timing output from cylc.flow run database."""
+
+    def __init__(self, timings=None):
+        """Set up storage for aggregated timings.
+
+        Args:
+            timings (dict):
+                {(host, job_runner): {name: {category: TimingStats}}}
+                as returned by aggregate_timings.
+
+        """
+        if timings is None:
+            timings = {}
+        self.timings = timings
+
     def write_summary(self, buf=None):
-        """Using the stored timings dataframe, output the data summary."""
+        """Using the aggregated timings, output the data summary."""
 
         if buf is None:
             buf = sys.stdout
         self.write_summary_header(buf)
-        for group, df in self.by_host_and_runner:
+        for group, task_timings in sorted(
+                self.timings.items(), key=lambda item: str(item[0])):
             self.write_group_header(buf, group)
-            df_reshape = self._reshape_timings(df)
-            df_describe = df.groupby(level='name').describe()
-            if df_describe.index.nlevels > 1:
-                df_describe = df_describe.unstack()  # for pandas < 0.20.0
-            df_describe.index.rename(None, inplace=True)
-            for timing_category in self.df.columns:
+            for timing_category in CATEGORIES:
                 self.write_category(
-                    buf, timing_category, df_reshape, df_describe
+                    buf,
+                    timing_category,
+                    {
+                        name: stats[timing_category]
+                        for name, stats in sorted(task_timings.items())
+                        if stats[timing_category].count
+                    }
                 )
         self.write_summary_footer(buf)
 
@@ -231,54 +572,9 @@ class TimingSummary:
     def write_group_header(self, buf, group):
         pass
 
-    def write_category(self, buf, category, df_reshape, df_describe):
+    def write_category(self, buf, category, stats):
         pass
 
-    def _check_imports(self):
-        try:
-            import pandas
-        except ImportError:
-            raise CylcError('Cannot import pandas - summary unavailable.')
-        else:
-            del pandas
-
-    @staticmethod
-    def _reshape_timings(timings):
-        """
-        Given a dataframe of timings returned from the Cylc DAO methods
-        indexed by (task, cycle point, ...) with columns for the various
-        timing categories, return a dataframe reshaped with an index of
-        (timing category, cycle point, ...) with columns for each task.
-
-        Need a special method rather than standard Pandas pivot-table
-        to handle duplicated index entries properly.
-
-        """
-        if timings.index.duplicated().any():
-            # The 'unstack' used to pivot the dataframe gives an error if
-            # there are duplicate entries in the index (see #2509).  The
-            # best way around this seems to be to add an intermediate index
-            # level (in this case a retry counter) to de-duplicate indices.
-            counts = collections.defaultdict(int)
-            retry = []
-            for t in timings.index:
-                counts[t] += 1
-                retry.append(counts[t])
-            timings = timings.assign(retry=retry)
-            timings = timings.set_index('retry', append=True)
-
-        return timings.unstack('name').stack(level=0)
-
-    @staticmethod
-    def _dt_to_s(dt):
-        import pandas as pd
-        try:
-            return dt.total_seconds()
-        except AttributeError:
-            # Older versions of pandas have the timedelta as a numpy
-            # timedelta64 type, which didn't support total_seconds
-            return pd.Timedelta(dt).total_seconds()
-
 
 class TextTimingSummary(TimingSummary):
     """Timing summary in text form."""
@@ -291,11 +587,22 @@ class TextTimingSummary(TimingSummary):
         buf.write(title.center(self.line_width - 1) + '\n')
         buf.write('=' * self.line_width + '\n')
 
-    def write_category(self, buf, category, df_reshape, df_describe):
+    def write_category(self, buf, category, stats):
         buf.write(category.center(self.line_width) + '\n')
         buf.write(('-' * len(category)).center(self.line_width) + '\n')
-        buf.write(df_describe[category].to_string())
-        buf.write('\n\n')
+        table = [[''] + list(TimingStats.LABELS)]
+        for name, task_stats in stats.items():
+            table.append([name] + [
+                _format_value(value) for _, value in task_stats.describe()])
+        widths = [max(len(cell) for cell in column) for column in zip(*table)]
+        for row in table:
+            buf.write(
+                row[0].ljust(widths[0]) + ''.join(
+                    '  ' + cell.rjust(width)
+                    for cell, width in zip(row[1:], widths[1:])
+                ) + '\n'
+            )
+        buf.write('\n')
 
 
 class HTMLTimingSummary(TimingSummary):
@@ -348,43 +655,77 @@ class HTMLTimingSummary(TimingSummary):
     def write_group_header(self, buf, group):
         buf.write('<h1>Timings for host %s using job runner %s</h1>' % group)
 
-    def write_category(self, buf, category, df_reshape, df_describe):
-        import matplotlib.pyplot as plt
+    def write_category(self, buf, category, stats):
         buf.write('<div class="timing" id=%s>' % category)
         buf.write('<h2>%s</h2>\n' % (category.replace('_', ' ').title()))
-        ax = (
-            df_reshape
-            .xs(category, level='timing_category')
-            .plot(kind='box', vert=False)
-        )
-        ax.invert_yaxis()
-        ax.set_xlabel('Seconds')
-        plt.tight_layout()
-        plt.gcf().savefig(buf, format='svg')
-        try:
-            table = df_describe[category].to_html(
-                classes="summary", index_names=False, border=0
-            )
-        except TypeError:
-            # older pandas don't support the "border" argument
-            # so explicitly remove it
-            table = df_describe[category].to_html(
-                classes="summary", index_names=False
-            )
-            table = table.replace('border="1"', '')
-        buf.write(table)
+        if stats:
+            buf.write(self._boxplot(stats))
+        buf.write('<table border="0" class="dataframe summary">')
+        buf.write('<thead><tr><th></th>')
+        for label in TimingStats.LABELS:
+            buf.write('<th>%s</th>' % label)
+        buf.write('</tr></thead><tbody>')
+        for name, task_stats in stats.items():
+            buf.write('<tr><th>%s</th>' % name)
+            for _, value in task_stats.describe():
+                buf.write('<td>%s</td>' % _format_value(value))
+            buf.write('</tr>')
+        buf.write('</tbody></table>')
         buf.write('</div>')
-        pass
 
-    def _check_imports(self):
-        try:
-            import matplotlib
-            matplotlib.use('Agg')
-        except ImportError:
-            raise CylcError(
-                'Cannot import matplotlib - HTML summary unavailable.'
-            )
-        super(HTMLTimingSummary, self)._check_imports()
+    @staticmethod
+    def _boxplot(stats, width=640, label_width=160, row_height=24):
+        """Return an SVG box plot of the timings of each task.
+
+        Boxes span the quartiles and whiskers the min and max.
+
+        """
+        lower = min(task_stats.min for task_stats in stats.values())
+        upper = max(task_stats.max for task_stats in stats.values())
+        scale = (width - label_width - 20) / ((upper - lower) or 1)
+
+        def x_pos(value):
+            return '%.1f' % (label_width + (value - lower) * scale)
+
+        height = row_height * (len(stats) + 2)
+        lines = [
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 %d %d">'
+            % (width, height)
+        ]
+        for i, (name, task_stats) in enumerate(stats.items()):
+            mid = row_height * i + row_height // 2
+            top = mid - row_height // 3
+            q_1, q_2, q_3 = (
+                task_stats.quantile(quantile)
+                for _, quantile in TimingStats.QUANTILES)
+            lines.extend([
+                '<text x="%d" y="%d" text-anchor="end" font-size="12"'
+                ' dominant-baseline="middle">%s</text>'
+                % (label_width - 8, mid, name),
+                '<line x1="%s" y1="%d" x2="%s" y2="%d" stroke="black"/>'
+                % (x_pos(task_stats.min), mid, x_pos(task_stats.max), mid),
+                '<rect x="%s" y="%d" width="%.1f" height="%d"'
+                ' fill="#d0e0f0" stroke="black"/>'
+                % (x_pos(q_1), top, (q_3 - q_1) * scale,
+                   2 * (mid - top)),
+                '<line x1="%s" y1="%d" x2="%s" y2="%d" stroke="green"'
+                ' stroke-width="2"/>'
+                % (x_pos(q_2), top, x_pos(q_2), 2 * mid - top),
+            ])
+        axis = row_height * len(stats) + 4
+        lines.append(
+            '<line x1="%s" y1="%d" x2="%s" y2="%d" stroke="black"/>'
+            % (x_pos(lower), axis, x_pos(upper), axis))
+        for i in range(5):
+            value = lower + (upper - lower) * i / 4
+            lines.append(
+                '<text x="%s" y="%d" text-anchor="middle" font-size="12">'
+                '%s</text>' % (x_pos(value), axis + 16, '%g' % value))
+        lines.append(
+            '<text x="%s" y="%d" text-anchor="middle" font-size="12">'
+            'Seconds</text></svg>\n'
+            % (x_pos((lower + upper) / 2), axis + 36))
+        return '\n'.join(lines)
 
 
 if __name__ == "__main__":
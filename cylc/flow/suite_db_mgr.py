@@ -26,18 +26,147 @@ This module provides the logic to:
 import json
 import os
 import packaging.version
+from queue import Empty, Full, Queue
 from shutil import copy, rmtree
+import sqlite3
 from tempfile import mkstemp
+from threading import Thread
+from time import time
 
 
 from cylc.flow import LOG
 from cylc.flow.broadcast_report import get_broadcast_change_iter
+from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
+from cylc.flow.cycling.loader import get_point
 from cylc.flow.rundb import CylcSuiteDAO
+from cylc.flow.task_id import TaskID
 from cylc.flow import __version__ as CYLC_VERSION
 from cylc.flow.wallclock import get_current_time_string, get_utc_mode
 from cylc.flow.exceptions import SuiteServiceFileError
 
 
+class PublicDatabaseWriter(Thread):
+    """Write to the public database in a background thread.
+
+    The main loop hands over batches of operations after writing them to the
+    private database. If the writer falls behind, all batches waiting in the
+    queue are written in a single transaction. If the queue fills up, further
+    batches are dropped and the public database should be recovered from the
+    private database (see SuiteDatabaseManager.recover_pub_from_pri).
+
+    Batches are lists of (method, table_name, *args) tuples where method is
+    one of the CylcSuiteDAO "add_*_item" methods.
+
+    """
+
+    MAX_QUEUE_SIZE = 1000
+    RETRY_DELAY = 1.0
+    STOP_TIMEOUT = 30.0
+
+    def __init__(self, db_file_name):
+        Thread.__init__(self, name='public database writer', daemon=True)
+        self.db_file_name = db_file_name
+        self.queue = Queue(self.MAX_QUEUE_SIZE)
+        # Batches have been dropped (the queue was full).
+        self.overflowed = False
+        # Number of consecutive failed write attempts.
+        self.n_tries = 0
+        # Seconds between the oldest batch in the last write being queued and
+        # being committed.
+        self.lag = 0.0
+        # Number of batches in the last write.
+        self.n_coalesced = 0
+        # Stop without writing any more (see abandon).
+        self.abandoned = False
+
+    def put(self, batch):
+        """Queue a batch of operations, return False if it was dropped."""
+        try:
+            self.queue.put_nowait((time(), batch))
+        except Full:
+            self.overflowed = True
+            return False
+        return True
+
+    def stop(self):
+        """Write queued batches and wait for the thread to end.
+
+        Give up waiting after STOP_TIMEOUT seconds (e.g. if a write is stuck
+        on a hung filesystem), the thread is a daemon so will not prevent
+        the process from exiting.
+
+        """
+        if self.is_alive():
+            deadline = time() + self.STOP_TIMEOUT
+            try:
+                self.queue.put(None, timeout=self.STOP_TIMEOUT)
+            except Full:
+                pass
+            self.join(max(deadline - time(), 0))
+            if self.is_alive():
+                LOG.warning(
+                    f'{self.db_file_name}: gave up waiting for writes to'
+                    f' finish after {self.STOP_TIMEOUT}s')
+
+    def abandon(self):
+        """Discard queued batches and stop, without waiting for the thread.
+
+        Nothing more is written once the current write (if any) has finished
+        or failed, e.g. so the public database can be replaced.
+
+        """
+        self.abandoned = True
+        try:
+            while True:
+                self.queue.get_nowait()
+        except Empty:
+            pass
+        try:
+            self.queue.put_nowait(None)
+        except Full:
+            pass
+
+    def run(self):
+        """Write batches from the queue until told to stop."""
+        dao = CylcSuiteDAO(self.db_file_name, is_public=True)
+        oldest = None
+        n_pending = 0
+        stopping = False
+        while not stopping and not self.abandoned:
+            try:
+                items = [
+                    self.queue.get(
+                        timeout=self.RETRY_DELAY if n_pending else None)
+                ]
+            except Empty:
+                items = []
+            try:
+                while True:
+                    items.append(self.queue.get_nowait())
+            except Empty:
+                pass
+            for item in items:
+                if item is None:
+                    stopping = True
+                    continue
+                queued_time, batch = item
+                if oldest is None:
+                    oldest = queued_time
+                n_pending += 1
+                for method, table_name, *args in batch:
+                    getattr(dao, method)(table_name, *args)
+            if not n_pending or self.abandoned:
+                continue
+            dao.execute_queued_items()
+            self.n_tries = dao.n_tries
+            if not dao.n_tries:
+                self.lag = time() - oldest
+                self.n_coalesced = n_pending
+                oldest = None
+                n_pending = 0
+        dao.close()
+
+
 class SuiteDatabaseManager:
     """Manage the suite runtime private and public databases."""
 
@@ -84,7 +213,7 @@ class SuiteDatabaseManager:
         if pub_d:
             self.pub_path = os.path.join(pub_d, CylcSuiteDAO.DB_FILE_BASE_NAME)
         self.pri_dao = None
-        self.pub_dao = None
+        self.pub_writer = None
 
         self.db_deletes_map = {
             self.TABLE_BROADCAST_STATES: [],
@@ -110,6 +239,20 @@ class SuiteDatabaseManager:
             self.TABLE_ABS_OUTPUTS: []}
         self.db_updates_map = {}
 
+        # Flow labels of the tasks last put to the database, so that
+        # put_task_pool only writes the changes, or None to rewrite the lot:
+        # {identity: flow_label}
+        self.db_task_pool_labels = None
+        # The poll and retry timers of all tasks must be put again (the
+        # task_action_timers table has been wiped).
+        self.db_task_action_timers_wiped = False
+
+        # Submit numbers in the task_states table (for spawning tasks):
+        # {point: {name: {flow_label: submit_num}}}
+        self.submit_nums = {}
+        # Entries before this point have been evicted from submit_nums.
+        self.submit_nums_min_point = None
+
     def copy_pri_to_pub(self):
         """Copy content of primary database file to public database file.
 
@@ -117,17 +260,21 @@ class SuiteDatabaseManager:
 
         """
         temp_pub_db_file_name = None
-        self.pub_dao.close()
         try:
-            self.pub_dao.conn = None  # reset connection
-            open(self.pub_dao.db_file_name, "a").close()  # touch
-            st_mode = os.stat(self.pub_dao.db_file_name).st_mode
+            open(self.pub_path, "a").close()  # touch
+            st_mode = os.stat(self.pub_path).st_mode
             temp_pub_db_file_name = mkstemp(
-                prefix=self.pub_dao.DB_FILE_BASE_NAME,
-                dir=os.path.dirname(self.pub_dao.db_file_name))[1]
+                prefix=CylcSuiteDAO.DB_FILE_BASE_NAME,
+                dir=os.path.dirname(self.pub_path))[1]
+            self.pri_dao.checkpoint()
             copy(self.pri_dao.db_file_name, temp_pub_db_file_name)
-            os.rename(temp_pub_db_file_name, self.pub_dao.db_file_name)
-            os.chmod(self.pub_dao.db_file_name, st_mode)
+            if self.pri_dao.journal_mode == 'wal':
+                # Keep the public database readable without write access.
+                conn = sqlite3.connect(temp_pub_db_file_name)
+                conn.execute("PRAGMA journal_mode=delete")
+                conn.close()
+            os.rename(temp_pub_db_file_name, self.pub_path)
+            os.chmod(self.pub_path, st_mode)
         except (IOError, OSError):
             if temp_pub_db_file_name:
                 os.unlink(temp_pub_db_file_name)
@@ -154,9 +301,90 @@ class SuiteDatabaseManager:
         """Delete suite stop task from suite_params table."""
         self.delete_suite_params(self.KEY_STOP_TASK)
 
+    def get_submit_nums(self, name, point):
+        """Return the submit numbers of name.point by flow label.
+
+        Return:
+        {
+            flow_label: submit_num,
+            ...,
+        }
+
+        Fall back to the private database for points that have been evicted
+        from the cache.
+
+        """
+        if (
+                self.submit_nums_min_point is not None
+                and point < self.submit_nums_min_point
+        ):
+            return self.pri_dao.select_submit_nums(name, str(point))
+        return dict(self.submit_nums.get(point, {}).get(name, {}))
+
+    def evict_submit_nums(self, min_point):
+        """Drop cached submit numbers of cycle points before min_point."""
+        if (
+                self.submit_nums_min_point is not None
+                and min_point <= self.submit_nums_min_point
+        ):
+            return
+        self.submit_nums_min_point = min_point
+        for point in list(self.submit_nums):
+            if point < min_point:
+                del self.submit_nums[point]
+
+    def load_submit_nums_for_restart(self, min_point=None):
+        """Load the submit number cache from the task_states table on restart.
+
+        If min_point is specified, only load cycle points from min_point on
+        (see evict_submit_nums) rather than the entire suite history.
+        """
+        cycles = None
+        if min_point is not None:
+            self.evict_submit_nums(min_point)
+            cycles = [
+                cycle for cycle in self.pri_dao.select_task_states_cycles()
+                if get_point(cycle) >= min_point
+            ]
+        self.pri_dao.select_submit_nums_for_restart(
+            self.load_submit_num_for_restart, cycles)
+
+    def load_submit_num_for_restart(self, _, row):
+        """Load a row of the task_states table into the submit number cache.
+        """
+        cycle, name, flow_label, submit_num = row
+        (
+            self.submit_nums
+            .setdefault(get_point(cycle), {})
+            .setdefault(name, {})
+        )[flow_label] = submit_num
+
+    def _put_submit_num(self, itask, flow_label, is_new=True):
+        """Record the submit number of itask in the submit number cache.
+
+        If not is_new, only update an existing entry (as an UPDATE would).
+
+        """
+        if (
+                self.submit_nums_min_point is not None
+                and itask.point < self.submit_nums_min_point
+        ):
+            return
+        snums = (
+            self.submit_nums
+            .setdefault(itask.point, {})
+            .setdefault(itask.tdef.name, {})
+        )
+        if is_new or flow_label in snums:
+            snums[flow_label] = itask.submit_num
+
     def get_pri_dao(self):
         """Return the primary DAO."""
-        return CylcSuiteDAO(self.pri_path)
+        db_cfg = glbl_cfg().get(['scheduler', 'run database'])
+        return CylcSuiteDAO(
+            self.pri_path,
+            journal_mode=db_cfg['journal mode'],
+            synchronous=db_cfg['synchronous'])
 
     @staticmethod
     def _namedtuple2json(obj):
@@ -188,17 +416,18 @@ class SuiteDatabaseManager:
                 rmtree(self.pri_path, ignore_errors=True)
         self.pri_dao = self.get_pri_dao()
         os.chmod(self.pri_path, 0o600)
-        self.pub_dao = CylcSuiteDAO(self.pub_path, is_public=True)
         self.copy_pri_to_pub()
+        self.pub_writer = PublicDatabaseWriter(self.pub_path)
+        self.pub_writer.start()
 
     def on_suite_shutdown(self):
         """Close data access objects."""
         if self.pri_dao:
             self.pri_dao.close()
             self.pri_dao = None
-        if self.pub_dao:
-            self.pub_dao.close()
-            self.pub_dao = None
+        if self.pub_writer:
+            self.pub_writer.stop()
+            self.pub_writer = None
 
     def process_queued_ops(self):
         """Handle queued db operations for each task proxy."""
@@ -206,20 +435,21 @@ class SuiteDatabaseManager:
             return
         # Record suite parameters and tasks in pool
         # Record any broadcast settings to be dumped out
+        batch = []
         if any(self.db_deletes_map.values()):
             for table_name, db_deletes in sorted(
                     self.db_deletes_map.items()):
                 while db_deletes:
                     where_args = db_deletes.pop(0)
                     self.pri_dao.add_delete_item(table_name, where_args)
-                    self.pub_dao.add_delete_item(table_name, where_args)
+                    batch.append(('add_delete_item', table_name, where_args))
         if any(self.db_inserts_map.values()):
             for table_name, db_inserts in sorted(
                     self.db_inserts_map.items()):
                 while db_inserts:
                     db_insert = db_inserts.pop(0)
                     self.pri_dao.add_insert_item(table_name, db_insert)
-                    self.pub_dao.add_insert_item(table_name, db_insert)
+                    batch.append(('add_insert_item', table_name, db_insert))
         if (hasattr(self, 'db_updates_map') and
                 any(self.db_updates_map.values())):
             for table_name, db_updates in sorted(
@@ -228,19 +458,15 @@ class SuiteDatabaseManager:
                     set_args, where_args = db_updates.pop(0)
                     self.pri_dao.add_update_item(
                         table_name, set_args, where_args)
-                    self.pub_dao.add_update_item(
-                        table_name, set_args, where_args)
+                    batch.append(
+                        ('add_update_item', table_name, set_args, where_args))
 
-        # Previously, we used a separate thread for database writes. This has
-        # now been removed. For the private database, there is no real
-        # advantage in using a separate thread as it needs to be always in sync
-        # with what is current. For the public database, which does not need to
-        # be fully in sync, there is some advantage of using a separate
-        # thread/process, if writing to it becomes a bottleneck. At the moment,
-        # there is no evidence that this is a bottleneck, so it is better to
-        # keep the logic simple.
+        # The private database must always be in sync with what is current so
+        # is written here. The public database is written by a separate
+        # thread so that a slow file system does not hold up the main loop.
         self.pri_dao.execute_queued_items()
-        self.pub_dao.execute_queued_items()
+        if batch:
+            self.pub_writer.put(batch)
 
     def put_broadcast(self, modified_settings, is_cancel=False):
         """Put or clear broadcasts in runtime database."""
@@ -355,10 +581,21 @@ class SuiteDatabaseManager:
             self.db_inserts_map[self.TABLE_SUITE_TEMPLATE_VARS].append(
                 {"key": key, "value": value})
 
+    def put_delete_cycles(self, cycles):
+        """Put statements to delete the task history of cycle points.
+
+        See CylcSuiteDAO.TABLES_ARCHIVED.
+        """
+        for table_name in CylcSuiteDAO.TABLES_ARCHIVED:
+            for cycle in cycles:
+                self.db_deletes_map.setdefault(table_name, []).append(
+                    {"cycle": cycle})
+
     def put_task_event_timers(self, task_events_mgr):
         """Put statements to update the task_action_timers table."""
         if task_events_mgr.event_timers_updated:
             self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
+            self.db_task_action_timers_wiped = True
             for key, timer in task_events_mgr._event_timers.items():
                 key1, point, name, submit_num = key
                 self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
@@ -402,77 +639,142 @@ class SuiteDatabaseManager:
         self.db_updates_map[self.TABLE_TASK_STATES].append(
             (set_args, where_args))
 
-    def put_task_pool(self, pool):
+    def put_task_pool(self, pool, updated_tasks=None):
         """Update various task tables for current pool, in runtime database.
 
-        Queue delete (everything) statements to wipe the tables, and queue the
-        relevant insert statements for the current tasks in the pool.
+        Queue delete and insert statements to rewrite the rows of the task
+        pool, prerequisites, timeout timers and poll/retry timers of tasks
+        added to the pool or updated since the last call, and delete
+        statements for the rows of tasks no longer in the pool. The first
+        time, queue delete (everything) statements to wipe the tables and
+        insert rows for all tasks in the pool.
+
+        Args:
+            pool (cylc.flow.task_pool.TaskPool):
+                The task pool.
+            updated_tasks (list):
+                Tasks updated since the last call, default the tasks with
+                .state.is_updated set.
+
         """
-        self.db_deletes_map[self.TABLE_TASK_POOL].append({})
-        self.db_deletes_map[self.TABLE_TASK_PREREQUISITES].append({})
-        # No need to do:
-        # self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
-        # Should already be done by self.put_task_event_timers above.
-        self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
-        for itask in pool.get_all_tasks():
-            # Update the task_prerequisites table:
-            for prereq in itask.state.prerequisites:
-                for (p_name, p_cycle, p_output), satisfied_state in (
-                        prereq.satisfied.items()):
-                    self.put_insert_task_prerequisites(itask, {
-                        "prereq_name": p_name,
-                        "prereq_cycle": p_cycle,
-                        "prereq_output": p_output,
-                        "satisfied": satisfied_state})
-            self.db_inserts_map[self.TABLE_TASK_POOL].append({
-                "name": itask.tdef.name,
-                "cycle": str(itask.point),
-                "flow_label": itask.flow_label,
-                "status": itask.state.status,
-                "is_held": itask.state.is_held})
-            if itask.timeout is not None:
-                self.db_inserts_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "timeout": itask.timeout})
-            if itask.poll_timer is not None:
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps("poll_timer"),
-                    "ctx": self._namedtuple2json(itask.poll_timer.ctx),
-                    "delays": json.dumps(itask.poll_timer.delays),
-                    "num": itask.poll_timer.num,
-                    "delay": itask.poll_timer.delay,
-                    "timeout": itask.poll_timer.timeout})
-            for ctx_key_1, timer in itask.try_timers.items():
-                if timer is None:
-                    continue
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps(("try_timers", ctx_key_1)),
-                    "ctx": self._namedtuple2json(timer.ctx),
-                    "delays": json.dumps(timer.delays),
-                    "num": timer.num,
-                    "delay": timer.delay,
-                    "timeout": timer.timeout})
-            if itask.state.time_updated:
-                set_args = {
-                    "time_updated": itask.state.time_updated,
-                    "submit_num": itask.submit_num,
-                    "try_num": itask.get_try_num(),
-                    "status": itask.state.status
-                }
-                where_args = {
-                    "cycle": str(itask.point),
-                    "name": itask.tdef.name,
-                    "flow_label": itask.flow_label
-                }
-                self.db_updates_map.setdefault(self.TABLE_TASK_STATES, [])
-                self.db_updates_map[self.TABLE_TASK_STATES].append(
-                    (set_args, where_args))
-                itask.state.time_updated = None
+        itasks = pool.get_all_tasks()
+        labels = {itask.identity: itask.flow_label for itask in itasks}
+        prev_labels = self.db_task_pool_labels
+        if prev_labels is None:
+            self.db_deletes_map[self.TABLE_TASK_POOL].append({})
+            self.db_deletes_map[self.TABLE_TASK_PREREQUISITES].append({})
+            # No need to do:
+            # self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
+            # Should already be done by self.put_task_event_timers above.
+            self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
+            put_tasks = itasks
+        else:
+            if updated_tasks is None:
+                updated_tasks = [
+                    itask for itask in itasks if itask.state.is_updated]
+            put_tasks = {
+                itask.identity: itask
+                for itask in updated_tasks
+                if itask.identity in labels
+            }
+            for itask in itasks:
+                # (New tasks, or tasks whose flows have merged.)
+                if prev_labels.get(itask.identity) != itask.flow_label:
+                    put_tasks[itask.identity] = itask
+            put_tasks = list(put_tasks.values())
+            for identity in prev_labels.keys() - labels.keys():
+                self._put_delete_task_pool_rows(*TaskID.split(identity))
+            for itask in put_tasks:
+                if itask.identity in prev_labels:
+                    self._put_delete_task_pool_rows(
+                        itask.tdef.name, str(itask.point))
+        for itask in put_tasks:
+            self._put_task_pool_rows(itask)
+        if self.db_task_action_timers_wiped:
+            for itask in itasks:
+                self._put_task_action_timers(itask)
+            self.db_task_action_timers_wiped = False
+        else:
+            for itask in put_tasks:
+                self._put_task_action_timers(itask)
+        self.db_task_pool_labels = labels
+
+    def _put_delete_task_pool_rows(self, name, cycle):
+        """Put statements to delete the task pool rows of a task."""
+        for table_name in (
+                self.TABLE_TASK_POOL,
+                self.TABLE_TASK_PREREQUISITES,
+                self.TABLE_TASK_TIMEOUT_TIMERS):
+            self.db_deletes_map[table_name].append(
+                {"cycle": cycle, "name": name})
+
+    def _put_task_pool_rows(self, itask):
+        """Put statements to insert the task pool rows of a task."""
+        cycle = str(itask.point)
+        name = itask.tdef.name
+        # Update the task_prerequisites table:
+        for prereq in itask.state.prerequisites:
+            for (p_name, p_cycle, p_output), satisfied_state in (
+                    prereq.satisfied.items()):
+                self.db_inserts_map[self.TABLE_TASK_PREREQUISITES].append({
+                    "cycle": cycle,
+                    "name": name,
+                    "prereq_name": p_name,
+                    "prereq_cycle": p_cycle,
+                    "prereq_output": p_output,
+                    "satisfied": satisfied_state})
+        self.db_inserts_map[self.TABLE_TASK_POOL].append({
+            "name": name,
+            "cycle": cycle,
+            "flow_label": itask.flow_label,
+            "status": itask.state.status,
+            "is_held": itask.state.is_held})
+        if itask.timeout is not None:
+            self.db_inserts_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({
+                "name": name,
+                "cycle": cycle,
+                "timeout": itask.timeout})
+        if itask.state.time_updated:
+            set_args = {
+                "time_updated": itask.state.time_updated,
+                "submit_num": itask.submit_num,
+                "try_num": itask.get_try_num(),
+                "status": itask.state.status
+            }
+            where_args = {
+                "cycle": cycle,
+                "name": name,
+                "flow_label": itask.flow_label
+            }
+            self.db_updates_map.setdefault(self.TABLE_TASK_STATES, [])
+            self.db_updates_map[self.TABLE_TASK_STATES].append(
+                (set_args, where_args))
+            self._put_submit_num(itask, itask.flow_label, is_new=False)
+            itask.state.time_updated = None
+
+    def _put_task_action_timers(self, itask):
+        """Put statements to insert the poll and retry timers of a task.
+
+        (Old rows are removed by put_task_event_timers.)
+        """
+        cycle = str(itask.point)
+        name = itask.tdef.name
+        timers = []
+        if itask.poll_timer is not None:
+            timers.append(("poll_timer", itask.poll_timer))
+        for ctx_key_1, timer in itask.try_timers.items():
+            if timer is not None:
+                timers.append((("try_timers", ctx_key_1), timer))
+        for ctx_key, timer in timers:
+            self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
+                "name": name,
+                "cycle": cycle,
+                "ctx_key": json.dumps(ctx_key),
+                "ctx": self._namedtuple2json(timer.ctx),
+                "delays": json.dumps(timer.delays),
+                "num": timer.num,
+                "delay": timer.delay,
+                "timeout": timer.timeout})
 
     def put_insert_task_events(self, itask, args):
         """Put INSERT statement for task_events table."""
@@ -491,6 +793,7 @@ class SuiteDatabaseManager:
     def put_insert_task_states(self, itask, args):
         """Put INSERT statement for task_states table."""
         self._put_insert_task_x(CylcSuiteDAO.TABLE_TASK_STATES, itask, args)
+        self._put_submit_num(itask, args.get("flow_label"))
 
     def put_insert_task_prerequisites(self, itask, args):
         """Put INSERT statement for task_prerequisites table."""
@@ -547,13 +850,24 @@ class SuiteDatabaseManager:
         self.db_updates_map[table_name].append((set_args, where_args))
 
     def recover_pub_from_pri(self):
-        """Recover public database from private database."""
-        if self.pub_dao.n_tries >= self.pub_dao.MAX_TRIES:
+        """Recover public database from private database.
+
+        If writes to the public database keep failing, or the writer has
+        fallen so far behind that batches have been dropped.
+
+        """
+        if (
+                self.pub_writer.n_tries >= CylcSuiteDAO.MAX_TRIES
+                or self.pub_writer.overflowed
+        ):
+            # Don't wait for the old writer, it may be stuck on the public
+            # database (which is replaced rather than written to).
+            self.pub_writer.abandon()
             self.copy_pri_to_pub()
             LOG.warning(
-                f"{self.pub_dao.db_file_name}: recovered from "
-                f"{self.pri_dao.db_file_name}")
-            self.pub_dao.n_tries = 0
+                f"{self.pub_path}: recovered from {self.pri_path}")
+            self.pub_writer = PublicDatabaseWriter(self.pub_path)
+            self.pub_writer.start()
 
     def on_restart(self):
         """Check & vacuum the runtime DB on restart."""
@@ -569,7 +883,11 @@ class SuiteDatabaseManager:
 
     def check_suite_db_compatibility(self):
         """Raises SuiteServiceFileError if the existing suite database is
-        incompatible with the current version of Cylc."""
+        incompatible with the current version of Cylc.
+
+        Otherwise migrate the database to the current schema.
+
+        """
         pri_dao = self.get_pri_dao()
         try:
             last_run_ver = pri_dao.connect().execute(
@@ -590,3 +908,8 @@ class SuiteDatabaseManager:
             raise SuiteServiceFileError(
                 f'Cannot restart suite last run with Cylc {last_run_ver} as '
                 f'the suite database is incompatible with Cylc {CYLC_VERSION}')
+        # Add indexes missing from databases written by older versions.
+        pri_dao = self.get_pri_dao()
+        for index_name in pri_dao.create_indexes():
+            LOG.info(f'Added index {index_name} to the suite database')
+        pri_dao.close()
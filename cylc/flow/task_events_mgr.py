@@ -65,6 +65,7 @@ from cylc.flow.task_state import (
 from cylc.flow.task_outputs import (
     TASK_OUTPUT_SUBMITTED, TASK_OUTPUT_STARTED, TASK_OUTPUT_SUCCEEDED,
     TASK_OUTPUT_FAILED, TASK_OUTPUT_SUBMIT_FAILED, TASK_OUTPUT_EXPIRED)
+from cylc.flow.timer_heap import TimerHeap
 from cylc.flow.wallclock import (
     get_current_time_string,
     get_seconds_as_interval_string as intvl_as_str
@@ -195,10 +196,15 @@ class TaskEventsManager():
         # NOTE: do not mutate directly
         # use the {add,remove,unset_waiting}_event_timers methods
         self._event_timers = {}
+        # Event timer keys by when they next need processing.
+        self._event_timer_heap = TimerHeap()
+        # Task IDs by next job poll or timeout time.
+        self._job_timer_heap = TimerHeap()
         # NOTE: flag for DB use
         self.event_timers_updated = True
         # To be set by the task pool:
         self.spawn_func = None
+        self.set_dirty_func = None
         # pflag was set to True to stimulate dependency negotiation in SoS.
         self.pflag = False
         self.timestamp = timestamp
@@ -228,6 +234,30 @@ class TaskEventsManager():
         itask.poll_timer.next(no_exhaust=True)
         return True
 
+    def add_job_timer(self, itask):
+        """Schedule the next job poll or timeout check for itask."""
+        timeouts = [itask.timeout]
+        if itask.poll_timer is not None:
+            timeouts.append(itask.poll_timer.timeout)
+        timeouts = [timeout for timeout in timeouts if timeout is not None]
+        if timeouts:
+            self._job_timer_heap.put(
+                min(timeouts), itask.identity, 'job', itask.identity)
+        else:
+            self._job_timer_heap.remove(itask.identity)
+
+    def get_due_job_timers(self, now):
+        """Return IDs of tasks with a job poll or timeout due before now."""
+        return self._job_timer_heap.pop_due(now)
+
+    def get_next_event_time(self):
+        """Return when the next event timer is due or None."""
+        return self._event_timer_heap.get_next_time()
+
+    def get_next_job_time(self):
+        """Return when the next job poll or timeout is due or None."""
+        return self._job_timer_heap.get_next_time()
+
     def check_job_time(self, itask, now):
         """Check/handle job timeout and poll timer"""
         can_poll = self.check_poll_time(itask, now)
@@ -283,9 +313,15 @@ class TaskEventsManager():
         """
         ctx_groups = {}
         now = time()
-        for id_key, timer in self._event_timers.copy().items():
+        if schd_ctx.stop_mode:
+            # don't hold back mail notifications when stopping
+            id_keys = self._event_timer_heap.pop_due(float('inf'))
+        else:
+            id_keys = self._event_timer_heap.pop_due(now)
+        for id_key in id_keys:
             key1, point, name, submit_num = id_key
-            if timer.is_waiting:
+            timer = self._event_timers.get(id_key)
+            if timer is None or timer.is_waiting:
                 continue
             # Set timer if timeout is None.
             if not timer.is_timeout_set():
@@ -305,7 +341,11 @@ class TaskEventsManager():
                         point, name, submit_num, key1,
                         timer.delay_timeout_as_str()))
             # Ready to run?
-            if not timer.is_delay_done() or (
+            if not timer.is_delay_done():
+                self._event_timer_heap.put(
+                    timer.timeout, id_key, 'event', id_key)
+                continue
+            if (
                 # Avoid flooding user's mail box with mail notification.
                 # Group together as many notifications as possible within a
                 # given interval.
@@ -314,6 +354,8 @@ class TaskEventsManager():
                 self.next_mail_time is not None and
                 self.next_mail_time > now
             ):
+                self._event_timer_heap.put(
+                    self.next_mail_time, id_key, 'event', id_key)
                 continue
 
             timer.set_waiting()
@@ -814,8 +856,11 @@ class TaskEventsManager():
                 os.getenv("CYLC_SUITE_RUN_DIR")
             )
             itask.state.add_xtrigger(label)
+        self.xtrigger_mgr.add_pending_task(itask)
         if itask.state.reset(TASK_STATUS_WAITING):
             self.data_store_mgr.delta_task_state(itask)
+        # (The clock-expire time may have passed while the job was active.)
+        self.set_dirty_func(itask)
 
     def _process_message_failed(self, itask, event_time, message):
         """Helper for process_message, handle a failed message.
@@ -1186,9 +1231,11 @@ class TaskEventsManager():
             # Reset, task not active
             itask.timeout = None
             itask.poll_timer = None
+            self.add_job_timer(itask)
             return
         ctx = (itask.submit_num, itask.state.status)
         if itask.poll_timer and itask.poll_timer.ctx == ctx:
+            self.add_job_timer(itask)
             return
         # Set poll timer
         # Set timeout
@@ -1250,6 +1297,7 @@ class TaskEventsManager():
         LOG.info('[%s] -%s', itask, message)
         # Set next poll time
         self.check_poll_time(itask)
+        self.add_job_timer(itask)
 
     def add_event_timer(self, id_key, event_timer):
         """Add a new event timer.
@@ -1260,6 +1308,8 @@ class TaskEventsManager():
 
         """
         self._event_timers[id_key] = event_timer
+        self._event_timer_heap.put(
+            event_timer.timeout or 0, id_key, 'event', id_key)
         self.event_timers_updated = True
 
     def remove_event_timer(self, id_key):
@@ -1270,6 +1320,7 @@ class TaskEventsManager():
 
         """
         del self._event_timers[id_key]
+        self._event_timer_heap.remove(id_key)
         self.event_timers_updated = True
 
     def unset_waiting_event_timer(self, id_key):
@@ -1280,4 +1331,6 @@ class TaskEventsManager():
 
         """
         self._event_timers[id_key].unset_waiting()
+        # (process on the next pass)
+        self._event_timer_heap.put(0, id_key, 'event', id_key)
         self.event_timers_updated = True
@@ -152,13 +152,18 @@ class TaskJobManager:
         """
         now = time()
         poll_tasks = set()
-        for itask in task_pool.get_tasks():
+        for id_ in self.task_events_mgr.get_due_job_timers(now):
+            itask = task_pool.get_task_by_id(id_)
+            if itask is None:
+                # task removed since the timer was set
+                continue
             if self.task_events_mgr.check_job_time(itask, now):
                 poll_tasks.add(itask)
                 if itask.poll_timer.delay is not None:
                     LOG.info(
                         '[%s] -poll now, (next in %s)',
                         itask, itask.poll_timer.delay_timeout_as_str())
+            self.task_events_mgr.add_job_timer(itask)
         if poll_tasks:
             self.poll_task_jobs(suite, poll_tasks)
 
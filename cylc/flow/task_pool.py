@@ -18,7 +18,12 @@
 
 """
 
-from fnmatch import fnmatchcase
+from bisect import bisect_left, bisect_right, insort
+from fnmatch import translate
+from functools import lru_cache
+from glob import has_magic
+from itertools import islice
+import re
 from string import ascii_letters
 import json
 from time import time
@@ -53,10 +58,27 @@ from cylc.flow.task_state import (
     TASK_OUTPUT_FAILED,
     TASK_OUTPUT_SUCCEEDED,
 )
+from cylc.flow.timer_heap import TimerHeap
 from cylc.flow.wallclock import get_current_time_string
 from cylc.flow.platforms import get_platform
 
 
+@lru_cache(maxsize=256)
+def _compile_glob(pattern):
+    """Return a function which tests if a string matches a glob pattern.
+
+    Examples:
+        >>> _compile_glob('foo')('foo'), _compile_glob('foo')('food')
+        (True, False)
+        >>> bool(_compile_glob('2021*')('20210101T0000Z'))
+        True
+
+    """
+    if not has_magic(pattern):
+        return pattern.__eq__
+    return re.compile(translate(pattern)).match
+
+
 class FlowLabelMgr:
     """
     Manage flow labels consisting of a string of one or more letters [a-zA-Z].
@@ -139,18 +161,71 @@ class FlowLabelMgr:
         return bool(labs1.intersection(labs2))
 
 
+class QueueCounter:
+    """Count the active and queued members of an internal queue.
+
+    The counts are updated by TaskState.reset (via TaskState.on_reset) as the
+    states of the members change, so the queue never needs recounting.
+
+    """
+
+    __slots__ = ['n_active', 'queued']
+
+    def __init__(self):
+        # The number of preparing, submitted or running tasks (not held).
+        self.n_active = 0
+        # IDs of queued tasks in the order they were queued.
+        self.queued = OrderedDict()
+
+    @staticmethod
+    def is_active(status, is_held):
+        """Return True if a task counts towards the queue limit."""
+        return not is_held and status in {
+            TASK_STATUS_PREPARING,
+            TASK_STATUS_SUBMITTED,
+            TASK_STATUS_RUNNING
+        }
+
+    def add(self, itask):
+        """Add a member task to the queue."""
+        itask.state.on_reset = self.update
+        self.update(
+            itask.identity,
+            (None, False),
+            (itask.state.status, itask.state.is_held))
+
+    def remove(self, itask):
+        """Remove a member task from the queue."""
+        itask.state.on_reset = None
+        self.update(
+            itask.identity,
+            (itask.state.status, itask.state.is_held),
+            (None, False))
+
+    def update(self, identity, old, new):
+        """Update the counts for a change of task state."""
+        self.n_active += self.is_active(*new) - self.is_active(*old)
+        if new[0] == TASK_STATUS_QUEUED:
+            if old[0] != TASK_STATUS_QUEUED:
+                self.queued[identity] = None
+        elif old[0] == TASK_STATUS_QUEUED:
+            del self.queued[identity]
+
+
 class TaskPool:
     """Task pool of a suite."""
 
     ERR_PREFIX_TASKID_MATCH = "No matching tasks found: "
 
-    def __init__(self, config, suite_db_mgr, task_events_mgr, data_store_mgr):
+    def __init__(self, config, suite_db_mgr, task_events_mgr, data_store_mgr,
+                 clock_heap=None, xtrigger_mgr=None):
         self.config = config
         self.stop_point = config.final_point
         self.suite_db_mgr = suite_db_mgr
         self.task_events_mgr = task_events_mgr
         # TODO this is ugly:
         self.task_events_mgr.spawn_func = self.spawn_on_output
+        self.task_events_mgr.set_dirty_func = self.set_dirty
         self.data_store_mgr = data_store_mgr
         self.flow_label_mgr = FlowLabelMgr()
 
@@ -164,8 +239,30 @@ class TaskPool:
 
         self.pool = {}
         self.runahead_pool = {}
+        # Indexes of all tasks in the main and runahead pools:
+        # {(name, point_string): itask}
+        self.task_index = {}
+        # {point: {name: itask}}
+        self.point_index = {}
+        # {name: {point: itask}}
+        self.name_index = {}
+        # The keys of point_index in order.
+        self.sorted_points = []
+        # The names of the tasks in the pool in each namespace (the task
+        # itself, its families and root) and the number of instances of each
+        # with that namespace in their definition, {namespace: {name: count}}.
+        # (Counted per instance as a reload may change the families of a
+        # task.)
+        self.namespace_index = {}
+        # Results of task selectors, cleared when the indexes change,
+        # {(point_string, name_string): [itask, ...]}.
+        self._selector_cache = {}
+        # Finished tasks in the runahead pool (e.g. loaded on restart).
+        self.finished_rh_tasks = []
         self.myq = {}
         self.queues = {}
+        # {queue: QueueCounter}
+        self.queue_counters = {}
         self.assign_queues()
 
         self.pool_list = []
@@ -173,9 +270,19 @@ class TaskPool:
         self.pool_changed = False
         self.rhpool_changed = False
 
+        # Tasks whose readiness to run must be (re)evaluated, {id: itask}.
+        self.dirty_tasks = {}
+        # Clock trigger, clock-expire (and clock xtrigger) times.
+        if clock_heap is None:
+            clock_heap = TimerHeap()
+        self.clock_heap = clock_heap
+        # Told which tasks in the pool may have xtriggers to check.
+        self.xtrigger_mgr = xtrigger_mgr
+
         self.is_held = False
         self.hold_point = None
-        self.abs_outputs_done = set()
+        # Completed absolute outputs, {task name: {(name, point, output)}}.
+        self.abs_outputs_done = {}
 
         self.stop_task_id = None
         self.stop_task_finished = False
@@ -226,6 +333,13 @@ class TaskPool:
         self.runahead_pool.setdefault(itask.point, OrderedDict())
         self.runahead_pool[itask.point][itask.identity] = itask
         self.rhpool_changed = True
+        self._add_to_index(itask)
+        if itask.state(
+            TASK_STATUS_FAILED,
+            TASK_STATUS_SUCCEEDED,
+            TASK_STATUS_EXPIRED
+        ):
+            self.finished_rh_tasks.append(itask)
 
         # add row to "task_states" table
         if is_new:
@@ -253,43 +367,36 @@ class TaskPool:
 
         """
         released = False
+        if self.sorted_points:
+            # Tasks are not normally re-spawned before the earliest point in
+            # the pool, so stop caching their submit numbers.
+            self.suite_db_mgr.evict_submit_nums(self.sorted_points[0])
         if not self.runahead_pool:
             return released
 
         # Any finished tasks can be released immediately (this can happen at
         # restart when all tasks are initially loaded into the runahead pool).
-        for itask_id_maps in self.runahead_pool.copy().values():
-            for itask in itask_id_maps.copy().values():
-                if itask.state(
-                    TASK_STATUS_FAILED,
-                    TASK_STATUS_SUCCEEDED,
-                    TASK_STATUS_EXPIRED
-                ):
-                    self.release_runahead_task(itask)
-                    released = True
-
-        points = []
-        for point, itasks in sorted(
-                self.get_tasks_by_point(incl_runahead=True).items()):
-            has_unfinished_itasks = False
-            for itask in itasks:
-                if not itask.state(
-                    TASK_STATUS_FAILED,
-                    TASK_STATUS_SUCCEEDED,
-                    TASK_STATUS_EXPIRED
-                ):
-                    has_unfinished_itasks = True
-                    break
-            if not points and not has_unfinished_itasks:
-                # We need to begin with an unfinished cycle point.
-                continue
-            points.append(point)
-
-        if not points:
-            return False
+        while self.finished_rh_tasks:
+            itask = self.finished_rh_tasks.pop()
+            if self.runahead_pool.get(itask.point, {}).get(
+                    itask.identity) is itask:
+                self.release_runahead_task(itask)
+                released = True
 
         # Get the earliest point with unfinished tasks.
-        runahead_base_point = min(points)
+        for base_idx, point in enumerate(self.sorted_points):
+            if any(
+                    not itask.state(
+                        TASK_STATUS_FAILED,
+                        TASK_STATUS_SUCCEEDED,
+                        TASK_STATUS_EXPIRED
+                    )
+                    for itask in self.point_index[point].values()
+            ):
+                break
+        else:
+            return released
+        runahead_base_point = self.sorted_points[base_idx]
 
         if isinstance(self.custom_runahead_limit, IntegerInterval):
             number_limit = int(self.custom_runahead_limit)
@@ -304,30 +411,23 @@ class TaskPool:
             # Cache for speed.
             sequence_points = self._prev_runahead_sequence_points
         else:
-            sequence_points = []
+            sequence_points = set()
             for sequence in self.config.sequences:
-                seq_point = sequence.get_next_point(runahead_base_point)
-                count = 1
-                while seq_point is not None:
-                    if number_limit is None:
-                        if (seq_point > runahead_base_point +
-                                runahead_time_limit):
-                            break
-                    else:
-                        if count > number_limit:
-                            break
-                        count += 1
-                    sequence_points.append(seq_point)
-                    seq_point = sequence.get_next_point(seq_point)
-            sequence_points = set(sequence_points)
+                if number_limit is None:
+                    sequence_points.update(sequence.get_points_between(
+                        runahead_base_point,
+                        runahead_base_point + runahead_time_limit))
+                else:
+                    sequence_points.update(sequence.iter_points(
+                        runahead_base_point, number_limit))
             self._prev_runahead_sequence_points = sequence_points
             self._prev_runahead_base_point = runahead_base_point
 
-        points = set(points).union(sequence_points)
-
         if number_limit is not None:
             # Calculate which tasks to release based on a maximum number of
             # active cycle points (active meaning non-finished tasks).
+            points = sequence_points.union(
+                self.sorted_points[base_idx:base_idx + number_limit])
             latest_allowed_point = sorted(points)[:number_limit][-1]
             if self.max_future_offset is not None:
                 # For the first N points, release their future trigger tasks.
@@ -348,19 +448,22 @@ class TaskPool:
         if self.stop_point and latest_allowed_point > self.stop_point:
             latest_allowed_point = self.stop_point
 
-        for point, itask_id_map in self.runahead_pool.copy().items():
-            if point <= latest_allowed_point:
-                for itask in itask_id_map.copy().values():
-                    if itask.is_task_prereqs_not_done():
-                        # Only release if all prerequisites are satisfied.
-                        continue
-                    self.release_runahead_task(itask)
-                    released = True
+        for point in self.sorted_points[
+                :bisect_right(self.sorted_points, latest_allowed_point)]:
+            if point not in self.runahead_pool:
+                continue
+            for itask in list(self.runahead_pool[point].values()):
+                if itask.is_task_prereqs_not_done():
+                    # Only release if all prerequisites are satisfied.
+                    continue
+                self.release_runahead_task(itask)
+                released = True
         return released
 
     def load_abs_outputs_for_restart(self, row_idx, row):
         cycle, name, output = row
-        self.abs_outputs_done.add((name, cycle, output))
+        self.abs_outputs_done.setdefault(name, set()).add(
+            (name, cycle, output))
 
     def load_db_task_pool_for_restart(self, row_idx, row):
         """Load tasks from DB task pool/states/jobs tables, to runahead pool.
@@ -374,7 +477,8 @@ class TaskPool:
             LOG.info("LOADING task proxies")
         # Create a task proxy corresponding to this DB entry.
         (cycle, name, flow_label, is_late, status, is_held, submit_num, _,
-         platform_name, time_submit, time_run, timeout, outputs_str) = row
+         platform_name, time_submit, time_run, timeout, outputs_str,
+         prereqs) = row
         try:
             itask = TaskProxy(
                 self.config.get_taskdef(name),
@@ -403,6 +507,7 @@ class TaskPool:
                     itask.set_summary_time('started', time_run)
                 if timeout is not None:
                     itask.timeout = timeout
+                    self.task_events_mgr.add_job_timer(itask)
             elif status == TASK_STATUS_PREPARING:
                 # put back to be readied again.
                 status = TASK_STATUS_WAITING
@@ -426,14 +531,12 @@ class TaskPool:
             # Update prerequisite satisfaction status from DB
             sat = {}
             for prereq_name, prereq_cycle, prereq_output, satisfied in (
-                    self.suite_db_mgr.pri_dao.select_task_prerequisites(
-                        cycle, name)):
+                    prereqs):
                 key = (prereq_name, prereq_cycle, prereq_output)
                 sat[key] = satisfied if satisfied != '0' else False
 
             for itask_prereq in itask.state.prerequisites:
-                for key, _ in itask_prereq.satisfied.items():
-                    itask_prereq.satisfied[key] = sat[key]
+                itask_prereq.set_message_states(sat)
 
             itask.state.reset(status)
             self.add_to_runahead_pool(itask, is_new=False)
@@ -474,6 +577,7 @@ class TaskPool:
                 return
             itask.poll_timer = TaskActionTimer(
                 ctx, delays, num, delay, timeout)
+            self.task_events_mgr.add_job_timer(itask)
         elif ctx_key[0] == "try_timers":
             itask = self.get_task_by_id(id_)
             if itask is None:
@@ -529,9 +633,14 @@ class TaskPool:
             queue = self.config.Q_DEFAULT
         self.queues.setdefault(queue, OrderedDict())
         self.queues[queue][itask.identity] = itask
+        self.queue_counters.setdefault(queue, QueueCounter()).add(itask)
         self.pool.setdefault(itask.point, {})
         self.pool[itask.point][itask.identity] = itask
         self.pool_changed = True
+        self.add_clock_timers(itask)
+        if self.xtrigger_mgr is not None:
+            self.xtrigger_mgr.add_pending_task(itask)
+        self.set_dirty(itask)
         LOG.debug("[%s] -released to the task pool", itask)
 
         # The following two could be called in separate places,
@@ -592,8 +701,14 @@ class TaskPool:
                 if not self.pool[itask.point]:
                     del self.pool[itask.point]
                 self.pool_changed = True
+                self.dirty_tasks.pop(itask.identity, None)
+                self.clock_heap.remove(itask.identity)
+                if self.xtrigger_mgr is not None:
+                    self.xtrigger_mgr.remove_pending_task(itask)
                 if itask.tdef.name in self.myq:  # A reload can remove a task
-                    del self.queues[self.myq[itask.tdef.name]][itask.identity]
+                    queue = self.myq[itask.tdef.name]
+                    del self.queues[queue][itask.identity]
+                    self.queue_counters[queue].remove(itask)
                 if itask.tdef.max_future_prereq_offset is not None:
                     self.set_max_future_offset()
         else:
@@ -602,6 +717,8 @@ class TaskPool:
                 del self.runahead_pool[itask.point]
             self.rhpool_changed = True
 
+        self._remove_from_index(itask)
+
         # Notify the data-store manager of their removal
         # (the manager uses window boundary tracking for pruning).
         self.data_store_mgr.remove_pool_node(itask.tdef.name, itask.point)
@@ -611,6 +728,49 @@ class TaskPool:
         LOG.debug("[%s] -%s", itask, msg)
         del itask
 
+    def _add_to_index(self, itask):
+        """Add itask to the task indexes."""
+        name = itask.tdef.name
+        self._selector_cache.clear()
+        self.task_index[(name, str(itask.point))] = itask
+        for namespace in itask.tdef.namespace_hierarchy:
+            names = self.namespace_index.setdefault(namespace, {})
+            names[name] = names.get(name, 0) + 1
+        if itask.point not in self.point_index:
+            insort(self.sorted_points, itask.point)
+        self.point_index.setdefault(itask.point, {})[name] = itask
+        self.name_index.setdefault(name, {})[itask.point] = itask
+
+    def _remove_from_index(self, itask):
+        """Remove itask from the task indexes."""
+        name = itask.tdef.name
+        self._selector_cache.clear()
+        if self.task_index.pop((name, str(itask.point)), None) is not None:
+            for namespace in itask.tdef.namespace_hierarchy:
+                names = self.namespace_index[namespace]
+                names[name] -= 1
+                if not names[name]:
+                    del names[name]
+                    if not names:
+                        del self.namespace_index[namespace]
+        for index, key1, key2 in (
+                (self.point_index, itask.point, name),
+                (self.name_index, name, itask.point)
+        ):
+            try:
+                del index[key1][key2]
+            except KeyError:
+                continue
+            if not index[key1]:
+                del index[key1]
+        if itask.point not in self.point_index:
+            idx = bisect_left(self.sorted_points, itask.point)
+            if (
+                    idx < len(self.sorted_points)
+                    and self.sorted_points[idx] == itask.point
+            ):
+                del self.sorted_points[idx]
+
     def get_all_tasks(self):
         """Return a list of all task proxies."""
         return self.get_rh_tasks() + self.get_tasks()
@@ -635,30 +795,75 @@ class TaskPool:
 
     def get_tasks_by_point(self, incl_runahead):
         """Return a map of task proxies by cycle point."""
-        point_itasks = {}
-        for point, itask_id_map in self.pool.items():
-            point_itasks[point] = list(itask_id_map.values())
-
-        if not incl_runahead:
-            return point_itasks
-
-        for point, itask_id_map in self.runahead_pool.items():
-            point_itasks.setdefault(point, [])
-            point_itasks[point].extend(list(itask_id_map.values()))
-        return point_itasks
+        if incl_runahead:
+            itask_maps = self.point_index
+        else:
+            itask_maps = self.pool
+        return {
+            point: list(itask_map.values())
+            for point, itask_map in itask_maps.items()
+        }
 
     def get_task_by_id(self, id_):
         """Return task by ID if in the runahead pool or main pool.
 
         Return None if task does not exist.
         """
-        for itask_ids in (
-                list(self.queues.values())
-                + list(self.runahead_pool.values())):
-            try:
-                return itask_ids[id_]
-            except KeyError:
-                pass
+        return self.task_index.get(tuple(TaskID.split(id_)))
+
+    def set_dirty(self, itask):
+        """Flag a task for a readiness check in the next get_ready_tasks.
+
+        Call this whenever something that could make the task ready to run
+        changes (prerequisites, xtriggers, external triggers, hold state or
+        manual trigger). Tasks not (yet) in the main pool are ignored by
+        get_ready_tasks, they are flagged again on release.
+
+        """
+        self.dirty_tasks[itask.identity] = itask
+
+    def has_tasks_to_check(self):
+        """Return True if get_ready_tasks might queue any tasks."""
+        return bool(self.dirty_tasks)
+
+    def add_clock_timers(self, itask):
+        """Add itask's clock trigger and clock-expire times to the clock heap.
+
+        Items in the clock heap are (itask, callback) pairs. When due,
+        callback(itask) returns True if itask might now be ready to run (or
+        has expired).
+
+        The clock-expire item is used up even if itask is not waiting (or is
+        held) when it is due, so tasks must be flagged with set_dirty when
+        they are reset to waiting or released, for get_ready_tasks to
+        expire them.
+
+        """
+        if (
+                itask.tdef.clocktrigger_offset is not None
+                and not itask.is_waiting_clock_done()
+        ):
+            self.clock_heap.put(
+                itask.clock_trigger_time,
+                itask.identity,
+                'clock-trigger',
+                (itask, lambda _: True)
+            )
+        if itask.tdef.expiration_offset is not None:
+            if itask.expire_time is None:
+                itask.expire_time = (
+                    itask.get_point_as_seconds() +
+                    itask.get_offset_as_seconds(itask.tdef.expiration_offset))
+            self.clock_heap.put(
+                itask.expire_time,
+                itask.identity,
+                'expire',
+                (itask, self._expire_task)
+            )
+
+    def _expire_task(self, itask):
+        """Clock heap callback: expire itask if it is still waiting."""
+        return self.set_expired_task(itask, time())
 
     def get_ready_tasks(self):
         """
@@ -678,63 +883,63 @@ class TaskPool:
         after use so that two manual trigger ops are required to submit
         an initially unqueued task that is queue-limited.
 
+        Only tasks flagged with set_dirty are checked in step 1. Waiting
+        tasks found to be past their clock-expire time are expired.
+
         Return the tasks that are dequeued.
 
         """
         ready_tasks = []
         qconfig = self.config.cfg['scheduling']['queues']
 
-        for queue in self.queues:
-            # 1) queue unqueued tasks that are ready to run or manually forced
-            for itask in list(self.queues[queue].values()):
-                if not itask.state(TASK_STATUS_QUEUED):
-                    # only need to check that unqueued tasks are ready
-                    check_items = itask.is_ready()
-                    # use this periodic checking point for data-store delta
-                    # creation, some items aren't event driven (i.e. clock).
-                    if itask.tdef.clocktrigger_offset is not None:
-                        self.data_store_mgr.delta_task_clock_trigger(
-                            itask, check_items)
-                    if all(check_items):
-                        # queue the task
-                        itask.state.reset(TASK_STATUS_QUEUED)
-                        itask.reset_manual_trigger()
-                        # move the task to the back of the queue
-                        self.queues[queue][itask.identity] = \
-                            self.queues[queue].pop(itask.identity)
-                        self.data_store_mgr.delta_task_state(itask)
+        # 1) queue unqueued tasks that are ready to run or manually forced
+        forced = {}
+        check_tasks = list(self.dirty_tasks.values())
+        self.dirty_tasks.clear()
+        now = time()
+        for itask in check_tasks:
+            queue = self.myq.get(itask.tdef.name, self.config.Q_DEFAULT)
+            if itask.identity not in self.queues.get(queue, {}):
+                # not in the main pool (yet)
+                continue
+            if itask.state(TASK_STATUS_QUEUED):
+                # only need to check that unqueued tasks are ready
+                if itask.manual_trigger:
+                    forced.setdefault(queue, []).append(itask)
+                continue
+            if self.set_expired_task(itask, now):
+                continue
+            check_items = itask.is_ready()
+            # use this checking point for data-store delta creation, the
+            # clock trigger isn't otherwise event driven.
+            if itask.tdef.clocktrigger_offset is not None:
+                self.data_store_mgr.delta_task_clock_trigger(
+                    itask, check_items)
+            if all(check_items):
+                # queue the task
+                # (this puts the task at the back of the queue)
+                itask.state.reset(TASK_STATUS_QUEUED)
+                itask.reset_manual_trigger()
+                self.data_store_mgr.delta_task_state(itask)
 
+        for queue, counter in self.queue_counters.items():
             # 2) submit queued tasks if manually forced or not queue-limited
-            n_active = 0
-            n_release = 0
             n_limit = qconfig[queue]['limit']
-            tasks = list(self.queues[queue].values())
-
-            # 2.1) count active tasks and compare to queue limit
+            # 2.1) manually forced tasks jump to the front of the queue
+            for itask in forced.get(queue, []):
+                counter.queued.move_to_end(itask.identity, last=False)
+            # 2.2) compare active tasks to the queue limit
             if n_limit:
-                for itask in tasks:
-                    if itask.state(
-                            TASK_STATUS_PREPARING,
-                            TASK_STATUS_SUBMITTED,
-                            TASK_STATUS_RUNNING,
-                            is_held=False
-                    ):
-                        n_active += 1
-                n_release = n_limit - n_active
-
-            # 2.2) release queued tasks if not limited or if manually forced
-            for itask in tasks:
-                if not itask.state(TASK_STATUS_QUEUED):
-                    # (Excludes tasks remaining TASK_STATUS_PREPARING because
-                    # job submission has been stopped with 'cylc shutdown').
-                    continue
-                if itask.manual_trigger or not n_limit or n_release > 0:
-                    # manual release, or no limit, or not currently limited
-                    n_release -= 1
-                    ready_tasks.append(itask)
-                    itask.reset_manual_trigger()
-                    # (Set to 'ready' is done just before job submission).
-                # else leaved queued
+                n_release = max(
+                    n_limit - counter.n_active, len(forced.get(queue, [])))
+            else:
+                n_release = len(counter.queued)
+            # 2.3) release queued tasks from the front of the queue
+            for id_ in islice(counter.queued, n_release):
+                itask = self.queues[queue][id_]
+                ready_tasks.append(itask)
+                itask.reset_manual_trigger()
+                # (Set to 'ready' is done just before job submission).
 
         LOG.debug('%d task(s) de-queued' % len(ready_tasks))
 
@@ -803,14 +1008,18 @@ class TaskPool:
         # self.queues[queue][id_] = task
         self.assign_queues()
         new_queues = {}
+        new_queue_counters = {}
         for queue in self.queues:
             for id_, itask in self.queues[queue].items():
+                self.queue_counters[queue].remove(itask)
                 if itask.tdef.name not in self.myq:
                     continue
                 key = self.myq[itask.tdef.name]
                 new_queues.setdefault(key, OrderedDict())
                 new_queues[key][id_] = itask
+                new_queue_counters.setdefault(key, QueueCounter()).add(itask)
         self.queues = new_queues
+        self.queue_counters = new_queue_counters
 
     def reload_taskdefs(self):
         """Reload the definitions of task proxies in the pool.
@@ -1038,6 +1247,7 @@ class TaskPool:
         for itask in itasks:
             if itask.state.reset(is_held=False):
                 self.data_store_mgr.delta_task_held(itask)
+                self.set_dirty(itask)
         return len(bad_items)
 
     def hold_all_tasks(self):
@@ -1086,8 +1296,8 @@ class TaskPool:
         suicide = []
         for c_name, c_point, is_abs in children:
             if is_abs:
-                self.abs_outputs_done.add((itask.tdef.name,
-                                          str(itask.point), output))
+                self.abs_outputs_done.setdefault(itask.tdef.name, set()).add(
+                    (itask.tdef.name, str(itask.point), output))
                 self.suite_db_mgr.put_insert_abs_output(
                     str(itask.point), itask.tdef.name, output)
                 self.suite_db_mgr.process_queued_ops()
@@ -1102,20 +1312,20 @@ class TaskPool:
             if c_task is not None:
                 # Update downstream prerequisites directly.
                 if is_abs:
-                    tasks, _ = self.filter_task_proxies([c_name])
+                    # Every instance of the child in the pool.
+                    tasks = list(self.name_index.get(c_name, {}).values())
                 else:
                     tasks = [c_task]
                 for t in tasks:
                     t.state.satisfy_me(
                         set([(itask.tdef.name, str(itask.point), output)]))
                     self.data_store_mgr.delta_task_prerequisite(t)
+                    self.set_dirty(t)
                 # Event-driven suicide.
                 if (c_task.state.suicide_prerequisites and
                         c_task.state.suicide_prerequisites_all_satisfied()):
                     suicide.append(c_task)
 
-                # TODO event-driven submit: check if prereqs are satisfied now.
-
         for c_task in suicide:
             if c_task.state(
                     TASK_STATUS_PREPARING,
@@ -1157,7 +1367,7 @@ class TaskPool:
 
     def get_task(self, name, point, flow_label=None):
         """Return existing task proxy and merge flow label if found."""
-        itask = self.get_task_by_id(TaskID.get(name, point))
+        itask = self.task_index.get((name, str(point)))
         if itask is None:
             LOG.debug('Task %s.%s not found in task pool.', name, point)
             return None
@@ -1195,7 +1405,7 @@ class TaskPool:
             return None
 
         # Get submit number by flow label {flow_label: submit_num, ...}
-        snums = self.suite_db_mgr.pri_dao.select_submit_nums(name, str(point))
+        snums = self.suite_db_mgr.get_submit_nums(name, point)
         try:
             submit_num = max(snums.values())
         except ValueError:
@@ -1243,9 +1453,13 @@ class TaskPool:
                 self.data_store_mgr.delta_task_held(itask)
 
         # Attempt to satisfy any absolute triggers now.
-        # TODO: consider doing this only for tasks with absolute prerequisites.
-        if itask.state.prerequisites_are_not_all_satisfied():
-            itask.state.satisfy_me(self.abs_outputs_done)
+        if (
+                self.abs_outputs_done
+                and itask.state.prerequisites_are_not_all_satisfied()
+        ):
+            for name in itask.state.get_prerequisite_task_names():
+                if name in self.abs_outputs_done:
+                    itask.state.satisfy_me(self.abs_outputs_done[name])
 
         if parent_id is not None:
             msg = "(" + parent_id + ") spawned %s.%s flow(%s)"
@@ -1328,6 +1542,7 @@ class TaskPool:
                 itask.state.set_prerequisites_all_satisfied()
                 self.data_store_mgr.delta_task_prerequisite(itask)
                 self.data_store_mgr.delta_task_outputs(itask)
+                self.set_dirty(itask)
         return n_warnings
 
     def sim_time_check(self, message_queue):
@@ -1428,12 +1643,8 @@ class TaskPool:
                         # point_str may be a glob
                         pass
                 tasks_found = False
-                for itask in self.get_all_tasks():
-                    nss = itask.tdef.namespace_hierarchy
-                    if (fnmatchcase(str(itask.point), point_str) and
-                            (not status or itask.state.status == status) and
-                            (fnmatchcase(itask.tdef.name, name_str) or
-                             any(fnmatchcase(ns, name_str) for ns in nss))):
+                for itask in self._match_tasks(point_str, name_str):
+                    if not status or itask.state.status == status:
                         itasks.append(itask)
                         tasks_found = True
                 if not tasks_found:
@@ -1441,6 +1652,51 @@ class TaskPool:
                     bad_items.append(item)
         return itasks, bad_items
 
+    def _match_tasks(self, point_str, name_str):
+        """Return the tasks in the pool which match point_str and name_str.
+
+        Args:
+            point_str (str):
+                Glob matching cycle points.
+            name_str (str):
+                Glob matching the names of tasks or their families.
+
+        """
+        key = (point_str, name_str)
+        try:
+            return self._selector_cache[key]
+        except KeyError:
+            pass
+        match_name = _compile_glob(name_str)
+        if has_magic(name_str):
+            names = set()
+            for namespace, members in self.namespace_index.items():
+                if match_name(namespace):
+                    names.update(members)
+        else:
+            names = self.namespace_index.get(name_str, {})
+        if not has_magic(point_str) and len(names) == 1:
+            itask = self.task_index.get((next(iter(names)), point_str))
+            itasks = [itask] if itask else []
+        else:
+            match_point = _compile_glob(point_str)
+            itasks = []
+            for point in self.sorted_points:
+                if match_point(str(point)):
+                    itasks.extend(
+                        itask
+                        for name, itask in self.point_index[point].items()
+                        if name in names
+                    )
+        # Instances of a task may differ in their families after a reload.
+        itasks = [
+            itask
+            for itask in itasks
+            if any(map(match_name, itask.tdef.namespace_hierarchy))
+        ]
+        self._selector_cache[key] = itasks
+        return itasks
+
     def stop_flow(self, flow_label):
         """Stop a particular flow from spawning any further."""
         # Stop tasks belong to flow_label from continuing.
@@ -328,8 +328,6 @@ class TaskProxy:
             return (True,)
         if self.state.is_held:
             return (False,)
-        if self.state.status in self.try_timers:
-            return (self.try_timers[self.state.status].is_delay_done(),)
         return (
             self.state(TASK_STATUS_WAITING),
             self.is_waiting_clock_done(),
@@ -187,9 +187,13 @@ class TaskState:
         .identity (str):
             The task ID as `TASK.CYCLE` associated with this object.
         .is_updated (boolean):
-            Has the status been updated since previous update?
+            Has the status (or prerequisites) been updated since previous
+            update?
         .kill_failed (boolean):
             Has a job kill attempt failed since previous status change?
+        .on_reset (callable):
+            Called on each change of status or is_held with the arguments
+            (identity, (old_status, old_is_held), (status, is_held)).
         .outputs (cylc.flow.task_outputs.TaskOutputs):
             Known outputs of the task.
         .prerequisites (list<cylc.flow.prerequisite.Prerequisite>):
@@ -215,6 +219,7 @@ class TaskState:
         "identity",
         "is_updated",
         "kill_failed",
+        "on_reset",
         "outputs",
         "prerequisites",
         "status",
@@ -231,6 +236,7 @@ class TaskState:
         self.is_held = is_held
         self.is_updated = False
         self.time_updated = None
+        self.on_reset = None
 
         self._is_satisfied = None
         self._suicide_is_satisfied = None
@@ -299,6 +305,7 @@ class TaskState:
                 if prereq.satisfy_me(all_task_outputs):
                     self._is_satisfied = None
                     self._suicide_is_satisfied = None
+                    self.is_updated = True
 
     def xtriggers_all_satisfied(self):
         """Return True if all xtriggers are satisfied."""
@@ -328,6 +335,15 @@ class TaskState:
         return set(point for prerequisite in self.prerequisites for
                    point in prerequisite.get_target_points())
 
+    def get_prerequisite_task_names(self):
+        """Return the names of the tasks my prerequisites depend on."""
+        return set(
+            message[0]
+            for prereqs in [self.prerequisites, self.suicide_prerequisites]
+            for prereq in prereqs
+            for message in prereq.messages
+        )
+
     def prerequisites_eval_all(self):
         """Set all prerequisites to satisfied."""
         # (Validation: will abort on illegal trigger expressions.)
@@ -340,12 +356,14 @@ class TaskState:
         for prereq in self.prerequisites:
             prereq.set_satisfied()
         self._is_satisfied = None
+        self.is_updated = True
 
     def set_prerequisites_not_satisfied(self):
         """Reset prerequisites."""
         for prereq in self.prerequisites:
             prereq.set_not_satisfied()
         self._is_satisfied = None
+        self.is_updated = True
 
     def prerequisites_dump(self, list_prereqs=False):
         """Dump prerequisites."""
@@ -403,6 +421,8 @@ class TaskState:
 
         # perform the actual state change
         self.status, self.is_held = requested_status
+        if self.on_reset is not None:
+            self.on_reset(self.identity, current_status, requested_status)
 
         self.time_updated = get_current_time_string()
         self.is_updated = True
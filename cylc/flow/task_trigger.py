@@ -17,7 +17,7 @@
 from cylc.flow.cycling.loader import (
     get_point, get_point_relative, get_interval)
 from cylc.flow.exceptions import TriggerExpressionError
-from cylc.flow.prerequisite import Prerequisite
+from cylc.flow.prerequisite import Condition, Prerequisite
 from cylc.flow.task_outputs import (
     TASK_OUTPUT_EXPIRED, TASK_OUTPUT_SUBMITTED, TASK_OUTPUT_SUBMIT_FAILED,
     TASK_OUTPUT_STARTED, TASK_OUTPUT_SUCCEEDED, TASK_OUTPUT_FAILED)
@@ -176,12 +176,17 @@ class Dependency:
 
     """
 
-    __slots__ = ['_exp', 'task_triggers', 'suicide']
+    __slots__ = ['_exp', 'task_triggers', 'suicide', '_condition', '_terms']
 
     def __init__(self, exp, task_triggers, suicide):
         self._exp = exp
         self.task_triggers = tuple(task_triggers)  # More memory efficient.
         self.suicide = suicide
+        # The compiled conditional expression (see get_condition).
+        self._condition = False
+        # The index of the prerequisite message of each term of the
+        # condition: message i is that of self.task_triggers[i].
+        self._terms = tuple(range(len(self.task_triggers)))
 
     def get_prerequisite(self, point, tdef):
         """Generate a Prerequisite object from this dependency.
@@ -200,7 +205,9 @@ class Dependency:
         cpre = Prerequisite(point, tdef.start_point)
 
         # Loop over TaskTrigger instances.
-        for task_trigger in self.task_triggers:
+        messages = []
+        pre_initial = 0
+        for ind, task_trigger in enumerate(self.task_triggers):
             if task_trigger.cycle_point_offset is not None:
                 # Inter-cycle trigger - compute the trigger's cycle point from
                 # its offset.
@@ -214,21 +221,39 @@ class Dependency:
                              tdef.max_future_prereq_offset)):
                         tdef.max_future_prereq_offset = (
                             prereq_offset)
-                pre_initial = ((prereq_offset_point < tdef.start_point) &
-                               (point >= tdef.start_point))
-                cpre.add(task_trigger.task_name,
-                         task_trigger.get_point(point),
-                         task_trigger.output,
-                         pre_initial)
-            else:
-                # Trigger is within the same cycle point.
-                # Register task message with Prerequisite object.
-                cpre.add(task_trigger.task_name,
-                         task_trigger.get_point(point),
-                         task_trigger.output)
-        cpre.set_condition(self.get_expression(point))
+                if prereq_offset_point < tdef.start_point <= point:
+                    pre_initial |= 1 << ind
+            messages.append((task_trigger.task_name,
+                             str(task_trigger.get_point(point)),
+                             task_trigger.output))
+        # Register task messages with Prerequisite object.
+        cpre.set_messages(messages, pre_initial)
+        cpre.set_compiled_condition(self.get_condition(), self._terms)
         return cpre
 
+    def get_condition(self):
+        """Return the expression compiled for use by Prerequisites.
+
+        The terms of the Condition correspond to self.task_triggers.
+
+        Return:
+            cylc.flow.prerequisite.Condition: The compiled expression, or
+            None if the expression has no "|" (it is a plain list of
+            triggers that all need to be satisfied).
+
+        """
+        if self._condition is False:
+            indices = {
+                task_trigger: ind
+                for ind, task_trigger in enumerate(self.task_triggers)
+            }
+            template = ''.join(self._templatify_list(self._exp, indices))
+            if '|' in template:
+                self._condition = Condition.get(template)
+            else:
+                self._condition = None
+        return self._condition
+
     def get_expression(self, point):
         """Return the expression as a string.
 
@@ -254,6 +279,19 @@ class Dependency:
                 ret.append('( %s )' % str(item))
         return ' '.join(ret)
 
+    @classmethod
+    def _templatify_list(cls, nested_expr, indices):
+        """Convert a nested list of TaskTrigger objects to a template."""
+        ret = []
+        for item in nested_expr:
+            if isinstance(item, TaskTrigger):
+                ret.append('{%d}' % indices[item])
+            elif isinstance(item, list):
+                ret.extend(['('] + cls._templatify_list(item, indices) + [')'])
+            else:
+                ret.append(item)
+        return ret
+
     @classmethod
     def _stringify_list(cls, nested_expr, point):
         """Stringify a nested list of TaskTrigger objects."""
@@ -0,0 +1,127 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Time-ordered queue of things to do in the future."""
+
+from heapq import heappop, heappush
+from itertools import count
+
+
+class TimerHeap:
+    """A priority queue of items keyed by the (unix) time they are due.
+
+    Each item is registered under a ``(group, name)`` key, e.g. a task ID and
+    the kind of timer. Putting an item under an existing key replaces it.
+    Replaced and removed items are discarded lazily as they reach the top of
+    the heap so all operations are cheap.
+
+    Examples:
+        >>> heap = TimerHeap()
+        >>> heap.put(20, 'foo.1', 'clock', 'a')
+        >>> heap.put(10, 'bar.1', 'clock', 'b')
+        >>> heap.put(30, 'bar.1', 'expire', 'c')
+        >>> len(heap), heap.get_next_time()
+        (3, 10)
+        >>> heap.pop_due(20)
+        ['b']
+        >>> heap.remove('bar.1')
+        >>> heap.pop_due(100)
+        ['a']
+        >>> len(heap), heap.get_next_time()
+        (0, None)
+
+    """
+
+    __slots__ = ['_counter', '_entries', '_heap']
+
+    def __init__(self):
+        self._counter = count()
+        # {group: {name: entry}}
+        self._entries = {}
+        # [[time, seq, group, name, item], ...]
+        self._heap = []
+
+    def __len__(self):
+        return sum(len(names) for names in self._entries.values())
+
+    def __contains__(self, key):
+        """Return True if an item is registered under (group, name)."""
+        group, name = key
+        return name in self._entries.get(group, {})
+
+    def put(self, time_, group, name, item):
+        """Add item, due at time_, replacing any existing (group, name) item.
+
+        Args:
+            time_ (float):
+                Unix time when the item is due.
+            group (hashable):
+                Group the item belongs to (e.g. a task ID).
+            name (hashable):
+                Name of the item within its group.
+            item (object):
+                The item to return from pop_due.
+
+        """
+        names = self._entries.setdefault(group, {})
+        if name in names:
+            names[name][2] = None
+        entry = [time_, next(self._counter), group, name, item]
+        names[name] = entry
+        heappush(self._heap, entry)
+
+    def remove(self, group, name=None):
+        """Remove the (group, name) item, or all items in group if no name."""
+        try:
+            names = self._entries[group]
+        except KeyError:
+            return
+        if name is None:
+            for entry in names.values():
+                entry[2] = None
+            del self._entries[group]
+            return
+        try:
+            names.pop(name)[2] = None
+        except KeyError:
+            return
+        if not names:
+            del self._entries[group]
+
+    def _discard(self):
+        """Drop replaced or removed entries from the top of the heap."""
+        while self._heap and self._heap[0][2] is None:
+            heappop(self._heap)
+
+    def get_next_time(self):
+        """Return the time the next item is due or None if empty."""
+        self._discard()
+        if self._heap:
+            return self._heap[0][0]
+        return None
+
+    def pop_due(self, now):
+        """Remove and return items due before now (in time order)."""
+        items = []
+        self._discard()
+        while self._heap and self._heap[0][0] < now:
+            _, _, group, name, item = heappop(self._heap)
+            names = self._entries[group]
+            del names[name]
+            if not names:
+                del self._entries[group]
+            items.append(item)
+            self._discard()
+        return items
@@ -14,6 +14,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import json
 import re
 from copy import deepcopy
@@ -22,8 +24,10 @@ from typing import List, Tuple
 
 from cylc.flow import LOG
 import cylc.flow.flags
+from cylc.flow.dbstatecheck import SuiteDBConnectionPool
 from cylc.flow.hostuserutil import get_user
-from cylc.flow.xtriggers.wall_clock import wall_clock
+from cylc.flow.xtriggers.suite_state import suite_state, suite_state_batch
+from cylc.flow.xtriggers.wall_clock import get_trigger_time
 
 from cylc.flow.subprocctx import SubFuncContext
 from cylc.flow.broadcast_mgr import BroadcastMgr
@@ -31,6 +35,7 @@ from cylc.flow.data_store_mgr import DataStoreMgr
 from cylc.flow.subprocpool import SubProcPool
 from cylc.flow.task_proxy import TaskProxy
 from cylc.flow.subprocpool import get_func
+from cylc.flow.timer_heap import TimerHeap
 
 
 # Templates for string replacement in function arg values.
@@ -85,7 +90,13 @@ class XtriggerManager:
     process, because they are guaranteed to be quick (but they are still
     managed uniquely - i.e. many tasks depending on the same clock trigger
     (with same offset from cycle point) will be satisfied by the same function
-    call.
+    call. Clock triggers which are not yet due are put in the clock heap and
+    are not checked again until their trigger time.
+
+    Suite state triggers are also called in the main process, so that they
+    can reuse (read-only) connections to the other suites' databases. Those
+    due to be called are batched, to make one query per suite database each
+    time xtriggers are checked.
 
     Args:
         suite (str): suite name
@@ -95,6 +106,7 @@ class XtriggerManager:
         suite_run_dir (str): suite run directory
         suite_share_dir (str): suite share directory
         suite_source_dir (str): suite source directory
+        clock_heap (TimerHeap): scheduler-wide clock timers
 
     """
 
@@ -109,6 +121,7 @@ class XtriggerManager:
         suite_run_dir: str = None,
         suite_share_dir: str = None,
         suite_source_dir: str = None,
+        clock_heap: TimerHeap = None,
     ):
         # Suite function and clock triggers by label.
         self.functx_map = {}
@@ -120,6 +133,16 @@ class XtriggerManager:
         self.active = []
         # All trigger and clock signatures in the current task pool.
         self.all_xtrig = []
+        # Tasks in the pool with xtriggers to check, i.e. unsatisfied
+        # xtriggers other than clock triggers waiting in the clock heap.
+        self.pending_tasks = {}
+        # Contexts of suite state triggers to call in the next batch.
+        self.suite_state_batch = []
+        # (contexts, future) of the batch being called.
+        self.suite_state_running = None
+        # Suite database connections, only used in the executor thread.
+        self.db_connection_pool = SuiteDBConnectionPool()
+        self.db_executor = ThreadPoolExecutor(max_workers=1)
 
         self.pflag = False
 
@@ -137,6 +160,9 @@ class XtriggerManager:
         self.broadcast_mgr = broadcast_mgr
         self.data_store_mgr = data_store_mgr
         self.suite_source_dir = suite_source_dir
+        if clock_heap is None:
+            clock_heap = TimerHeap()
+        self.clock_heap = clock_heap
 
     @staticmethod
     def validate_xtrigger(fname: str, fdir: str):
@@ -206,11 +232,48 @@ class XtriggerManager:
         sig, results = row
         self.sat_xtrig[sig] = json.loads(results)
 
-    def housekeep(self):
-        """Delete satisfied xtriggers no longer needed."""
+    def housekeep(self, itasks: List[TaskProxy] = None):
+        """Delete satisfied xtriggers no longer needed.
+
+        Args:
+            itasks (List[TaskProxy]): the tasks in the pool, if given the
+                xtriggers needed are collated from these first.
+        """
+        if itasks is not None:
+            self.collate(itasks)
         for sig in list(self.sat_xtrig):
             if sig not in self.all_xtrig:
                 del self.sat_xtrig[sig]
+        self.db_executor.submit(self.db_connection_pool.close_idle)
+
+    def add_pending_task(self, itask: TaskProxy):
+        """Check itask's xtriggers (if any) until they are satisfied.
+
+        Args:
+            itask (TaskProxy): a task added to the pool (or retrying)
+        """
+        if itask.state.xtriggers:
+            self.pending_tasks[itask.identity] = itask
+
+    def remove_pending_task(self, itask: TaskProxy):
+        """Stop checking itask's xtriggers (e.g. removed from the pool)."""
+        self.pending_tasks.pop(itask.identity, None)
+
+    def _is_pending(self, itask: TaskProxy):
+        """Return True if itask has xtriggers to check next time."""
+        return any(
+            not is_satisfied
+            and (itask.identity, ('xtrigger', label)) not in self.clock_heap
+            for label, is_satisfied in itask.state.xtriggers.items()
+        )
+
+    def close(self):
+        """Close connections to other suites' databases.
+
+        Waits for the batch of suite state triggers being called (if any).
+        """
+        self.db_executor.submit(self.db_connection_pool.close)
+        self.db_executor.shutdown(wait=True)
 
     def _get_xtrigs(self, itask: TaskProxy, unsat_only: bool = False,
                     sigs_only: bool = False):
@@ -280,27 +343,30 @@ class XtriggerManager:
 
         Args:
             itask (TaskProxy): TaskProxy
+        Returns:
+            bool: True if any of itask's xtriggers were newly satisfied.
         """
-        for label, sig, ctx, _ in self._get_xtrigs(itask, unsat_only=True):
+        satisfied = False
+        for label, is_satisfied in itask.state.xtriggers.items():
+            if (
+                    is_satisfied
+                    or (itask.identity, ('xtrigger', label)) in self.clock_heap
+            ):
+                # Satisfied or a clock trigger that is not yet due.
+                continue
+            ctx = self.get_xtrig_ctx(itask, label)
+            sig = ctx.get_signature()
             if sig.startswith("wall_clock"):
                 # Special case: synchronous clock check.
-                if 'absolute_as_seconds' not in ctx.func_kwargs:
-                    ctx.func_kwargs.update(
-                        {
-                            'point_as_seconds': itask.get_point_as_seconds()
-                        }
-                    )
-                if wall_clock(*ctx.func_args, **ctx.func_kwargs):
-                    itask.state.xtriggers[label] = True
-                    self.sat_xtrig[sig] = {}
-                    self.data_store_mgr.delta_task_xtrigger(sig, True)
-                    LOG.info('xtrigger satisfied: %s = %s', label, sig)
+                if self._satisfy_wall_clock(itask, label, sig, ctx):
+                    satisfied = True
                 continue
             # General case: asynchronous xtrigger function call.
             if sig in self.sat_xtrig:
 
                 if not itask.state.xtriggers[label]:
                     itask.state.xtriggers[label] = True
+                    satisfied = True
                     res = {}
                     for key, val in self.sat_xtrig[sig].items():
                         res["%s_%s" % (label, key)] = val
@@ -323,7 +389,95 @@ class XtriggerManager:
             self.t_next_call[sig] = now + ctx.intvl
             # Queue to the process pool, and record as active.
             self.active.append(sig)
-            self.proc_pool.put_command(ctx, self.callback)
+            if self._is_suite_state(ctx):
+                self.suite_state_batch.append(ctx)
+            else:
+                self.proc_pool.put_command(ctx, self.callback)
+        return satisfied
+
+    def _is_suite_state(self, ctx):
+        """Return True if ctx calls the built-in suite_state xtrigger.
+
+        (Not one of the same name in the suite's lib/python directory).
+        """
+        return (
+            ctx.func_name == 'suite_state'
+            and get_func(ctx.func_name, self.suite_source_dir) is suite_state
+        )
+
+    def _call_suite_state_batch(self):
+        """Call the batched suite state triggers in the executor thread.
+
+        (Unless the previous batch is still being called).
+        """
+        if self.suite_state_running is not None or not self.suite_state_batch:
+            return
+        batch = self.suite_state_batch
+        self.suite_state_batch = []
+        self.suite_state_running = (batch, self.db_executor.submit(
+            suite_state_batch,
+            [(ctx.func_args, ctx.func_kwargs) for ctx in batch],
+            self.db_connection_pool
+        ))
+
+    def _process_suite_state_batch(self):
+        """Record the results of the suite state triggers, if called."""
+        if (
+                self.suite_state_running is None
+                or not self.suite_state_running[1].done()
+        ):
+            return
+        batch, future = self.suite_state_running
+        self.suite_state_running = None
+        try:
+            batch_results = future.result()
+        except Exception as exc:
+            LOG.exception(exc)
+            batch_results = [(False, None)] * len(batch)
+        for ctx, (satisfied, results) in zip(batch, batch_results):
+            LOG.debug(ctx)
+            self.active.remove(ctx.get_signature())
+            self._set_result(ctx, satisfied, results)
+
+    def _satisfy_wall_clock(self, itask, label, sig, ctx):
+        """Satisfy a clock trigger if due, else add it to the clock heap.
+
+        Returns:
+            bool: True if the clock trigger was satisfied.
+        """
+        if 'absolute_as_seconds' not in ctx.func_kwargs:
+            ctx.func_kwargs.update(
+                {
+                    'point_as_seconds': itask.get_point_as_seconds()
+                }
+            )
+        trigger_time = get_trigger_time(*ctx.func_args, **ctx.func_kwargs)
+        if time() > trigger_time:
+            itask.state.xtriggers[label] = True
+            self.sat_xtrig[sig] = {}
+            self.data_store_mgr.delta_task_xtrigger(sig, True)
+            LOG.info('xtrigger satisfied: %s = %s', label, sig)
+            return True
+        self.clock_heap.put(
+            trigger_time,
+            itask.identity,
+            ('xtrigger', label),
+            (itask, partial(self._wall_clock_due, label))
+        )
+        return False
+
+    def _wall_clock_due(self, label, itask):
+        """Clock heap callback: check a clock trigger which has fallen due.
+
+        (The trigger time may have moved, e.g. for retries).
+
+        Returns:
+            bool: True if the clock trigger was satisfied.
+        """
+        if itask.state.xtriggers.get(label, True):
+            return False
+        ctx = self.get_xtrig_ctx(itask, label)
+        return self._satisfy_wall_clock(itask, label, ctx.get_signature(), ctx)
 
     def collate(self, itasks: List[TaskProxy]):
         """Get list of all current xtrigger signatures.
@@ -346,12 +500,16 @@ class XtriggerManager:
             ValueError: if the context given is not active
         """
         LOG.debug(ctx)
-        sig = ctx.get_signature()
-        self.active.remove(sig)
+        self.active.remove(ctx.get_signature())
         try:
             satisfied, results = json.loads(ctx.out)
         except (ValueError, TypeError):
             return
+        self._set_result(ctx, satisfied, results)
+
+    def _set_result(self, ctx, satisfied, results):
+        """Record the result of an xtrigger function call."""
+        sig = ctx.get_signature()
         LOG.debug('%s: returned %s', sig, results)
         if satisfied:
             self.data_store_mgr.delta_task_xtrigger(sig, True)
@@ -359,13 +517,26 @@ class XtriggerManager:
             self.pflag = True
             self.sat_xtrig[sig] = results
 
-    def check_xtriggers(self, itasks: List[TaskProxy]):
+    def check_xtriggers(self, itasks: List[TaskProxy] = None):
         """See if any xtriggers are satisfied.
 
+        Clock triggers waiting in the clock heap are checked when they fall
+        due, rather than here.
+
         Args:
-            itasks (List[TaskProxy]): list of TaskProxy's
+            itasks (List[TaskProxy]): list of TaskProxy's, default the
+                pending tasks (see add_pending_task)
+        Returns:
+            List[TaskProxy]: tasks with newly satisfied xtriggers.
         """
-        self.collate(itasks)
+        self._process_suite_state_batch()
+        if itasks is None:
+            itasks = list(self.pending_tasks.values())
+        satisfied = []
         for itask in itasks:
-            if itask.state.xtriggers:
-                self.satisfy_xtriggers(itask)
+            if itask.state.xtriggers and self.satisfy_xtriggers(itask):
+                satisfied.append(itask)
+            if not self._is_pending(itask):
+                self.remove_pending_task(itask)
+        self._call_suite_state_batch()
+        return satisfied
@@ -14,9 +14,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from inspect import signature
 import os
 import sqlite3
 
+from cylc.flow import LOG
 from cylc.flow.cycling.util import add_offset
 from cylc.flow.dbstatecheck import CylcSuiteDBChecker
 from cylc.flow.platforms import get_platform
@@ -68,11 +70,7 @@ def suite_state(suite, task, point, offset=None, status='succeeded',
             to this xtrigger.
 
     """
-    cylc_run_dir = os.path.expandvars(
-        os.path.expanduser(
-            cylc_run_dir or get_platform()['run directory']
-        )
-    )
+    cylc_run_dir = _get_run_dir(cylc_run_dir)
     if offset is not None:
         point = str(add_offset(point, offset))
     try:
@@ -80,10 +78,7 @@ def suite_state(suite, task, point, offset=None, status='succeeded',
     except (OSError, sqlite3.Error):
         # Failed to connect to DB; target suite may not be started.
         return (False, None)
-    fmt = checker.get_remote_point_format()
-    if fmt:
-        my_parser = TimePointParser()
-        point = str(my_parser.parse(point, dump_format=fmt))
+    point = _format_point(point, checker.get_remote_point_format())
     if message is not None:
         satisfied = checker.task_state_met(task, point, message=message)
     else:
@@ -98,3 +93,97 @@ def suite_state(suite, task, point, offset=None, status='succeeded',
         'cylc_run_dir': cylc_run_dir
     }
     return satisfied, results
+
+
+def suite_state_batch(calls, connection_pool):
+    """Make several suite_state calls with one query per suite database.
+
+    Used by the scheduler to check the suite_state xtriggers due in an
+    evaluation round with reusable database connections (in a thread, so as
+    not to block the main loop).
+
+    Calls fail (are not satisfied) for a suite whose database cannot be read.
+
+    Arguments:
+        calls (list):
+            (args, kwargs) of each suite_state call.
+        connection_pool (cylc.flow.dbstatecheck.SuiteDBConnectionPool):
+            Pool to take database connections from.
+
+    Returns:
+        list: The (satisfied, results) of each call, as returned by
+        suite_state.
+
+    """
+    ret = [(False, None)] * len(calls)
+    suites = {}
+    for i, (args, kwargs) in enumerate(calls):
+        try:
+            arguments = signature(suite_state).bind(*args, **kwargs)
+            arguments.apply_defaults()
+            arguments = dict(arguments.arguments)
+            arguments['cylc_run_dir'] = _get_run_dir(
+                arguments['cylc_run_dir'])
+            if arguments['offset'] is not None:
+                arguments['point'] = str(
+                    add_offset(arguments['point'], arguments['offset']))
+        except (TypeError, ValueError):
+            # Bad arguments, as for suite_state the call fails.
+            continue
+        suites.setdefault(
+            (arguments['cylc_run_dir'], arguments['suite']), []
+        ).append((i, arguments))
+    for (cylc_run_dir, suite), suite_calls in suites.items():
+        try:
+            with connection_pool.connect(
+                CylcSuiteDBChecker.get_db_path(cylc_run_dir, suite)
+            ) as conn:
+                checker = CylcSuiteDBChecker(cylc_run_dir, suite, conn=conn)
+                fmt = checker.get_remote_point_format()
+                queries = []
+                for i, arguments in suite_calls:
+                    try:
+                        arguments['point'] = _format_point(
+                            arguments['point'], fmt)
+                    except ValueError:
+                        continue
+                    queries.append((i, arguments))
+                satisfied = checker.task_states_met([
+                    (
+                        arguments['task'],
+                        arguments['point'],
+                        arguments['status']
+                        if arguments['message'] is None else None,
+                        arguments['message']
+                    )
+                    for _, arguments in queries
+                ])
+        except (OSError, sqlite3.Error):
+            # Failed to connect to DB; target suite may not be started.
+            continue
+        except Exception as exc:
+            # E.g. a bad row, don't fail the calls for other suites.
+            LOG.warning(
+                f'suite_state: failed to query suite {suite}:'
+                f' {type(exc).__name__}: {exc}')
+            continue
+        for (i, arguments), call_satisfied in zip(queries, satisfied):
+            ret[i] = (call_satisfied, arguments)
+    return ret
+
+
+def _get_run_dir(cylc_run_dir):
+    """Return the expanded cylc run directory (default from platform)."""
+    return os.path.expandvars(
+        os.path.expanduser(
+            cylc_run_dir or get_platform()['run directory']
+        )
+    )
+
+
+def _format_point(point, fmt):
+    """Return a cycle point in the point format of the remote suite."""
+    if fmt:
+        my_parser = TimePointParser()
+        point = str(my_parser.parse(point, dump_format=fmt))
+    return point
@@ -38,13 +38,27 @@ def wall_clock(offset=None, absolute_as_seconds=None, point_as_seconds=None):
         point_as_seconds (int):
             Provided by Cylc. The cycle point in unix time format.
 
+    """
+    return time() > get_trigger_time(
+        offset, absolute_as_seconds, point_as_seconds)
+
+
+def get_trigger_time(
+        offset=None, absolute_as_seconds=None, point_as_seconds=None):
+    """Return the unix time after which wall_clock is satisfied.
+
+    Takes the same arguments as wall_clock.
+
+    Examples:
+        >>> get_trigger_time(point_as_seconds=100)
+        100
+        >>> get_trigger_time(absolute_as_seconds=100.5)
+        100.5
+
     """
     offset_as_seconds = 0
     if offset is not None:
         offset_as_seconds = int(interval_parse(offset).get_seconds())
     if absolute_as_seconds:
-        trigger_time = absolute_as_seconds
-    else:
-        trigger_time = point_as_seconds + offset_as_seconds
-
-    return time() > trigger_time
+        return absolute_as_seconds
+    return point_as_seconds + offset_as_seconds
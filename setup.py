@@ -75,9 +75,8 @@ extra_requires = {
         'EmPy==3.3.*'
     ],
     'all': [],
-    'report-timings': [
-        'pandas==1.*'
-    ],
+    # deprecated: report-timings no longer requires pandas
+    'report-timings': [],
     'main_loop-log_data_store': [
         'pympler',
         'matplotlib'
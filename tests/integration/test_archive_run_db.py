@@ -0,0 +1,69 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Test the OpenMetrics main loop plugin against a running scheduler."""
+import asyncio
+
+from async_timeout import timeout
+import pytest
+
+from cylc.flow.main_loop.archive_run_db import archive
+from cylc.flow.pathutil import get_suite_run_db_archive_dir
+from cylc.flow.rundb import CylcSuiteDAO
+
+
+def _select_cycles(path):
+    dao = CylcSuiteDAO(path, is_public=True)
+    cycles = sorted(dao.select_task_states_cycles(), key=int)
+    dao.close()
+    return cycles
+
+
+@pytest.mark.asyncio
+async def test_archive_on_shutdown(flow, scheduler, run):
+    """It should remove the cycle points being archived on shutdown."""
+    reg = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': '5',
+            'graph': {
+                'P1': 'a'
+            }
+        }
+    })
+    schd = scheduler(reg, main_loop=['archive run db'])
+    async with run(schd):
+        # wait for the first (scheduled) run of the plugin
+        async with timeout(5):
+            while not schd.main_loop_plugins['timings'][
+                    ('archive run db', 'archive')]:
+                await asyncio.sleep(0.1)
+        db_mgr = schd.suite_db_mgr
+        pub_dao = CylcSuiteDAO(db_mgr.pub_path)
+        for dao in (db_mgr.pri_dao, pub_dao):
+            for cycle in ('1', '2'):
+                dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_STATES, {
+                    'cycle': cycle, 'name': 'a', 'flow_label': 'x'})
+            dao.execute_queued_items()
+        pub_dao.close()
+        # start archiving, the scheduler stops before the next run
+        state = schd.main_loop_plugins['state']['archive run db']
+        await archive(schd, state)
+        assert state['archiving'] is not None
+
+    assert _select_cycles(
+        get_suite_run_db_archive_dir(reg, '5.db')) == ['1', '2']
+    for path in (db_mgr.pri_path, db_mgr.pub_path):
+        assert _select_cycles(path)[0] == '5'
@@ -0,0 +1,41 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Test the OpenMetrics main loop plugin against a running scheduler."""
+
+import asyncio
+from pathlib import Path
+
+from async_timeout import timeout
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_openmetrics(flow, scheduler, run, one_conf):
+    """The metrics file should be written whilst the scheduler runs."""
+    reg = flow(one_conf)
+    schd = scheduler(reg, main_loop=['openmetrics'])
+    async with run(schd):
+        path = Path(schd.suite_run_dir, 'cylc.flow.main_loop.openmetrics.txt')
+        async with timeout(5):
+            while not path.exists():
+                await asyncio.sleep(0.1)
+        text = path.read_text()
+        assert f'cylc_runahead_pool_tasks{{suite="{reg}"}}' in text
+        assert 'cylc_subproc_pool_commands' in text
+        assert 'cylc_data_store_elements' in text
+        assert text.endswith('# EOF\n')
+    # the file should be removed on shutdown
+    assert not path.exists()
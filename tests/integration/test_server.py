@@ -79,6 +79,22 @@ def test_pb_entire_workflow(myflow):
     assert data.workflow.id == myflow.id
 
 
+@pytest.mark.asyncio
+async def test_get_main_loop_timings(myflow):
+    """Test main loop timings endpoint method."""
+    async with timeout(5):
+        # wait for the main loop to complete a pass
+        while 'main_loop' not in myflow.main_loop_timings.phases:
+            await asyncio.sleep(0.1)
+    data = call_server_method(
+        myflow.server.get_main_loop_timings,
+        windows=[60]
+    )
+    assert set(data['main_loop']) == {'60'}
+    assert data['main_loop']['60']['count'] >= 1
+    assert 'process_queued_task_messages' in data
+
+
 @pytest.mark.asyncio
 @pytest.fixture
 async def accident(flow, scheduler, run, one_conf):
@@ -0,0 +1,458 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from copy import copy
+from time import time
+
+import pytest
+
+from cylc.flow.task_outputs import TASK_OUTPUT_SUCCEEDED
+from cylc.flow.task_proxy import TaskProxy
+from cylc.flow.task_state import (
+    TASK_STATUS_PREPARING,
+    TASK_STATUS_QUEUED,
+    TASK_STATUS_RUNNING,
+    TASK_STATUS_SUCCEEDED
+)
+
+
+@pytest.mark.asyncio
+async def test_get_ready_tasks_dirty(flow, scheduler, run):
+    """It should only check the readiness of tasks flagged as dirty."""
+    reg = flow({
+        'scheduling': {
+            'graph': {
+                'R1': 'a\nb'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        pool.release_runahead_tasks()
+        # the scheduler starts held so nothing is ready
+        assert pool.get_ready_tasks() == []
+        assert pool.dirty_tasks == {}
+        a = pool.get_task_by_id('a.1')
+        b = pool.get_task_by_id('b.1')
+
+        # releasing a task via the pool flags it for checking
+        pool.release_tasks(['a.1'])
+        assert pool.dirty_tasks == {'a.1': a}
+        assert pool.get_ready_tasks() == [a]
+        assert a.state(TASK_STATUS_QUEUED)
+        assert pool.dirty_tasks == {}
+
+        # changes made behind the pool's back are not noticed...
+        b.state.reset(is_held=False)
+        assert b not in pool.get_ready_tasks()
+        assert not b.state(TASK_STATUS_QUEUED)
+
+        # ...until the task is flagged
+        pool.set_dirty(b)
+        assert pool.has_tasks_to_check()
+        assert b in pool.get_ready_tasks()
+        assert b.state(TASK_STATUS_QUEUED)
+        assert not pool.has_tasks_to_check()
+
+
+@pytest.mark.asyncio
+async def test_clock_heap(flow, scheduler, run):
+    """It should put clock trigger and expiry times in the clock heap."""
+    reg = flow({
+        'scheduling': {
+            'initial cycle point': '2000',
+            'final cycle point': '2000',
+            'special tasks': {
+                'clock-trigger': 'a(PT1H)',
+                'clock-expire': 'b(PT2H), c(PT2H)',
+            },
+            'graph': {
+                'P1Y': 'a\nb\nc'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        pool.release_runahead_tasks()
+        # (add the tasks to the data store before any are removed)
+        schd.data_store_mgr.update_data_structure()
+        a = pool.get_task_by_id('a.20000101T0000Z')
+        b = pool.get_task_by_id('b.20000101T0000Z')
+        c = pool.get_task_by_id('c.20000101T0000Z')
+        # (the main loop may already have processed these timers)
+        pool.clock_heap.remove(a.identity)
+        pool.clock_heap.remove(b.identity)
+        pool.clock_heap.remove(c.identity)
+
+        # past clock trigger times are not added
+        pool.add_clock_timers(a)
+        assert ('a.20000101T0000Z', 'clock-trigger') not in pool.clock_heap
+        a.clock_trigger_time = time() + 3600
+        pool.add_clock_timers(a)
+        assert ('a.20000101T0000Z', 'clock-trigger') in pool.clock_heap
+        pool.add_clock_timers(b)
+        assert ('b.20000101T0000Z', 'expire') in pool.clock_heap
+        assert schd.get_next_timer() <= b.expire_time
+
+        # the expiry time has passed but the task is held
+        [(itask, callback)] = pool.clock_heap.pop_due(b.expire_time + 1)
+        assert itask is b
+        assert not callback(b)
+        assert pool.get_task_by_id('b.20000101T0000Z') is b
+        assert pool.clock_heap.get_next_time() == a.clock_trigger_time
+
+        # the task is expired when released...
+        pool.release_tasks([b.identity])
+        assert b not in pool.get_ready_tasks()
+        assert pool.get_task_by_id('b.20000101T0000Z') is None
+
+        # ...or when reset to waiting to retry
+        c.state.reset(TASK_STATUS_RUNNING, is_held=False)
+        pool.get_ready_tasks()
+        schd.task_events_mgr._retry_task(c, time() + 3600)
+        assert pool.has_tasks_to_check()
+        assert c not in pool.get_ready_tasks()
+        assert pool.get_task_by_id('c.20000101T0000Z') is None
+
+
+@pytest.mark.asyncio
+async def test_task_index(flow, scheduler, run):
+    """It should index tasks by ID, cycle point and name."""
+    reg = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': '1',
+            'final cycle point': '3',
+            'runahead limit': 'P1',
+            'graph': {
+                'P1': 'a[-P1] => a => b'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        pool.release_runahead_tasks()
+        a1 = pool.get_task_by_id('a.1')
+        assert a1 is pool.get_task('a', a1.point)
+        assert pool.get_task_by_id('a.2') is None
+        assert pool.get_task_by_id('a') is None
+        b1 = pool.spawn_task('b', a1.point)
+        a2 = pool.spawn_task('a', a1.next_point())
+        # (these are waiting on a.1 so stay in the runahead pool)
+        assert pool.get_rh_tasks() == [b1, a2]
+
+        # the indexes include both the main and runahead pools
+        assert pool.get_task_by_id('b.1') is b1
+        assert pool.get_task_by_id('a.2') is a2
+        assert pool.get_tasks_by_point(incl_runahead=False) == {
+            a1.point: [a1]}
+        assert {
+            point: set(itasks)
+            for point, itasks in pool.get_tasks_by_point(
+                incl_runahead=True).items()
+        } == {a1.point: {a1, b1}, a2.point: {a2}}
+        assert pool.name_index['a'] == {a1.point: a1, a2.point: a2}
+        assert pool.filter_task_proxies(['a.2']) == ([a2], [])
+        assert pool.filter_task_proxies(['1/a']) == ([a1], [])
+        assert pool.filter_task_proxies(['a.*']) == ([a1, a2], [])
+        assert pool.filter_task_proxies(['a.3']) == ([], ['a.3'])
+
+        pool.remove(a2)
+        pool.remove(b1)
+        assert pool.get_task_by_id('a.2') is None
+        assert set(pool.point_index) == {a1.point}
+        assert pool.name_index == {'a': {a1.point: a1}}
+        assert pool.task_index == {('a', '1'): a1}
+        assert pool.sorted_points == [a1.point]
+
+
+@pytest.mark.asyncio
+async def test_submit_nums_cache(flow, scheduler, run):
+    """It should cache submit numbers rather than query the DB on spawn."""
+    reg = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': '1',
+            'final cycle point': '3',
+            'graph': {
+                'P1': 'a => b'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        db_mgr = schd.suite_db_mgr
+        a1 = pool.get_task_by_id('a.1')
+        b1 = pool.spawn_task('b', a1.point, flow_label=a1.flow_label)
+        assert db_mgr.get_submit_nums('b', b1.point) == {b1.flow_label: 0}
+
+        # a task is not re-spawned in the same flow
+        pool.remove(b1)
+        assert pool.spawn_task('b', b1.point, b1.flow_label) is None
+
+        # updates to the task_states table are reflected in the cache
+        new_label = pool.flow_label_mgr.get_new_label()
+        b1 = pool.spawn_task('b', b1.point, new_label)
+        b1.submit_num = 2
+        b1.state.time_updated = 'x'
+        db_mgr.put_task_pool(pool)
+        assert db_mgr.get_submit_nums('b', b1.point) == {
+            a1.flow_label: 0, new_label: 2}
+
+        # evicted points fall back to the DB
+        db_mgr.process_queued_ops()
+        db_mgr.evict_submit_nums(a1.next_point())
+        assert b1.point not in db_mgr.submit_nums
+        assert db_mgr.get_submit_nums('b', b1.point) == {
+            a1.flow_label: 0, new_label: 2}
+        db_mgr.evict_submit_nums(a1.point)
+        assert db_mgr.submit_nums_min_point == a1.next_point()
+
+
+@pytest.mark.asyncio
+async def test_put_task_pool(flow, scheduler, run):
+    """It should only write task pool rows of tasks which have changed."""
+    reg = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': '1',
+            'final cycle point': '3',
+            'graph': {
+                'P1': 'a => b'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        db_mgr = schd.suite_db_mgr
+        db_mgr.put_task_pool(pool)
+        db_mgr.process_queued_ops()
+
+        # nothing to write if nothing has changed
+        db_mgr.put_task_pool(pool, [])
+        assert not db_mgr.db_deletes_map[db_mgr.TABLE_TASK_POOL]
+        assert not db_mgr.db_inserts_map[db_mgr.TABLE_TASK_POOL]
+        assert not db_mgr.db_inserts_map[db_mgr.TABLE_TASK_PREREQUISITES]
+
+        # new and updated tasks are rewritten, removed ones deleted
+        a1 = pool.get_task_by_id('a.1')
+        b1 = pool.spawn_task('b', a1.point, flow_label=a1.flow_label)
+        pool.add_to_runahead_pool(b1)
+        a1.state.is_held = False
+        db_mgr.put_task_pool(pool, [a1])
+        assert db_mgr.db_deletes_map[db_mgr.TABLE_TASK_POOL] == [
+            {'cycle': '1', 'name': 'a'}]
+        assert sorted(
+            (row['name'], row['is_held'])
+            for row in db_mgr.db_inserts_map[db_mgr.TABLE_TASK_POOL]
+        ) == [('a', False), ('b', True)]
+        db_mgr.process_queued_ops()
+        pool.remove(a1)
+        db_mgr.put_task_pool(pool, [a1])
+        assert db_mgr.db_deletes_map[db_mgr.TABLE_TASK_POOL] == [
+            {'cycle': '1', 'name': 'a'}]
+        assert not db_mgr.db_inserts_map[db_mgr.TABLE_TASK_POOL]
+        db_mgr.process_queued_ops()
+        assert sorted(
+            db_mgr.pri_dao.connect().execute(
+                'SELECT cycle, name, is_held FROM task_pool')
+        ) == sorted(
+            (str(itask.point), itask.tdef.name, itask.state.is_held)
+            for itask in pool.get_all_tasks()
+        )
+
+
+@pytest.mark.asyncio
+async def test_release_runahead_tasks(flow, scheduler, run):
+    """It should release tasks up to the runahead limit."""
+    reg = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': '1',
+            'runahead limit': 'P2',
+            'graph': {
+                'P1': 'a'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        # (releasing a task spawns its successor into the runahead pool)
+        pool.release_runahead_tasks()
+        pool.release_runahead_tasks()
+        assert [str(point) for point in pool.sorted_points] == [
+            '1', '2', '3']
+        assert sorted(str(point) for point in pool.pool) == ['1', '2']
+        assert list(pool.runahead_pool) == [pool.sorted_points[-1]]
+
+        # finished tasks do not hold back the runahead limit
+        a1 = pool.get_task_by_id('a.1')
+        a1.state.reset(TASK_STATUS_SUCCEEDED)
+        pool.release_runahead_tasks()
+        assert sorted(str(point) for point in pool.pool) == ['1', '2', '3']
+        assert [str(point) for point in pool.sorted_points] == [
+            '1', '2', '3', '4']
+
+
+@pytest.mark.asyncio
+async def test_abs_outputs_done(flow, scheduler, run):
+    """It should index completed absolute outputs by task name."""
+    reg = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': '1',
+            'runahead limit': 'P2',
+            'graph': {
+                'R1': 'a',
+                'P1': 'a[^] => b'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        a1 = pool.get_task_by_id('a.1')
+        b1 = pool.spawn_task('b', a1.point, a1.flow_label)
+        b2 = pool.spawn_task('b', b1.next_point(), a1.flow_label)
+        assert not b1.state.prerequisites_all_satisfied()
+        assert b1.state.get_prerequisite_task_names() == {'a'}
+
+        # every instance of the child in the pool is satisfied
+        pool.spawn_on_output(a1, TASK_OUTPUT_SUCCEEDED)
+        assert pool.abs_outputs_done == {
+            'a': {('a', '1', TASK_OUTPUT_SUCCEEDED)}}
+        assert b1.state.prerequisites_all_satisfied()
+        assert b2.state.prerequisites_all_satisfied()
+
+        # new instances are satisfied from the store of completed outputs
+        b3 = pool.spawn_task('b', b2.next_point(), a1.flow_label)
+        assert b3.state.prerequisites_all_satisfied()
+
+
+@pytest.mark.asyncio
+async def test_filter_task_proxies(flow, scheduler, run):
+    """It should match tasks by name, family, cycle point and state."""
+    reg = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'initial cycle point': '1',
+            'final cycle point': '2',
+            'runahead limit': 'P0',
+            'graph': {
+                'P1': 'a & b & c'
+            }
+        },
+        'runtime': {
+            'FAM': {},
+            'a, b': {'inherit': 'FAM'}
+        }
+    })
+    schd = scheduler(reg)
+
+    def _filter(items):
+        itasks, bad_items = schd.pool.filter_task_proxies(items)
+        return {itask.identity for itask in itasks}, bad_items
+
+    async with run(schd):
+        pool = schd.pool
+        # (releasing a task spawns its successor into the runahead pool)
+        pool.release_runahead_tasks()
+        assert pool.namespace_index['FAM'] == {'a': 2, 'b': 2}
+        assert pool.namespace_index['root'] == {'a': 2, 'b': 2, 'c': 2}
+        assert _filter(['FAM.1']) == ({'a.1', 'b.1'}, [])
+        assert _filter(['F*.1']) == ({'a.1', 'b.1'}, [])
+        assert _filter(['*.1:waiting']) == ({'a.1', 'b.1', 'c.1'}, [])
+        assert _filter(['c.[3-9]', 'c.*:running']) == (
+            set(), ['c.[3-9]', 'c.*:running'])
+
+        # the results are updated when the pool changes
+        assert _filter(['FAM']) == ({'a.1', 'b.1', 'a.2', 'b.2'}, [])
+        pool.remove(pool.get_task_by_id('a.2'))
+        pool.remove(pool.get_task_by_id('b.2'))
+        assert _filter(['FAM']) == ({'a.1', 'b.1'}, [])
+
+        # a reloaded task is only matched by its new families
+        itask = pool.get_task_by_id('b.1')
+        tdef = copy(itask.tdef)
+        tdef.namespace_hierarchy = ['b', 'root']
+        pool.remove(itask)
+        pool.add_to_runahead_pool(
+            TaskProxy(tdef, itask.point, itask.flow_label))
+        assert _filter(['FAM']) == ({'a.1'}, [])
+        assert _filter(['F*']) == ({'a.1'}, [])
+        assert 'b' not in pool.namespace_index['FAM']
+
+
+@pytest.mark.asyncio
+async def test_queue_counters(flow, scheduler, run):
+    """It should count active and queued tasks as their states change."""
+    reg = flow({
+        'scheduling': {
+            'queues': {
+                'q': {
+                    'limit': 2,
+                    'members': 'a, b, c, d'
+                }
+            },
+            'graph': {
+                'R1': 'a & b & c & d'
+            }
+        }
+    })
+    schd = scheduler(reg)
+    async with run(schd):
+        pool = schd.pool
+        pool.release_runahead_tasks()
+        # apply the new task proxies to the data store before the test
+        # removes one (pruning a node added in the same delta fails)
+        await schd.update_data_structure()
+        a, b, c, d = (
+            pool.get_task_by_id(f'{name}.1') for name in 'abcd')
+        counter = pool.queue_counters['q']
+        pool.release_tasks(['a.1', 'b.1', 'c.1', 'd.1'])
+        ready = pool.get_ready_tasks()
+        assert len(ready) == 2
+        assert set(counter.queued) == {'a.1', 'b.1', 'c.1', 'd.1'}
+        assert counter.n_active == 0
+
+        # active tasks count towards the queue limit
+        for itask in ready:
+            itask.state.reset(TASK_STATUS_RUNNING)
+        assert counter.n_active == 2
+        assert len(counter.queued) == 2
+        assert pool.get_ready_tasks() == []
+
+        # held tasks do not
+        ready[0].state.reset(is_held=True)
+        assert counter.n_active == 1
+        [itask] = pool.get_ready_tasks()
+        assert itask.identity == list(counter.queued)[0]
+        itask.state.reset(TASK_STATUS_PREPARING)
+        assert pool.get_ready_tasks() == []
+
+        # finished or removed tasks leave the queue
+        ready[1].state.reset(TASK_STATUS_SUCCEEDED)
+        assert counter.n_active == 1
+        assert len(pool.get_ready_tasks()) == 1
+        pool.remove(itask)
+        assert counter.n_active == 0
+        assert len(counter.queued) == 1
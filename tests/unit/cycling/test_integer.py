@@ -144,6 +144,21 @@ class TestIntegerSequence(unittest.TestCase):
         sequence = IntegerSequence('R/P1!5', 1, 5)
         self.assertEqual(sequence.get_stop_point(), point_4)
 
+    def test_iter_points(self):
+        """Test bulk point generation for integer cycling."""
+        sequence = IntegerSequence('R/1/P3!7', 1, 20)
+        point = IntegerPoint(1)
+        self.assertEqual(
+            [int(point) for point in sequence.iter_points(point)],
+            [4, 10, 13, 16, 19])
+        self.assertEqual(
+            [int(point) for point in sequence.iter_points(point, 2)],
+            [4, 10])
+        self.assertEqual(
+            [int(point) for point in sequence.get_points_between(
+                point, IntegerPoint(13))],
+            [4, 10, 13])
+
     def test_simple(self):
         """Run some simple tests for integer cycling."""
         sequence = IntegerSequence('R/1/P3', 1, 10)
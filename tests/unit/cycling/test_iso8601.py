@@ -527,6 +527,36 @@ class TestISO8601Sequence(unittest.TestCase):
         self.assertFalse(
             sequence.is_on_sequence(ISO8601Point('20100809T0005')))
 
+    def test_iter_points(self):
+        """Test that bulk point generation matches get_next_point."""
+        init(time_zone='Z')
+        start = ISO8601Point('20000101T00Z')
+        for args in (
+                ('PT6H', '20000101T00Z'),
+                ('PT6H', '20000101T00Z', '20000103T00Z'),
+                ('R3/T12/PT6H', '20000101T00Z'),
+                ('PT1H!(T02, T04)', '20000101T00Z', '20000102T00Z'),
+                ('PT1H!PT3H', '20000101T00Z', '20000102T00Z'),
+                ('P1M', '20000101T00Z', '20001201T00Z'),
+                ('R5/20000101T00/20000102T00', '20000101T00Z'),
+        ):
+            sequence = ISO8601Sequence(*args)
+            expected = []
+            point = sequence.get_next_point(start)
+            while point is not None and len(expected) < 20:
+                expected.append(str(point))
+                point = sequence.get_next_point(point)
+            self.assertEqual(
+                [str(point) for point in sequence.iter_points(start, 20)],
+                expected,
+                args
+            )
+        sequence = ISO8601Sequence('PT6H!T12', '20000101T00Z')
+        self.assertEqual(
+            [str(point) for point in sequence.get_points_between(
+                start, ISO8601Point('20000102T00Z'))],
+            ['20000101T0600Z', '20000101T1800Z', '20000102T0000Z'])
+
 
 class TestRelativeCyclePoint(unittest.TestCase):
     """Contains unit tests for cycle point relative to current time."""
@@ -779,5 +809,46 @@ class TestRelativeCyclePoint(unittest.TestCase):
         self.assertEqual("19951231T0630", output)
 
 
+class TestISO8601Point(unittest.TestCase):
+    """Contains unit tests for the ISO8601Point class."""
+
+    def setUp(self):
+        init(time_zone='Z')
+
+    def tearDown(self):
+        init(time_zone='Z', cycling_mode='gregorian')
+
+    def test_compare(self):
+        """Test that points are compared and hashed by time, not string."""
+        point = ISO8601Point('20000101T0000Z')
+        other = ISO8601Point('20000101T0530+0530')
+        self.assertEqual(point, other)
+        self.assertEqual(hash(point), hash(other))
+        self.assertLess(point, ISO8601Point('20000101T0001Z'))
+        self.assertGreater(point, ISO8601Point('19991231T2359Z'))
+        self.assertNotEqual(point, None)
+
+    def test_add_sub(self):
+        """Test that exact intervals offset points without their strings."""
+        point = ISO8601Point('20000101T0000Z')
+        next_point = point + ISO8601Interval('P1D') + ISO8601Interval('PT6H')
+        self.assertIsNone(next_point._value)
+        self.assertEqual(next_point, ISO8601Point('20000102T0600Z'))
+        self.assertEqual(str(next_point), '20000102T0600Z')
+        self.assertEqual(
+            str(point - ISO8601Interval('PT1H')), '19991231T2300Z')
+        self.assertEqual(str(point + ISO8601Interval('P1M')), '20000201T0000Z')
+        self.assertEqual(str(next_point - point), 'P1DT6H')
+
+    def test_calendar_360(self):
+        """Test that the key follows the calendar mode."""
+        init(time_zone='Z', cycling_mode='360day')
+        point = ISO8601Point('20000230T0000Z')
+        next_point = point + ISO8601Interval('P1D')
+        self.assertEqual(str(next_point), '20000301T0000Z')
+        self.assertLess(point, next_point)
+        self.assertEqual(next_point, ISO8601Point('20000301T0000Z'))
+
+
 if __name__ == '__main__':
     unittest.main()
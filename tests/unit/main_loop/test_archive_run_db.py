@@ -0,0 +1,151 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from cylc.flow.cycling.loader import get_interval, get_point
+from cylc.flow.exceptions import UserInputError
+from cylc.flow.main_loop.archive_run_db import (
+    archive,
+    init,
+    _get_cycles,
+    _get_period_start,
+    _write_archive
+)
+from cylc.flow.rundb import CylcSuiteDAO
+from cylc.flow.suite_db_mgr import SuiteDatabaseManager
+
+
+def _insert_states(dao, cycles):
+    for cycle in cycles:
+        dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_STATES, {
+            'cycle': cycle, 'name': 'foo', 'flow_label': 'x'})
+    dao.execute_queued_items()
+
+
+def _select_cycles(path):
+    dao = CylcSuiteDAO(path, is_public=True)
+    cycles = sorted(dao.select_task_states_cycles(), key=int)
+    dao.close()
+    return cycles
+
+
+def test_get_period_start(cycling_mode):
+    """It should count archive periods from the initial cycle point."""
+    cycling_mode(integer=True)
+    state = {'period': None, 'period_start': None}
+    assert _get_period_start(get_point('7'), get_point('1'), state) == (
+        get_point('1'))
+    state['period'] = get_point('3') - get_point('0')
+    assert [
+        str(_get_period_start(get_point(cycle), get_point('1'), state))
+        for cycle in ('0', '3', '4', '12', '2')
+    ] == ['1', '1', '4', '10', '1']
+
+
+def test_write_archive(tmp_path):
+    """It should replace the rows of cycle points already archived."""
+    path = str(tmp_path / 'archive' / '1.db')
+    rows = {CylcSuiteDAO.TABLE_TASK_STATES: [['foo', '1', 'x']]}
+    _write_archive(path, ['1'], rows)
+    _write_archive(path, ['1'], rows)
+    assert _select_cycles(path) == ['1']
+
+
+@pytest.mark.asyncio
+async def test_archive(tmp_path, cycling_mode, monkeypatch):
+    """It should move old cycle points to archive databases."""
+    cycling_mode(integer=True)
+    monkeypatch.setattr(
+        'cylc.flow.main_loop.archive_run_db.get_suite_run_db_archive_dir',
+        lambda _, *args: str(Path(tmp_path, 'archive', *args))
+    )
+    db_mgr = SuiteDatabaseManager()
+    db_mgr.pri_dao = CylcSuiteDAO(str(tmp_path / 'db'))
+    db_mgr.pub_writer = Mock()
+    _insert_states(db_mgr.pri_dao, [str(cycle) for cycle in range(1, 9)])
+    scheduler = Mock(
+        suite='suite',
+        suite_db_mgr=db_mgr,
+        main_loop_plugins={'config': {'archive run db': {
+            'retention': 'P2', 'period': 'P3', 'max cycle points': 10}}},
+        config=Mock(initial_point=get_point('1'), taskdefs={}),
+        pool=Mock(sorted_points=[get_point('6')])
+    )
+    state = {}
+    await init(scheduler, state)
+
+    # cycle points 1-3 are copied to the first archive
+    await archive(scheduler, state)
+    path = state['archiving'][0]
+    await state['archiving'][3]
+    assert _select_cycles(path) == ['1', '2', '3']
+
+    # then removed from the suite database
+    await archive(scheduler, state)
+    db_mgr.process_queued_ops()
+    assert _select_cycles(db_mgr.pri_dao.db_file_name) == [
+        '4', '5', '6', '7', '8']
+
+    # rows added whilst archiving are archived again
+    scheduler.pool.sorted_points = [get_point('7')]
+    await archive(scheduler, state)
+    path = state['archiving'][0]
+    db_mgr.pri_dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_JOBS, {
+        'cycle': '4', 'name': 'foo', 'submit_num': 1})
+    db_mgr.pri_dao.execute_queued_items()
+    await state['archiving'][3]
+    await archive(scheduler, state)
+    assert not any(db_mgr.db_deletes_map.values())
+    await archive(scheduler, state)
+    await state['archiving'][3]
+    await archive(scheduler, state)
+    db_mgr.process_queued_ops()
+    assert _select_cycles(path) == ['4']
+    assert _select_cycles(db_mgr.pri_dao.db_file_name) == [
+        '5', '6', '7', '8']
+
+
+@pytest.mark.asyncio
+async def test_future_triggers(tmp_path, cycling_mode):
+    """It should keep cycle points within the largest future offset."""
+    cycling_mode(integer=True)
+    db_mgr = SuiteDatabaseManager()
+    db_mgr.pri_dao = CylcSuiteDAO(str(tmp_path / 'db'))
+    _insert_states(db_mgr.pri_dao, [str(cycle) for cycle in range(1, 9)])
+    scheduler = Mock(
+        suite_db_mgr=db_mgr,
+        main_loop_plugins={'config': {}},
+        config=Mock(initial_point=get_point('1'), taskdefs={
+            'foo': Mock(max_future_prereq_offset=None),
+            'bar': Mock(max_future_prereq_offset=get_interval('P3')),
+            'baz': Mock(max_future_prereq_offset=get_interval('P1')),
+        }),
+        pool=Mock(sorted_points=[get_point('6')])
+    )
+    # retention must be set for suites with future triggers
+    with pytest.raises(UserInputError):
+        await init(scheduler, {})
+
+    state = {}
+    scheduler.main_loop_plugins['config']['archive run db'] = {
+        'retention': 'P1'}
+    await init(scheduler, state)
+    assert _get_cycles(scheduler, state) == (get_point('1'), ['1', '2'])
+    state['retention'] = get_interval('P4')
+    assert _get_cycles(scheduler, state) == (get_point('1'), ['1'])
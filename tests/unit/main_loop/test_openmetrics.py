@@ -0,0 +1,74 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from cylc.flow.main_loop.openmetrics import (
+    _metric,
+    _serve,
+    _write
+)
+
+
+def test_metric():
+    """It should add a metric family with labels on every sample."""
+    lines = []
+    _metric(
+        lines, 'foo', 'gauge', 'The foo.',
+        [('', 1, {'a': 'x'}), ('_count', 2, {})],
+        {'suite': 'bar'}
+    )
+    assert lines == [
+        '# TYPE foo gauge',
+        '# HELP foo The foo.',
+        'foo{suite="bar",a="x"} 1',
+        'foo_count{suite="bar"} 2',
+    ]
+
+
+def test_write(tmp_path):
+    """It should write the file without leaving temporary files behind."""
+    path = Path(tmp_path, 'metrics.txt')
+    _write('foo\n', path)
+    _write('bar\n', path)
+    assert path.read_text() == 'bar\n'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.asyncio
+async def test_serve():
+    """It should respond to HTTP requests with the latest metrics."""
+    state = {'text': '# EOF\n'}
+    server = await asyncio.start_server(
+        lambda reader, writer: _serve(state, reader, writer),
+        host='127.0.0.1',
+        port=0
+    )
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        response = (await reader.read()).decode()
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+    head, body = response.split('\r\n\r\n', 1)
+    assert head.startswith('HTTP/1.1 200 OK')
+    assert 'Content-Type: application/openmetrics-text' in head
+    assert body == '# EOF\n'
@@ -0,0 +1,54 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import sqlite3
+
+from cylc.flow.dbstatecheck import CylcSuiteDBChecker
+from cylc.flow.rundb import CylcSuiteDAO
+
+
+def test_task_states_met(tmp_path, monkeypatch):
+    """It should only select the rows of the queried tasks and cycles."""
+    monkeypatch.setattr(CylcSuiteDBChecker, 'MAX_PARAMS', 4)
+    dao = CylcSuiteDAO(str(tmp_path / 'db'))
+    for name in ('a', 'b', 'c'):
+        for cycle in ('1', '2', '3'):
+            dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_STATES, {
+                'cycle': cycle, 'name': name, 'flow_label': 'x',
+                'status': 'succeeded' if cycle != '3' else 'failed'})
+    dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_OUTPUTS, {
+        'cycle': '1', 'name': 'a', 'outputs': '{"x": "data ready"}'})
+    # (an unreadable row of a task which is not queried)
+    dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_OUTPUTS, {
+        'cycle': '1', 'name': 'c', 'outputs': '{"x": '})
+    dao.execute_queued_items()
+    dao.close()
+
+    conn = sqlite3.connect(str(tmp_path / 'db'))
+    selected = []
+    conn.set_trace_callback(selected.append)
+    checker = CylcSuiteDBChecker(None, None, conn=conn)
+    assert checker.task_states_met([
+        ('a', '1', 'succeed', None),
+        ('b', '2', 'succeed', None),
+        ('a', '3', 'succeed', None),
+        ('b', '3', 'fail', None),
+        ('a', '1', None, 'data ready'),
+        ('a', '2', None, 'data ready'),
+    ]) == [True, True, False, True, True, False]
+    # the queries are chunked and restricted to the queried names
+    assert len(selected) == 3
+    assert all("'c'" not in stmt for stmt in selected)
+    conn.close()
@@ -29,6 +29,7 @@ from cylc.flow.pathutil import (
     get_remote_suite_run_dir,
     get_remote_suite_run_job_dir,
     get_remote_suite_work_dir,
+    get_suite_run_db_archive_dir,
     get_suite_run_dir,
     get_suite_run_job_dir,
     get_suite_run_log_dir,
@@ -115,6 +116,7 @@ class TestPathutil(TestCase):
             (get_suite_run_job_dir, '/log/job'),
             (get_suite_run_log_dir, '/log/suite'),
             (get_suite_run_config_log_dir, '/log/flow-config'),
+            (get_suite_run_db_archive_dir, '/log/db-archive'),
             (get_suite_run_share_dir, '/share'),
             (get_suite_run_work_dir, '/work'),
         ):
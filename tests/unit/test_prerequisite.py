@@ -0,0 +1,100 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from cylc.flow.cycling.loader import get_point
+from cylc.flow.prerequisite import Prerequisite
+
+
+def test_satisfied(cycling_mode):
+    """It should track the state of each message."""
+    cycling_mode()
+    prereq = Prerequisite(get_point('2'))
+    prereq.add('a', '2', 'succeeded')
+    prereq.add('b', '1', 'succeeded')
+    prereq.add('c', '2', 'succeeded')
+    prereq.set_condition('a.2 succeeded & b.1 succeeded & c.2 succeeded')
+    assert prereq.satisfied == {
+        ('a', '2', 'succeeded'): False,
+        ('b', '1', 'succeeded'): False,
+        ('c', '2', 'succeeded'): False,
+    }
+    assert prereq.target_point_strings == ['2', '1']
+
+    # the state of each message is cached until it changes
+    satisfied = prereq.satisfied
+    assert prereq.satisfied is satisfied
+    assert prereq.satisfy_me({('x', '1', 'y')}) == set()
+    assert prereq.satisfied is satisfied
+    assert prereq.satisfy_me({('b', '1', 'succeeded'), ('x', '1', 'y')}) == {
+        ('b', '1', 'succeeded')}
+    assert prereq.satisfied[('b', '1', 'succeeded')] == (
+        prereq.DEP_STATE_SATISFIED)
+    assert not prereq.is_satisfied()
+    prereq.set_satisfied()
+    assert prereq.is_satisfied()
+    assert prereq.satisfied == {
+        ('a', '2', 'succeeded'): prereq.DEP_STATE_OVERRIDDEN,
+        ('b', '1', 'succeeded'): prereq.DEP_STATE_SATISFIED,
+        ('c', '2', 'succeeded'): prereq.DEP_STATE_OVERRIDDEN,
+    }
+    assert prereq.get_resolved_dependencies() == ['b.1']
+    assert prereq.dump() == [
+        ['a.2 succeeded', prereq.DEP_STATE_OVERRIDDEN],
+        ['b.1 succeeded', prereq.DEP_STATE_SATISFIED],
+        ['c.2 succeeded', prereq.DEP_STATE_OVERRIDDEN],
+    ]
+
+    prereq.set_not_satisfied()
+    assert not prereq.is_satisfied()
+    assert not any(prereq.satisfied.values())
+
+    # e.g. loading the state from the DB
+    states = {
+        ('a', '2', 'succeeded'): 'satisfied naturally',
+        ('b', '1', 'succeeded'): 'force satisfied',
+        ('c', '2', 'succeeded'): False,
+    }
+    prereq.set_message_states(states)
+    assert not prereq.is_satisfied()
+    states[('c', '2', 'succeeded')] = 'satisfied naturally'
+    prereq.set_message_states(states)
+    assert prereq.is_satisfied()
+    assert prereq.get_resolved_dependencies() == ['a.2', 'c.2']
+
+
+def test_pre_initial(cycling_mode):
+    """It should drop pre-initial messages from conditional expressions."""
+    cycling_mode()
+    prereq = Prerequisite(get_point('1'), get_point('1'))
+    prereq.add('a', '0', 'succeeded', pre_initial=True)
+    prereq.add('b', '1', 'succeeded')
+    prereq.add('c', '1', 'succeeded')
+    prereq.set_condition('a.0 succeeded | b.1 succeeded & c.1 succeeded')
+    assert list(prereq.satisfied) == [
+        ('b', '1', 'succeeded'), ('c', '1', 'succeeded')]
+    assert prereq.target_point_strings == ['1', '0']
+    prereq.satisfy_me({('b', '1', 'succeeded')})
+    assert not prereq.is_satisfied()
+    prereq.satisfy_me({('c', '1', 'succeeded')})
+    assert prereq.is_satisfied()
+
+    # all messages dropped
+    prereq = Prerequisite(get_point('1'), get_point('1'))
+    prereq.add('a', '0', 'succeeded', pre_initial=True)
+    prereq.set_condition('a')
+    assert prereq.satisfied == {}
+    assert prereq.is_satisfied()
+    assert prereq.dump() == []
@@ -0,0 +1,102 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import io
+import random
+
+import pytest
+
+from cylc.flow.rundb import CylcSuiteDAO
+from cylc.flow.scripts.report_timings import (
+    QuantileSketch,
+    TextTimingSummary,
+    TimingStats,
+    aggregate_timings,
+    merge_timings,
+    _select_cycles
+)
+
+
+def _get_dao(cycles):
+    dao = CylcSuiteDAO(':memory:')
+    for cycle in cycles:
+        dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_JOBS, {
+            'cycle': cycle, 'name': 'foo', 'submit_num': 1,
+            'run_status': 0, 'platform_name': 'localhost',
+            'job_runner_name': 'background',
+            'time_submit': '2020-01-01T00:00:00Z',
+            'time_run': '2020-01-01T00:00:%02dZ' % int(cycle),
+            'time_run_exit': '2020-01-01T00:01:00Z'})
+    dao.execute_queued_items()
+    return dao
+
+
+@pytest.mark.parametrize('relative_accuracy', [0.01, 0.05])
+def test_quantile_sketch(relative_accuracy):
+    """Quantile estimates should be within the relative accuracy."""
+    values = [random.lognormvariate(3, 2) for _ in range(10000)]
+    sketches = [QuantileSketch(relative_accuracy) for _ in range(2)]
+    for i, value in enumerate(values):
+        sketches[i % 2].add(value)
+    sketches[0].merge(sketches[1])
+    values.sort()
+    for quantile in (0.01, 0.25, 0.5, 0.75, 0.99):
+        expected = values[int(quantile * (len(values) - 1))]
+        assert abs(sketches[0].quantile(quantile) - expected) <= (
+            relative_accuracy * expected)
+
+
+def test_timing_stats():
+    """Merged stats should equal the stats of all the values."""
+    values = [random.uniform(0, 100) for _ in range(100)]
+    expected = TimingStats()
+    stats = [TimingStats() for _ in range(3)]
+    for i, value in enumerate(values):
+        expected.add(value)
+        stats[i % 3].add(value)
+    stats[0].merge(stats[1])
+    stats[0].merge(stats[2])
+    stats[0].merge(TimingStats())
+    for (label, value), (_, expected_value) in zip(
+            stats[0].describe(), expected.describe()):
+        assert value == pytest.approx(expected_value), label
+
+
+def test_select_cycles():
+    """It should filter cycle points by an inclusive range (and exclude)."""
+    dao = _get_dao(['8', '9', '10', '11'])
+    assert _select_cycles(dao) is None
+    assert sorted(_select_cycles(dao, '9', '10'), key=int) == ['9', '10']
+    assert sorted(_select_cycles(dao, start_point='10'), key=int) == [
+        '10', '11']
+    assert _select_cycles(dao, stop_point='8') == ['8']
+    assert sorted(_select_cycles(dao, exclude={'8', '10'}), key=int) == [
+        '9', '11']
+    assert _select_cycles(dao, '9', exclude={'9', '10'}) == ['11']
+
+
+def test_summary():
+    """It should summarise the timings of several databases."""
+    timings = {}
+    for cycles in (['1', '2'], ['3']):
+        merge_timings(
+            timings,
+            aggregate_timings(_get_dao(cycles).select_task_times()[1]))
+    stats = timings[('localhost', 'background')]['foo']
+    assert dict(stats['queue_time'].describe())['mean'] == 2
+    assert dict(stats['total_time'].describe())['std'] == 0
+    buf = io.StringIO()
+    TextTimingSummary(timings).write_summary(buf)
+    assert 'foo      3  2.00  1.00  1.00' in buf.getvalue()
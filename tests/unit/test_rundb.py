@@ -126,5 +126,98 @@ def test_remove_columns():
         assert data == [('PUB',)]
 
 
+def test_connection_persists(tmp_path):
+    """The connection should be kept open between batches of writes."""
+    dao = CylcSuiteDAO(
+        str(tmp_path / 'db'), journal_mode='wal', synchronous='normal')
+    conn = dao.connect()
+    assert list(conn.execute('PRAGMA journal_mode')) == [('wal',)]
+    assert list(conn.execute('PRAGMA synchronous')) == [(1,)]
+    for key in ('a', 'b'):
+        dao.add_insert_item(
+            CylcSuiteDAO.TABLE_SUITE_PARAMS, {'key': key, 'value': 1})
+        dao.execute_queued_items()
+        assert dao.conn is conn
+    dao.checkpoint()
+    dao.close()
+    assert dao.conn is None
+    conn = sqlite3.connect(str(tmp_path / 'db'))
+    assert list(conn.execute('SELECT key FROM suite_params')) == [
+        ('a',), ('b',)]
+    conn.close()
+
+
+def test_create_indexes(tmp_path):
+    """Indexes should be created with new tables or added to old ones."""
+    path = str(tmp_path / 'db')
+    dao = CylcSuiteDAO(path)
+    conn = dao.connect()
+    assert dao.create_indexes() == []
+    conn.execute('DROP INDEX task_states_cycle_status')
+    conn.commit()
+    assert dao.create_indexes() == ['task_states_cycle_status']
+    assert 'USING INDEX task_states_cycle_status' in list(conn.execute(
+        'EXPLAIN QUERY PLAN SELECT name FROM task_states WHERE cycle==?',
+        ['1']
+    ))[0][-1]
+    dao.close()
+
+
+def test_coalesce_updates():
+    """Writes to the same row in a batch should be merged."""
+    dao = CylcSuiteDAO(':memory:')
+    table = dao.tables[CylcSuiteDAO.TABLE_TASK_JOBS]
+    where_args = {'cycle': '1', 'name': 'foo', 'submit_num': 1}
+    dao.add_insert_item(
+        CylcSuiteDAO.TABLE_TASK_JOBS, {**where_args, 'run_status': 1})
+    dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_JOBS, dict(where_args))
+    for set_args in (
+            {'time_run': 'a'}, {'time_run': 'b', 'run_status': 0}):
+        dao.add_update_item(
+            CylcSuiteDAO.TABLE_TASK_JOBS, set_args, where_args)
+        dao.add_update_item(
+            CylcSuiteDAO.TABLE_TASK_JOBS, set_args,
+            {**where_args, 'submit_num': 2})
+    table.flush_update_rows()
+    # The last insert with the merged update to it.
+    assert len(table.insert_queue) == 1
+    assert table.insert_queue[0][10:12] == [None, 0]
+    assert table.insert_queue[0][8] == 'b'
+    # One merged update for the other row.
+    assert list(table.update_queues.values()) == [[['b', 0, '1', 'foo', 2]]]
+    dao.execute_queued_items()
+    assert list(dao.connect().execute(
+        'SELECT submit_num, time_run, run_status FROM task_jobs'
+    )) == [(1, 'b', 0)]
+
+
+def test_select_for_restart():
+    """Restart selects should fetch prerequisites and submit nums in bulk."""
+    dao = CylcSuiteDAO(':memory:')
+    for cycle in ('1', '2'):
+        dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_POOL, {
+            'cycle': cycle, 'name': 'foo', 'flow_label': 'x',
+            'status': 'waiting', 'is_held': 0})
+        dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_STATES, {
+            'cycle': cycle, 'name': 'foo', 'flow_label': 'x',
+            'submit_num': int(cycle)})
+    dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_PREREQUISITES, {
+        'cycle': '2', 'name': 'foo', 'prereq_name': 'foo',
+        'prereq_cycle': '1', 'prereq_output': 'succeeded',
+        'satisfied': 'satisfied naturally'})
+    dao.execute_queued_items()
+    rows = []
+    dao.select_task_pool_for_restart(lambda _, row: rows.append(row))
+    assert sorted((row[0], row[-1]) for row in rows) == [
+        ('1', []),
+        ('2', [['foo', '1', 'succeeded', 'satisfied naturally']])
+    ]
+    assert sorted(dao.select_task_states_cycles()) == ['1', '2']
+    rows = []
+    dao.select_submit_nums_for_restart(
+        lambda _, row: rows.append(row), ['2'])
+    assert rows == [['2', 'foo', 'x', 2]]
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -15,12 +15,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Tests for Cylc scheduler server."""
 
+import asyncio
+from time import time
+
 import pytest
 
 from types import SimpleNamespace
 from unittest.mock import patch, create_autospec
 
-from cylc.flow.scheduler import Scheduler
+from cylc.flow.scheduler import Scheduler, WakeUpQueue
 
 
 @pytest.mark.parametrize(
@@ -107,3 +110,58 @@ def test_process_cylc_stop_point(get_point, options, expected):
 
     scheduler.process_cylc_stop_point(scheduler)
     assert scheduler.options.stopcp == expected
+
+
+def test_wake_up_queue():
+    """Putting an item onto a WakeUpQueue calls the wake up function."""
+    calls = []
+    queue = WakeUpQueue(lambda: calls.append(True))
+    queue.put('a')
+    queue.put_nowait('b')
+    assert len(calls) == 2
+    assert queue.get() == 'a'
+    assert len(calls) == 2
+
+
+def _sleepy_scheduler(next_timer=None, proc_pool_busy=False):
+    """Return a Scheduler with just enough state to _main_loop_sleep."""
+    schd = Scheduler.__new__(Scheduler)
+    schd.event_loop = asyncio.get_event_loop()
+    schd.main_loop_wakeup = asyncio.Event()
+    schd.proc_pool = SimpleNamespace(is_not_done=lambda: proc_pool_busy)
+    schd.get_next_timer = lambda: next_timer
+    return schd
+
+
+@pytest.mark.asyncio
+async def test_main_loop_sleep_wake_up():
+    """The main loop sleep should end early when woken up."""
+    schd = _sleepy_scheduler()
+    schd.INTERVAL_MAIN_LOOP = 10
+    tinit = time()
+    schd.event_loop.call_later(0.1, schd.wake_up)
+    await schd._main_loop_sleep(tinit)
+    assert time() - tinit < 5
+    # the event should be cleared ready for the next pass
+    assert not schd.main_loop_wakeup.is_set()
+
+
+@pytest.mark.asyncio
+async def test_main_loop_sleep_timer():
+    """The main loop sleep should end when the next timer is due."""
+    tinit = time()
+    schd = _sleepy_scheduler(next_timer=tinit + 0.1)
+    schd.INTERVAL_MAIN_LOOP = 10
+    await schd._main_loop_sleep(tinit)
+    assert 0.1 <= time() - tinit < 5
+
+
+@pytest.mark.asyncio
+async def test_main_loop_sleep_interval():
+    """The main loop sleep should be bounded by the main loop interval."""
+    schd = _sleepy_scheduler(proc_pool_busy=True)
+    schd.INTERVAL_MAIN_LOOP = 10
+    schd.INTERVAL_MAIN_LOOP_QUICK = 0.1
+    tinit = time()
+    await schd._main_loop_sleep(tinit)
+    assert 0.1 <= time() - tinit < 5
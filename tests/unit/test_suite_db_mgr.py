@@ -0,0 +1,119 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import sqlite3
+from threading import Event
+from time import sleep
+
+from cylc.flow.rundb import CylcSuiteDAO
+from cylc.flow.suite_db_mgr import PublicDatabaseWriter, SuiteDatabaseManager
+
+
+def _select_keys(path):
+    conn = sqlite3.connect(path)
+    keys = [key for key, in conn.execute('SELECT key FROM suite_params')]
+    conn.close()
+    return keys
+
+
+def test_public_database_writer(tmp_path, monkeypatch):
+    """It should write queued batches together and drop them when full."""
+    monkeypatch.setattr(PublicDatabaseWriter, 'MAX_QUEUE_SIZE', 2)
+    path = str(tmp_path / 'db')
+    CylcSuiteDAO(path).close()
+    writer = PublicDatabaseWriter(path)
+    for key, is_queued in (('a', True), ('b', True), ('c', False)):
+        assert writer.put([(
+            'add_insert_item',
+            CylcSuiteDAO.TABLE_SUITE_PARAMS,
+            {'key': key, 'value': 1}
+        )]) is is_queued
+    assert writer.overflowed
+    writer.start()
+    writer.stop()
+    assert writer.n_coalesced == 2
+    assert _select_keys(path) == ['a', 'b']
+
+
+def test_public_database_writer_stop_timeout(tmp_path, monkeypatch, caplog):
+    """It should not wait forever for a stuck write."""
+    monkeypatch.setattr(PublicDatabaseWriter, 'STOP_TIMEOUT', 0.1)
+    release = Event()
+    monkeypatch.setattr(
+        CylcSuiteDAO, 'execute_queued_items', lambda _: release.wait())
+    path = str(tmp_path / 'db')
+    writer = PublicDatabaseWriter(path)
+    writer.put([(
+        'add_insert_item',
+        CylcSuiteDAO.TABLE_SUITE_PARAMS,
+        {'key': 'a', 'value': 1}
+    )])
+    writer.start()
+    writer.stop()
+    assert writer.is_alive()
+    assert 'gave up waiting for writes' in caplog.text
+    release.set()
+    writer.join()
+
+
+def test_public_database_writer_abandon(tmp_path, monkeypatch):
+    """It should not wait for a stuck write, or write anything after it."""
+    release = Event()
+    calls = []
+
+    def execute_queued_items(_):
+        calls.append(None)
+        release.wait()
+
+    monkeypatch.setattr(
+        CylcSuiteDAO, 'execute_queued_items', execute_queued_items)
+    writer = PublicDatabaseWriter(str(tmp_path / 'db'))
+    batch = [(
+        'add_insert_item',
+        CylcSuiteDAO.TABLE_SUITE_PARAMS,
+        {'key': 'a', 'value': 1}
+    )]
+    writer.put(batch)
+    writer.start()
+    while not calls:
+        sleep(0.01)
+    writer.put(batch)
+    writer.abandon()
+    assert writer.is_alive()
+    release.set()
+    writer.join(5)
+    assert not writer.is_alive()
+    assert len(calls) == 1
+
+
+def test_recover_pub_from_pri(tmp_path):
+    """It should replace the public database if the writer fell behind."""
+    db_mgr = SuiteDatabaseManager(
+        str(tmp_path / 'pri'), str(tmp_path / 'pub'))
+    (tmp_path / 'pri').mkdir()
+    (tmp_path / 'pub').mkdir()
+    db_mgr.on_suite_start(is_restart=False)
+    db_mgr.put_suite_params_1('a', 1)
+    db_mgr.process_queued_ops()
+    writer = db_mgr.pub_writer
+    writer.overflowed = True
+    db_mgr.recover_pub_from_pri()
+    assert db_mgr.pub_writer is not writer
+    writer.join(5)
+    assert not writer.is_alive()
+    db_mgr.put_suite_params_1('b', 1)
+    db_mgr.process_queued_ops()
+    db_mgr.on_suite_shutdown()
+    assert _select_keys(db_mgr.pub_path) == ['a', 'b']
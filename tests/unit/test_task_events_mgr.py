@@ -14,9 +14,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from time import time
 import unittest
 from unittest import mock
-from cylc.flow.task_events_mgr import TaskEventsManager
+from cylc.flow.task_action_timer import TaskActionTimer
+from cylc.flow.task_events_mgr import (
+    CustomTaskEventHandlerContext, TaskEventsManager)
 from cylc.flow.subprocctx import SubProcContext
 
 
@@ -54,6 +57,54 @@ class TestTaskEventsManager(unittest.TestCase):
         self.assertEqual(1, cylc_log.debug.call_count)
         self.assertTrue(cylc_log.debug.call_args.contains("ls /tmp/123"))
 
+    def test_process_events_due_timers(self):
+        """Test that only event timers which are due are processed."""
+        proc_pool = mock.Mock()
+        schd_ctx = mock.Mock(stop_mode=None)
+        task_events_manager = TaskEventsManager(
+            None, proc_pool, None, None, None, None, None)
+        for key, delays in (('now', [0]), ('later', [3600])):
+            task_events_manager.add_event_timer(
+                (key, '1', 'foo', 1),
+                TaskActionTimer(
+                    CustomTaskEventHandlerContext(
+                        key, TaskEventsManager.HANDLER_CUSTOM, 'true'),
+                    delays=delays))
+        task_events_manager.process_events(schd_ctx)
+        self.assertEqual(1, proc_pool.put_command.call_count)
+        # the delayed handler is not due until its timeout
+        timer = task_events_manager._event_timers[('later', '1', 'foo', 1)]
+        self.assertEqual(
+            timer.timeout, task_events_manager.get_next_event_time())
+        task_events_manager.process_events(schd_ctx)
+        self.assertEqual(1, proc_pool.put_command.call_count)
+        # the running handler is requeued on retry
+        task_events_manager.unset_waiting_event_timer(('now', '1', 'foo', 1))
+        self.assertEqual(0, task_events_manager.get_next_event_time())
+        task_events_manager.remove_event_timer(('later', '1', 'foo', 1))
+        task_events_manager.remove_event_timer(('now', '1', 'foo', 1))
+        self.assertIsNone(task_events_manager.get_next_event_time())
+
+    def test_add_job_timer(self):
+        """Test that job timers are due at the earlier of poll and timeout."""
+        task_events_manager = TaskEventsManager(
+            None, None, None, None, None, None, None)
+        itask = mock.Mock(identity='foo.1', timeout=None)
+        itask.poll_timer = TaskActionTimer(delays=[10])
+        itask.poll_timer.next()
+        task_events_manager.add_job_timer(itask)
+        self.assertEqual(
+            itask.poll_timer.timeout,
+            task_events_manager.get_next_job_time())
+        itask.timeout = time() - 1
+        task_events_manager.add_job_timer(itask)
+        self.assertEqual(
+            ['foo.1'], task_events_manager.get_due_job_timers(time()))
+        itask.timeout = None
+        itask.poll_timer = None
+        task_events_manager.add_job_timer(itask)
+        self.assertIsNone(task_events_manager.get_next_job_time())
+
 
 if __name__ == '__main__':
     unittest.main()
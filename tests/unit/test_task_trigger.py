@@ -14,6 +14,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from unittest.mock import Mock
+
 import pytest
 
 from cylc.flow.cycling.loader import get_point, get_sequence
@@ -177,3 +179,33 @@ def test_str(cycling_mode):
 
     trigger = TaskTrigger('name', None, 'output')
     assert str(trigger) == 'name:output'
+
+
+def test_get_prerequisite(cycling_mode):
+    """It should share the compiled condition and terms between points."""
+    cycling_mode()
+    a = TaskTrigger('a', None, 'succeeded')
+    b = TaskTrigger('b', '-P1', 'failed')
+    c = TaskTrigger('c', None, 'succeeded')
+    dependency = Dependency([a, '|', [b, '&', c]], [a, b, c], False)
+    tdef = Mock(start_point=get_point('1'), max_future_prereq_offset=None)
+
+    prereq_2 = dependency.get_prerequisite(get_point('2'), tdef)
+    prereq_3 = dependency.get_prerequisite(get_point('3'), tdef)
+    assert prereq_2.conditional_expression is prereq_3.conditional_expression
+    assert prereq_2.condition_terms is prereq_3.condition_terms
+    assert prereq_3.get_raw_conditional_expression() == (
+        'a.3 succeeded|(b.2 failed&c.3 succeeded)')
+    assert not prereq_3.is_satisfied()
+    prereq_3.satisfy_me({('b', '2', 'failed')})
+    assert not prereq_3.is_satisfied()
+    prereq_3.satisfy_me({('c', '3', 'succeeded')})
+    assert prereq_3.is_satisfied()
+    assert not prereq_2.is_satisfied()
+
+    # pre-initial dependencies are dropped from the expression
+    prereq_1 = dependency.get_prerequisite(get_point('1'), tdef)
+    assert prereq_1.get_raw_conditional_expression() == (
+        '(a.1 succeeded|c.1 succeeded)')
+    prereq_1.satisfy_me({('c', '1', 'succeeded')})
+    assert prereq_1.is_satisfied()
@@ -14,11 +14,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from time import time
+
 import pytest
 from unittest.mock import create_autospec
 
 from cylc.flow.broadcast_mgr import BroadcastMgr
 from cylc.flow.data_store_mgr import DataStoreMgr
+from cylc.flow.rundb import CylcSuiteDAO
 from cylc.flow.cycling.iso8601 import ISO8601Point, ISO8601Sequence, init
 from cylc.flow.scheduler import Scheduler
 from cylc.flow.subprocctx import SubFuncContext
@@ -226,6 +229,50 @@ def test_satisfy_xtrigger(xtrigger_mgr_procpool_broadcast):
     assert len(xtrigger_mgr_procpool_broadcast.active) == 0
 
 
+def test_satisfy_wall_clock(xtrigger_mgr):
+    """Test clock xtriggers wait in the clock heap until due."""
+    trigger_time = time() + 100
+    wall_clock = SubFuncContext(
+        label="wall_clock",
+        func_name="wall_clock",
+        func_args=[],
+        func_kwargs={"absolute_as_seconds": trigger_time}
+    )
+    xtrigger_mgr.add_trig("wall_clock", wall_clock, "fdir")
+    tdef = TaskDef(
+        name="foo",
+        rtcfg=None,
+        run_mode="live",
+        start_point=1
+    )
+    init()
+    sequence = ISO8601Sequence('P1D', '2019')
+    tdef.xtrig_labels[sequence] = ["wall_clock"]
+    itask = TaskProxy(
+        tdef, ISO8601Point('2019'), FlowLabelMgr().get_new_label())
+
+    # not due: the clock trigger goes into the clock heap
+    assert not xtrigger_mgr.satisfy_xtriggers(itask)
+    assert xtrigger_mgr.clock_heap.get_next_time() == trigger_time
+    assert xtrigger_mgr.check_xtriggers([itask]) == []
+    assert len(xtrigger_mgr.clock_heap) == 1
+
+    # the trigger time moved (e.g. retry), the callback puts it back
+    xtrigger_mgr.mutate_trig(
+        "wall_clock", {"absolute_as_seconds": trigger_time + 100})
+    [(task, callback)] = xtrigger_mgr.clock_heap.pop_due(trigger_time + 1)
+    assert task is itask
+    assert not callback(itask)
+    assert xtrigger_mgr.clock_heap.get_next_time() == trigger_time + 100
+
+    # the trigger time has passed
+    xtrigger_mgr.mutate_trig("wall_clock", {"absolute_as_seconds": 1})
+    [(_, callback)] = xtrigger_mgr.clock_heap.pop_due(trigger_time + 101)
+    assert callback(itask)
+    assert itask.state.xtriggers["wall_clock"]
+    assert len(xtrigger_mgr.clock_heap) == 0
+
+
 def test_collate(xtrigger_mgr):
     """Test that collate properly tallies the totals of current xtriggers."""
     xtrigger_mgr.collate(itasks=[])
@@ -335,10 +382,8 @@ def test_callback(xtrigger_mgr):
 def test_check_xtriggers(xtrigger_mgr_procpool):
     """Test check_xtriggers call.
 
-    check_xtriggers does pretty much the same as collate. The
-    difference is that besides tallying on all the xtriggers and
-    clock xtriggers available, it then proceeds to trying to
-    satisfy them."""
+    check_xtriggers tries to satisfy the xtriggers of the pending tasks,
+    which remain pending until there are none left to check."""
 
     # add a xtrigger
     # that will cause all_xtrig to be populated, but not all_xclock
@@ -388,10 +433,99 @@ def test_check_xtriggers(xtrigger_mgr_procpool):
     itask2 = TaskProxy(
         tdef2, start_point, FlowLabelMgr().get_new_label())
 
-    xtrigger_mgr_procpool.check_xtriggers([itask1, itask2])
+    xtrigger_mgr_procpool.add_pending_task(itask1)
+    xtrigger_mgr_procpool.add_pending_task(itask2)
+    assert list(xtrigger_mgr_procpool.pending_tasks) == [itask1.identity]
+    xtrigger_mgr_procpool.check_xtriggers()
     # won't be satisfied, as it is async, we are are not calling callback
     assert not xtrigger_mgr_procpool.sat_xtrig
+    assert xtrigger_mgr_procpool.active == [get_name.get_signature()]
+    assert list(xtrigger_mgr_procpool.pending_tasks) == [itask1.identity]
+
+    # satisfied xtriggers are no longer checked
+    xtrigger_mgr_procpool.data_store_mgr = DataStoreMgr(
+        create_autospec(Scheduler))
+    get_name.out = "[true, {}]"
+    xtrigger_mgr_procpool.callback(get_name)
+    assert xtrigger_mgr_procpool.check_xtriggers() == [itask1]
+    assert not xtrigger_mgr_procpool.pending_tasks
+
+    # the xtriggers needed are collated on housekeeping
+    xtrigger_mgr_procpool.housekeep([itask1, itask2])
     assert xtrigger_mgr_procpool.all_xtrig
+    assert xtrigger_mgr_procpool.sat_xtrig
+
+
+def test_check_xtriggers_suite_state(
+        xtrigger_mgr_procpool_broadcast, tmp_path):
+    """Test suite_state xtriggers are batched, reusing a DB connection.
+
+    The batch is called in a thread, the results are recorded next time.
+    """
+    xtrigger_mgr = xtrigger_mgr_procpool_broadcast
+    xtrigger_mgr.suite_source_dir = str(tmp_path)
+    (tmp_path / 'up' / 'log').mkdir(parents=True)
+    dao = CylcSuiteDAO(str(tmp_path / 'up' / 'log' / 'db'))
+    dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_STATES, {
+        'cycle': '2019', 'name': 'up', 'flow_label': 'x',
+        'status': 'succeeded'})
+    dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_OUTPUTS, {
+        'cycle': '2019', 'name': 'up', 'outputs': '{"x": "data ready"}'})
+    dao.execute_queued_items()
+    dao.close()
+    # a bad row fails the calls for its suite only
+    (tmp_path / 'bad' / 'log').mkdir(parents=True)
+    dao = CylcSuiteDAO(str(tmp_path / 'bad' / 'log' / 'db'))
+    dao.add_insert_item(CylcSuiteDAO.TABLE_TASK_OUTPUTS, {
+        'cycle': '2019', 'name': 'up', 'outputs': '{"x": '})
+    dao.execute_queued_items()
+    dao.close()
+    sequence = ISO8601Sequence('P1D', '2019')
+    itasks = []
+    for label, suite, kwargs in (
+            ('status', 'up', {'status': 'succeed'}),
+            ('message', 'up', {'message': 'data ready'}),
+            ('other_message', 'up', {'message': 'other'}),
+            ('bad_message', 'bad', {'message': 'data ready'})):
+        xtrigger_mgr.add_trig(label, SubFuncContext(
+            label=label,
+            func_name='suite_state',
+            func_args=[suite, 'up', '2019'],
+            func_kwargs={'cylc_run_dir': str(tmp_path), **kwargs}
+        ), 'fdir')
+        tdef = TaskDef(
+            name=label,
+            rtcfg=None,
+            run_mode='live',
+            start_point=1
+        )
+        tdef.xtrig_labels[sequence] = [label]
+        itasks.append(TaskProxy(
+            tdef, ISO8601Point('2019'), FlowLabelMgr().get_new_label()))
+
+    xtrigger_mgr.check_xtriggers(itasks)
+    assert len(xtrigger_mgr.active) == 4
+    xtrigger_mgr.suite_state_running[1].result()
+    xtrigger_mgr.check_xtriggers(itasks)
+    assert not xtrigger_mgr.active
+    assert sorted(xtrigger_mgr.sat_xtrig) == [
+        ctx.get_signature() for ctx in (
+            xtrigger_mgr.functx_map['message'],
+            xtrigger_mgr.functx_map['status'])
+    ]
+    assert xtrigger_mgr.sat_xtrig[
+        xtrigger_mgr.functx_map['status'].get_signature()
+    ]['status'] == 'succeed'
+    [(db_path, [(_, conn, _)])] = xtrigger_mgr.db_connection_pool.idle.items()
+    assert db_path == str(tmp_path / 'up' / 'log' / 'db')
+
+    # the connection is reused for the next batch
+    xtrigger_mgr.t_next_call.clear()
+    xtrigger_mgr.check_xtriggers(itasks)
+    xtrigger_mgr.suite_state_running[1].result()
+    assert xtrigger_mgr.db_connection_pool.idle[db_path][0][1] is conn
+    xtrigger_mgr.close()
+    assert not xtrigger_mgr.db_connection_pool.idle
 
 
 # mock objects